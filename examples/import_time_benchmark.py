@@ -0,0 +1,82 @@
+"""
+Measures how long the SDK and the CLI take to import, and guards against regressions.
+
+Each import runs in a fresh interpreter several times and the median is reported, next
+to a bare interpreter start for reference. The light entry points must not load the
+heavy clients (OpenAI, MCP, FastAPI, Uvicorn): if one of them does, or an import takes
+longer than --max-ms, the script exits with status 1.
+
+    python examples/import_time_benchmark.py
+    python examples/import_time_benchmark.py --runs 10 --max-ms 300
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY = ['openai', 'mcp', 'fastapi', 'uvicorn']
+
+# (statement, modules it must not load). Empty guards are measured for reference only.
+TARGETS = [
+    ("pass", []),
+    ("import xronai", HEAVY),
+    ("import xronai.history", HEAVY),
+    ("import xronai.tools.process_executor", HEAVY),
+    ("import studio.cli", HEAVY),
+    ("import xronai.core.agents", ['mcp', 'fastapi', 'uvicorn']),
+    ("from xronai.config import AgentFactory", ['mcp', 'fastapi', 'uvicorn']),
+]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {guard!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, guard, runs):
+    """Import in fresh interpreters; return the median milliseconds and the guarded modules loaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(ROOT, 'src'), ROOT]))
+    times, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement, guard=guard)],
+                                capture_output=True,
+                                text=True,
+                                env=env,
+                                check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['ms'])
+        loaded.update(result['loaded'])
+    return statistics.median(times), sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per import.")
+    parser.add_argument('--max-ms', type=float, default=None, help="Fail if a guarded import takes longer.")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'import':<45} {'median':>10}  heavy modules loaded")
+    for statement, guard in TARGETS:
+        ms, loaded = measure(statement, guard, args.runs)
+        print(f"{statement:<45} {ms:>8.1f}ms  {', '.join(loaded) or '-'}")
+        if loaded:
+            failures.append(f"'{statement}' loads {', '.join(loaded)}")
+        if guard and args.max_ms is not None and ms > args.max_ms:
+            failures.append(f"'{statement}' took {ms:.0f}ms (limit {args.max_ms:.0f}ms)")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """XronAI: The Python SDK for building powerful, agentic AI chatbots."""
 
-from .core.supervisor import Supervisor
-from .core.agents import Agent
+import importlib
+from typing import Any, List
 
 __all__ = [
     "Supervisor",
@@ -9,3 +9,23 @@ __all__ = [
 ]
 
 __version__ = "0.2.8"
+
+# Supervisor and Agent pull in the OpenAI and MCP clients, so they are imported on first
+# access. Importing a light subpackage (xronai.history, xronai.tools), as CLI commands and
+# tool worker processes do, does not pay for them.
+_LAZY_IMPORTS = {
+    "Supervisor": "xronai.core.supervisor",
+    "Agent": "xronai.core.agents",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -0,0 +1,3 @@
+from .runner import BatchRunner, read_inputs, read_results
+
+__all__ = ['BatchRunner', 'read_inputs', 'read_results']
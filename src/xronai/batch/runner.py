@@ -0,0 +1,282 @@
+"""
+Offline batch execution of a workflow.
+
+``BatchRunner`` pushes many independent queries through one workflow configuration
+with a bounded number of worker threads. The configuration is compiled once (see
+xronai.config.workflow_template), so tool imports and MCP tool discovery happen once
+per batch. Each worker instantiates the workflow from the template for the session of
+its first input and re-points it at the session of every later input, and all workers
+share the process-wide OpenAI clients, rate limiters and tool process pools.
+
+Inputs are JSONL lines with a ``query`` and optionally an ``id`` and a ``session_id``:
+
+    {"id": "q1", "query": "Summarize the attached report."}
+    {"id": "q2", "query": "And the follow-up?", "session_id": "customer-42"}
+
+Inputs without an ``id`` are identified by their line number. Each result is appended
+to the output JSONL file as soon as its run finishes:
+
+    {"id": "q1", "session_id": "...", "query": "...", "status": "ok", "response": "...",
+     "error": null, "duration_s": 3.2}
+
+The output doubles as the checkpoint: running the same batch again skips every input
+that already has a result (and, with ``retry_failed``, re-runs those that failed), so an
+interrupted job resumes where it stopped. Runs interrupted by a cancellation are not
+recorded and run again on resume.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from xronai.config import AgentFactory, ConfigValidator
+from xronai.core import Agent, Supervisor, CancellationToken, RunCancelledError
+from xronai.history import SessionIndex
+from xronai.server.session_lock import session_lock
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def read_inputs(path: str) -> List[Dict[str, Any]]:
+    """
+    Read batch inputs from a JSONL file.
+
+    Args:
+        path (str): Path to the file. Blank lines are ignored.
+
+    Returns:
+        List[Dict[str, Any]]: The inputs, each with 'id', 'query' and an optional 'session_id'.
+
+    Raises:
+        ValueError: If a line is not a JSON object with a string 'query', or if two
+            inputs share an id.
+    """
+    items = []
+    seen: Set[str] = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+            if not isinstance(data, dict) or not isinstance(data.get('query'), str):
+                raise ValueError(f"{path}:{line_number}: each line must be an object with a string 'query'")
+
+            item_id = str(data.get('id', line_number))
+            if item_id in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate id '{item_id}'")
+            seen.add(item_id)
+            items.append({'id': item_id, 'query': data['query'], 'session_id': data.get('session_id')})
+    return items
+
+
+def read_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the results already written to a batch output file.
+
+    A line cut short by a crash is ignored. If an id was run more than once, its last
+    result wins.
+
+    Args:
+        path (str): Path to the output file. A missing file has no results.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The latest result of each input, keyed by id.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(result, dict) and 'id' in result:
+                results[str(result['id'])] = result
+    return results
+
+
+def _load_history(node: Union[Supervisor, Agent]) -> None:
+    """Load the chat history of every node of a workflow from its current session."""
+    if node.history_manager:
+        node.chat_history = node.history_manager.load_chat_history(node.name)
+    if isinstance(node, Supervisor):
+        for child in node.registered_agents:
+            _load_history(child)
+
+
+class BatchRunner:
+    """
+    Runs many independent workflow sessions concurrently.
+
+    Attributes:
+        config (Dict[str, Any]): The validated workflow configuration.
+        history_base_path (str): Root directory of the session histories.
+        workers (int): Number of sessions run at the same time.
+        timeout (Optional[float]): Seconds a single run may take.
+    """
+
+    def __init__(self,
+                 config: Dict[str, Any],
+                 history_base_path: str = "xronai_sessions",
+                 workers: int = 4,
+                 timeout: Optional[float] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            config (Dict[str, Any]): The workflow configuration, as loaded from YAML.
+            history_base_path (str): Root directory of the session histories.
+            workers (int): Number of sessions run at the same time.
+            timeout (Optional[float]): Seconds a single run may take before it fails.
+
+        Raises:
+            ConfigValidationError: If the configuration is invalid.
+            ValueError: If workers is less than 1.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        ConfigValidator.validate(config)
+        self.config = config
+        self.history_base_path = os.path.abspath(history_base_path)
+        self.workers = workers
+        self.timeout = timeout
+        self._template = None
+        self._template_lock = threading.Lock()
+        self._local = threading.local()
+        self._active: Set[CancellationToken] = set()
+        self._active_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self,
+            inputs: List[Dict[str, Any]],
+            output_path: str,
+            retry_failed: bool = False,
+            on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, int]:
+        """
+        Run every input that has no result in the output file yet.
+
+        Args:
+            inputs (List[Dict[str, Any]]): The inputs, as returned by ``read_inputs``.
+            output_path (str): The JSONL file results are appended to.
+            retry_failed (bool): Also re-run inputs whose previous result is an error.
+            on_result (Optional[Callable]): Called with each result once it is written.
+
+        Returns:
+            Dict[str, int]: Counts of 'total', 'skipped', 'succeeded', 'failed' and
+                'cancelled' inputs.
+        """
+        previous = read_results(output_path)
+        pending = []
+        for item in inputs:
+            result = previous.get(item['id'])
+            if result is None or (retry_failed and result.get('status') != STATUS_OK):
+                pending.append(item)
+
+        summary = {"total": len(inputs), "skipped": len(inputs) - len(pending), "succeeded": 0, "failed": 0,
+                   "cancelled": 0}
+        if not pending:
+            return summary
+
+        os.makedirs(self.history_base_path, exist_ok=True)
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+
+        executor = ThreadPoolExecutor(max_workers=min(self.workers, len(pending)), thread_name_prefix="xronai-batch")
+        try:
+            futures = [executor.submit(self._run_item, item) for item in pending]
+            with open(output_path, 'a', encoding='utf-8') as output:
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result is None:
+                        summary["cancelled"] += 1
+                        continue
+                    output.write(json.dumps(result) + "\n")
+                    output.flush()
+                    summary["succeeded" if result['status'] == STATUS_OK else "failed"] += 1
+                    if on_result:
+                        on_result(result)
+        except BaseException:
+            self.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return summary
+
+    def cancel(self) -> None:
+        """Stop the batch: cancel the runs in progress and skip the remaining inputs."""
+        self._stopped.set()
+        with self._active_lock:
+            for token in self._active:
+                token.cancel("batch cancelled")
+
+    def _entry_point(self, session_id: str) -> Union[Supervisor, Agent]:
+        """
+        Return this worker thread's workflow, pointed at a session. The workflow is built
+        for the first session the thread runs and re-pointed for the following ones.
+
+        Called with the session's lock held, since building or re-pointing the workflow
+        writes the system messages of a new session.
+        """
+        entry_point = getattr(self._local, 'entry_point', None)
+        if entry_point is None:
+            with self._template_lock:
+                if self._template is None:
+                    self._template = asyncio.run(AgentFactory.compile(self.config))
+            entry_point = self._template.instantiate(workflow_id=session_id, history_base_path=self.history_base_path)
+            self._local.entry_point = entry_point
+        elif entry_point.workflow_id != session_id:
+            entry_point.set_workflow_id(session_id, history_base_path=self.history_base_path)
+        return entry_point
+
+    def _run_item(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Run one input in its own session. Executed by a worker thread.
+
+        Returns:
+            Optional[Dict[str, Any]]: The result to record, or None if the run was cancelled.
+        """
+        if self._stopped.is_set():
+            return None
+
+        session_id = item.get('session_id') or str(uuid.uuid4())
+        result = {"id": item['id'], "session_id": session_id, "query": item['query'], "status": STATUS_OK,
+                  "response": None, "error": None}
+
+        cancel_token = CancellationToken()
+        with self._active_lock:
+            self._active.add(cancel_token)
+        started = time.monotonic()
+        try:
+            with session_lock(self.history_base_path, session_id):
+                if self.timeout:
+                    cancel_token.set_timeout(self.timeout)
+                with SessionIndex.for_path(self.history_base_path).track(session_id, query=item['query']):
+                    entry_point = self._entry_point(session_id)
+                    _load_history(entry_point)
+                    result["response"] = entry_point.chat(query=item['query'], cancel_token=cancel_token)
+        except RunCancelledError as e:
+            if self._stopped.is_set():
+                return None
+            result.update(status=STATUS_ERROR, error=f"Run cancelled: {e}")
+        except Exception as e:
+            logger.info("Batch input %s failed: %s", item['id'], e)
+            result.update(status=STATUS_ERROR, error=f"{type(e).__name__}: {e}")
+        finally:
+            with self._active_lock:
+                self._active.discard(cancel_token)
+
+        result["duration_s"] = round(time.monotonic() - started, 3)
+        return result
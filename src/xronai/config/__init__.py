@@ -1,5 +1,6 @@
 from .yaml_config import load_yaml_config
 from .config_validator import ConfigValidator, ConfigValidationError
 from .agent_factory import AgentFactory
+from .workflow_template import WorkflowTemplate
 
-__all__ = ['load_yaml_config', 'ConfigValidator', 'ConfigValidationError', 'AgentFactory']
+__all__ = ['load_yaml_config', 'ConfigValidator', 'ConfigValidationError', 'AgentFactory', 'WorkflowTemplate']
@@ -3,13 +3,19 @@ AgentFactory module for creating hierarchical structures of Supervisors and Agen
 
 This module provides a factory class that constructs a complete hierarchy of
 Supervisors and Agents based on a configuration dictionary, typically loaded
-from a YAML file.
+from a YAML file, or compiles the configuration into a template that builds the
+hierarchy for each session (see xronai.config.workflow_template).
 """
 
-import importlib, uuid
+import importlib, uuid, asyncio, copy
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Union
-from xronai.core import Supervisor, Agent
+from xronai.core import Supervisor, Agent, LazyNode
+from xronai.tools.execution import ToolPolicy
+from xronai.tools.process_executor import get_process_pool
+from xronai.tools.tool_cache import tool_cache_id
 from .config_validator import ConfigValidator
+from .workflow_template import NodeTemplate, ToolTemplate, WorkflowTemplate
 
 
 class AgentFactory:
@@ -24,7 +30,8 @@ class AgentFactory:
 
     @staticmethod
     async def create_from_config(config: Dict[str, Any],
-                                 history_base_path: Optional[str] = None) -> Union[Supervisor, Agent]:
+                                 history_base_path: Optional[str] = None,
+                                 lazy: bool = False) -> Union[Supervisor, Agent]:
         """
         Create a Supervisor or a standalone Agent from a configuration dictionary.
 
@@ -32,6 +39,9 @@ class AgentFactory:
             config (Dict[str, Any]): The configuration dictionary containing
                 the entire hierarchy structure.
             history_base_path (Optional[str]): The root directory for storing history logs.
+            lazy (bool): Register the children of supervisors as LazyNode stand-ins that
+                are built on first delegation (see xronai.core.lazy), so only the root is
+                built up front.
 
         Returns:
             Union[Supervisor, Agent]: The root Supervisor or Agent of the created workflow.
@@ -46,17 +56,75 @@ class AgentFactory:
             return await AgentFactory._create_supervisor(config['supervisor'],
                                                          is_root=True,
                                                          workflow_id=workflow_id,
-                                                         history_base_path=history_base_path)
+                                                         history_base_path=history_base_path,
+                                                         lazy=lazy)
         elif 'agent' in config:
             return await AgentFactory._create_agent(config['agent'],
                                                     workflow_id=workflow_id,
                                                     history_base_path=history_base_path)
 
+    @staticmethod
+    async def compile(config: Dict[str, Any]) -> WorkflowTemplate:
+        """
+        Compile a configuration into a template that builds its workflow for each session.
+
+        The configuration is validated and copied, its tools are imported and the tools of
+        its MCP servers are discovered once, here.
+
+        Args:
+            config (Dict[str, Any]): The configuration dictionary containing
+                the entire hierarchy structure.
+
+        Returns:
+            WorkflowTemplate: The compiled workflow.
+
+        Raises:
+            ConfigValidationError: If the configuration is invalid.
+        """
+        ConfigValidator.validate(config)
+        config = copy.deepcopy(config)
+
+        if 'supervisor' in config:
+            root = await AgentFactory._compile_supervisor(config['supervisor'])
+        else:
+            root = await AgentFactory._compile_agent(config['agent'])
+        return WorkflowTemplate(config, root)
+
+    @staticmethod
+    async def _compile_supervisor(supervisor_config: Dict[str, Any]) -> NodeTemplate:
+        """Compile a Supervisor and its children."""
+        children = []
+        for child_config in supervisor_config.get('children', []):
+            if child_config['type'] == 'supervisor':
+                children.append(await AgentFactory._compile_supervisor(child_config))
+            else:
+                children.append(await AgentFactory._compile_agent(child_config))
+
+        params = {
+            'name': supervisor_config['name'],
+            'llm_config': supervisor_config['llm_config'],
+            'system_message': supervisor_config['system_message'],
+            'is_assistant': supervisor_config.get('is_assistant', False)
+        }
+        return NodeTemplate(supervisor_config['name'], params, is_supervisor=True, children=children)
+
+    @staticmethod
+    async def _compile_agent(agent_config: Dict[str, Any]) -> NodeTemplate:
+        """Compile an Agent: import its tools and discover the tools of its MCP servers."""
+        params = AgentFactory._agent_params(agent_config)
+        return NodeTemplate(agent_config['name'],
+                            params,
+                            description=Agent.compose_system_message(params['system_message'],
+                                                                     params['output_schema']),
+                            tools=AgentFactory._compile_tools(agent_config.get('tools', [])),
+                            mcp_tools=await Agent.discover_mcp_tools(params['mcp_servers']))
+
     @staticmethod
     async def _create_supervisor(supervisor_config: Dict[str, Any],
                                  is_root: bool = False,
                                  workflow_id: Optional[str] = None,
-                                 history_base_path: Optional[str] = None) -> Supervisor:
+                                 history_base_path: Optional[str] = None,
+                                 lazy: bool = False) -> Supervisor:
         """
         Create a Supervisor instance and its children from a configuration dictionary.
 
@@ -65,6 +133,7 @@ class AgentFactory:
             is_root (bool): Whether this Supervisor is the root of the hierarchy.
             workflow_id (Optional[str]): ID of the workflow (only for root supervisor).
             history_base_path (Optional[str]): The root directory for storing history logs.
+            lazy (bool): Register the children as LazyNode stand-ins instead of building them.
 
         Returns:
             Supervisor: The created Supervisor instance with all its children.
@@ -77,7 +146,9 @@ class AgentFactory:
                                 history_base_path=history_base_path)
 
         for child_config in supervisor_config.get('children', []):
-            if child_config['type'] == 'supervisor':
+            if lazy:
+                child = AgentFactory._create_lazy_node(child_config, history_base_path=history_base_path)
+            elif child_config['type'] == 'supervisor':
                 child = await AgentFactory._create_supervisor(child_config,
                                                               is_root=False,
                                                               workflow_id=None,
@@ -88,6 +159,34 @@ class AgentFactory:
 
         return supervisor
 
+    @staticmethod
+    def _create_lazy_node(child_config: Dict[str, Any], history_base_path: Optional[str] = None) -> LazyNode:
+        """
+        Create a stand-in for a child of a supervisor that is built on first delegation.
+
+        A supervisor built from the stand-in registers its own children lazily as well.
+
+        Args:
+            child_config (Dict[str, Any]): The configuration of the Agent or assistant Supervisor.
+            history_base_path (Optional[str]): The root directory for storing history logs.
+
+        Returns:
+            LazyNode: The stand-in.
+        """
+        if child_config['type'] == 'supervisor':
+            return LazyNode(child_config['name'],
+                            child_config['system_message'],
+                            builder=lambda: _run_sync(
+                                AgentFactory._create_supervisor(
+                                    child_config, is_root=False, history_base_path=history_base_path, lazy=True)),
+                            is_supervisor=True)
+
+        return LazyNode(child_config['name'],
+                        Agent.compose_system_message(child_config['system_message'],
+                                                     child_config.get('output_schema')),
+                        builder=lambda: _run_sync(
+                            AgentFactory._create_agent(child_config, history_base_path=history_base_path)))
+
     @staticmethod
     async def _create_agent(agent_config: Dict[str, Any],
                             workflow_id: Optional[str] = None,
@@ -103,49 +202,73 @@ class AgentFactory:
         Returns:
             Agent: The created Agent instance with its tools.
         """
-        tools = AgentFactory._create_tools(agent_config.get('tools', []))
+        agent = Agent(**AgentFactory._agent_params(agent_config),
+                      tools=AgentFactory._create_tools(agent_config.get('tools', [])),
+                      workflow_id=workflow_id,
+                      history_base_path=history_base_path)
+        await agent._load_mcp_tools()
+        return agent
 
-        agent_params = {
+    @staticmethod
+    def _agent_params(agent_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the constructor arguments of an Agent, except its tools, workflow id and history path."""
+        return {
             'name': agent_config['name'],
             'llm_config': agent_config['llm_config'],
             'system_message': agent_config['system_message'],
-            'workflow_id': workflow_id,
-            'tools': tools,
             'use_tools': agent_config.get('use_tools',
-                                          bool(tools) or bool(agent_config.get('mcp_servers'))),
+                                          bool(agent_config.get('tools')) or bool(agent_config.get('mcp_servers'))),
             'keep_history': agent_config.get('keep_history', True),
             'output_schema': agent_config.get('output_schema'),
             'strict': agent_config.get('strict', False),
             'mcp_servers': agent_config.get('mcp_servers', []),
-            'history_base_path': history_base_path
+            'tool_result_max_chars': agent_config.get('tool_result_max_chars')
         }
 
-        agent = Agent(**agent_params)
-        await agent._load_mcp_tools()
-        return agent
-
     @staticmethod
     def _create_tools(tools_config: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Create a list of tool configurations from the provided tool configs.
 
+        Tools with ``executor: process`` are not imported here; they run in a shared
+        pool of worker processes that import them instead. Tools with ``stream_output: true``
+        are passed an ``on_output`` callback whose output the agent emits as events. A
+        ``cache`` setting is kept as it is, so every workflow built from the configuration
+        shares the tool's cache (see xronai.tools.tool_cache).
+
         Args:
             tools_config (List[Dict[str, Any]]): List of tool configurations.
 
         Returns:
             List[Dict[str, Any]]: List of created tool configurations.
         """
+        return [tool.build() for tool in AgentFactory._compile_tools(tools_config)]
+
+    @staticmethod
+    def _compile_tools(tools_config: List[Dict[str, Any]]) -> List[ToolTemplate]:
+        """
+        Import the tools of an agent and build their metadata.
+
+        Tools defined as classes are imported but not instantiated; each agent built from
+        the returned templates gets its own instance.
+
+        Args:
+            tools_config (List[Dict[str, Any]]): List of tool configurations.
+
+        Returns:
+            List[ToolTemplate]: The compiled tools.
+        """
         tools = []
         for tool_config in tools_config:
-            imported_obj = AgentFactory._import_function(tool_config['python_path'])
-            tool_function = None
-
-            if isinstance(imported_obj, type):
-                tool_init_config = tool_config.get('config', {})
-                tool_instance = imported_obj(**tool_init_config)
-                tool_function = tool_instance.execute
+            tool_function, tool_class = None, None
+            if tool_config.get('executor') == 'process':
+                tool_function = get_process_pool(tool_config).as_tool()
             else:
-                tool_function = imported_obj
+                imported_obj = AgentFactory._import_function(tool_config['python_path'])
+                if isinstance(imported_obj, type):
+                    tool_class = imported_obj
+                else:
+                    tool_function = imported_obj
 
             metadata = {
                 "type": "function",
@@ -159,7 +282,15 @@ class AgentFactory:
                     }
                 }
             }
-            tools.append({"tool": tool_function, "metadata": metadata})
+            tool = {"tool": tool_function, "metadata": metadata}
+            if tool_config.get('policy'):
+                tool["policy"] = ToolPolicy.from_config(tool_config['policy'])
+            if tool_config.get('stream_output'):
+                tool["streaming"] = True
+            if tool_config.get('cache'):
+                tool["cache"] = tool_config['cache']
+                tool["cache_id"] = tool_cache_id(tool_config['python_path'], tool_config.get('config'))
+            tools.append(ToolTemplate(tool, tool_class=tool_class, init_config=tool_config.get('config', {})))
         return tools
 
     @staticmethod
@@ -180,3 +311,13 @@ class AgentFactory:
         module_name, object_name = python_path.rsplit('.', 1)
         module = importlib.import_module(module_name)
         return getattr(module, object_name)
+
+
+def _run_sync(coroutine):
+    """Run a coroutine to completion from synchronous code, even if an event loop is running in this thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
@@ -118,6 +118,11 @@ class ConfigValidator:
             if field in agent and not isinstance(agent[field], bool):
                 raise ConfigValidationError(f"'{field}' must be a boolean value")
 
+        if agent.get('tool_result_max_chars') is not None:
+            value = agent['tool_result_max_chars']
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1000:
+                raise ConfigValidationError("'tool_result_max_chars' must be an integer of at least 1000, or null")
+
         if 'output_schema' in agent:
             if not isinstance(agent['output_schema'], dict):
                 raise ConfigValidationError("output_schema must be a dictionary")
@@ -136,6 +141,8 @@ class ConfigValidator:
                     raise ConfigValidationError("SSE MCP server must have 'url' field")
                 if server['type'] == 'stdio' and 'script_path' not in server:
                     raise ConfigValidationError("stdio MCP server must have 'script_path' field")
+                if 'policy' in server:
+                    ConfigValidator._validate_policy(server['policy'])
 
         ConfigValidator._validate_llm_config(agent['llm_config'])
         ConfigValidator._validate_tools(agent.get('tools', []))
@@ -156,6 +163,82 @@ class ConfigValidator:
             if field not in llm_config:
                 raise ConfigValidationError(f"Missing required field '{field}' in llm_config")
 
+        if 'retry' in llm_config:
+            retry = llm_config['retry']
+            if not isinstance(retry, dict):
+                raise ConfigValidationError("llm_config 'retry' must be a dictionary")
+            for field, value in retry.items():
+                if field not in ['max_retries', 'backoff', 'max_backoff', 'max_retry_after']:
+                    raise ConfigValidationError(f"Unknown retry field '{field}' in llm_config")
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                    raise ConfigValidationError(f"Retry field '{field}' must be a non-negative number")
+
+        if 'rate_limit' in llm_config:
+            rate_limit = llm_config['rate_limit']
+            if not isinstance(rate_limit, dict):
+                raise ConfigValidationError("llm_config 'rate_limit' must be a dictionary")
+            for field, value in rate_limit.items():
+                if field not in ['rpm', 'tpm']:
+                    raise ConfigValidationError(f"Unknown rate_limit field '{field}' in llm_config")
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                    raise ConfigValidationError(f"Rate limit '{field}' must be a positive number")
+
+        models = [llm_config['model']]
+        if 'endpoints' in llm_config:
+            if not isinstance(llm_config['endpoints'], list) or not llm_config['endpoints']:
+                raise ConfigValidationError("llm_config 'endpoints' must be a non-empty list")
+            for endpoint in llm_config['endpoints']:
+                if not isinstance(endpoint, dict) or 'model' not in endpoint:
+                    raise ConfigValidationError("Each llm_config endpoint must be a dictionary with a 'model' field")
+                if 'endpoints' in endpoint or 'routing' in endpoint or 'hedging' in endpoint:
+                    raise ConfigValidationError("llm_config endpoints cannot have their own endpoints, "
+                                                "routing or hedging")
+                inherited = {k: v for k, v in llm_config.items() if k not in ['endpoints', 'routing', 'hedging']}
+                ConfigValidator._validate_llm_config({**inherited, **endpoint})
+                models.append(endpoint['model'])
+
+        if 'routing' in llm_config:
+            routing = llm_config['routing']
+            if not isinstance(routing, dict):
+                raise ConfigValidationError("llm_config 'routing' must be a dictionary")
+            for field, value in routing.items():
+                if field not in ['fallback_on', 'timeout', 'hedge_after', 'short_prompt']:
+                    raise ConfigValidationError(f"Unknown routing field '{field}' in llm_config")
+            fallback_on = routing.get('fallback_on', [])
+            if not isinstance(fallback_on, list) or any(c not in ['error', 'timeout'] for c in fallback_on):
+                raise ConfigValidationError("routing 'fallback_on' must be a list of 'error' and/or 'timeout'")
+            for field in ['timeout', 'hedge_after']:
+                value = routing.get(field)
+                if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or
+                                          value <= 0):
+                    raise ConfigValidationError(f"routing '{field}' must be a positive number")
+            if 'short_prompt' in routing:
+                short_prompt = routing['short_prompt']
+                if not isinstance(short_prompt, dict) or 'max_chars' not in short_prompt or 'model' not in short_prompt:
+                    raise ConfigValidationError("routing 'short_prompt' must have 'max_chars' and 'model' fields")
+                if short_prompt['model'] not in models:
+                    raise ConfigValidationError(
+                        f"routing 'short_prompt' model '{short_prompt['model']}' is not one of the llm_config models")
+
+        if 'hedging' in llm_config:
+            hedging = llm_config['hedging']
+            if not isinstance(hedging, dict):
+                raise ConfigValidationError("llm_config 'hedging' must be a dictionary")
+            for field, value in hedging.items():
+                if field not in ['percentile', 'min_samples', 'initial_delay', 'min_delay', 'max_delay', 'budget',
+                                 'endpoint']:
+                    raise ConfigValidationError(f"Unknown hedging field '{field}' in llm_config")
+                if field == 'endpoint':
+                    if value not in models:
+                        raise ConfigValidationError(
+                            f"hedging 'endpoint' model '{value}' is not one of the llm_config models")
+                elif isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                    raise ConfigValidationError(f"hedging '{field}' must be a non-negative number")
+            if not 0 < hedging.get('percentile', 95) < 100:
+                raise ConfigValidationError("hedging 'percentile' must be between 0 and 100")
+            if not 0 <= hedging.get('budget', 0.05) <= 1:
+                raise ConfigValidationError("hedging 'budget' must be between 0 and 1")
+
     @staticmethod
     def _validate_tools(tools: List[Dict[str, Any]]) -> None:
         """
@@ -175,3 +258,81 @@ class ConfigValidator:
 
             if tool['type'] not in ['function', 'class']:
                 raise ConfigValidationError(f"Invalid tool type: {tool['type']}. Must be 'function' or 'class'.")
+
+            executor = tool.get('executor', 'inline')
+            if executor not in ['inline', 'process']:
+                raise ConfigValidationError(f"Invalid tool executor: {executor}. Must be 'inline' or 'process'.")
+
+            for field in ['workers', 'timeout', 'max_memory_mb', 'max_tasks_per_worker']:
+                if field not in tool:
+                    continue
+                if executor != 'process':
+                    raise ConfigValidationError(f"Tool field '{field}' requires 'executor: process'")
+                value = tool[field]
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                    raise ConfigValidationError(f"Tool field '{field}' must be a positive number")
+
+            if 'stream_output' in tool:
+                if not isinstance(tool['stream_output'], bool):
+                    raise ConfigValidationError("Tool field 'stream_output' must be a boolean")
+                if tool['stream_output'] and executor == 'process':
+                    raise ConfigValidationError("Tool field 'stream_output' is not supported with 'executor: process'")
+
+            if 'policy' in tool:
+                ConfigValidator._validate_policy(tool['policy'])
+
+            if 'cache' in tool:
+                ConfigValidator._validate_cache(tool['cache'])
+
+    @staticmethod
+    def _validate_cache(cache: Any) -> None:
+        """
+        Validate the result cache settings of a tool.
+
+        Args:
+            cache (Any): True, False, or a dictionary of cache settings.
+
+        Raises:
+            ConfigValidationError: If the settings are invalid.
+        """
+        if isinstance(cache, bool):
+            return
+        if not isinstance(cache, dict):
+            raise ConfigValidationError("cache must be a boolean or a dictionary")
+
+        for field, value in cache.items():
+            if field not in ['ttl', 'max_entries', 'path']:
+                raise ConfigValidationError(f"Unknown cache field '{field}'")
+            if field == 'path':
+                if not isinstance(value, str) or not value:
+                    raise ConfigValidationError("Cache field 'path' must be a non-empty string")
+            elif value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                raise ConfigValidationError(f"Cache field '{field}' must be a positive number")
+        if isinstance(cache.get('max_entries'), float):
+            raise ConfigValidationError("Cache field 'max_entries' must be an integer")
+
+    @staticmethod
+    def _validate_policy(policy: Dict[str, Any]) -> None:
+        """
+        Validate the execution policy of a tool or MCP server.
+
+        Args:
+            policy (Dict[str, Any]): The policy configuration to validate.
+
+        Raises:
+            ConfigValidationError: If the policy is invalid.
+        """
+        if not isinstance(policy, dict):
+            raise ConfigValidationError("policy must be a dictionary")
+
+        allowed_fields = ['timeout', 'retries', 'backoff', 'backoff_multiplier', 'max_backoff', 'failure_threshold',
+                          'reset_timeout', 'fallback']
+        for field, value in policy.items():
+            if field not in allowed_fields:
+                raise ConfigValidationError(f"Unknown policy field '{field}'")
+            if field == 'fallback':
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ConfigValidationError(f"Policy field '{field}' must be a non-negative number")
+            if field in ['retries', 'failure_threshold'] and not isinstance(value, int):
+                raise ConfigValidationError(f"Policy field '{field}' must be an integer")
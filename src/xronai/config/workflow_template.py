@@ -0,0 +1,158 @@
+"""
+Compiled workflow configurations.
+
+Building a workflow from its configuration validates it, imports every tool and
+discovers the tools of every MCP server. A server or batch job that builds the same
+workflow for every session would repeat that work each time. ``AgentFactory.compile``
+does it once and returns a ``WorkflowTemplate``, which then builds the workflow of a
+session from the compiled parts:
+
+    template = await AgentFactory.compile(config)
+    entry_point = template.instantiate(session_id, history_base_path="xronai_sessions")
+
+Instances share the template's imported tool functions, tool metadata, policies,
+process pools and discovered MCP tools. Tools defined as classes are instantiated for
+every instance, since they may hold session state (the shell of a TerminalTool, for
+example). Each instance owns its chat history, history manager and workflow id, so
+instances of one template can serve different sessions at the same time.
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional, Union
+from xronai.core import Agent, Supervisor, LazyNode
+
+
+class ToolTemplate:
+    """
+    A tool compiled from its configuration.
+
+    Attributes:
+        entry (Dict[str, Any]): The tool dictionary given to agents. Its 'tool' is None
+            for tools defined as classes.
+        tool_class (Optional[type]): The class of a tool defined as a class.
+        init_config (Dict[str, Any]): Keyword arguments the class is instantiated with.
+    """
+
+    def __init__(self,
+                 entry: Dict[str, Any],
+                 tool_class: Optional[type] = None,
+                 init_config: Optional[Dict[str, Any]] = None):
+        """Initialize the template. See the class attributes for the meaning of each argument."""
+        self.entry = entry
+        self.tool_class = tool_class
+        self.init_config = init_config or {}
+
+    def build(self) -> Dict[str, Any]:
+        """Return the tool dictionary of one agent, instantiating the tool if it is a class."""
+        if self.tool_class is None:
+            return self.entry
+        return dict(self.entry, tool=self.tool_class(**self.init_config).execute)
+
+
+class NodeTemplate:
+    """
+    A compiled Agent or Supervisor.
+
+    Attributes:
+        name (str): Name of the node.
+        params (Dict[str, Any]): Constructor arguments of the node, except its tools,
+            workflow id and history path.
+        is_supervisor (bool): Whether the node is a Supervisor.
+        description (str): The system message the node is offered to its parent with.
+        tools (List[ToolTemplate]): The configured tools of an Agent.
+        mcp_tools (List[Dict[str, Any]]): The tools discovered from the MCP servers of an Agent.
+        children (List[NodeTemplate]): The children of a Supervisor.
+    """
+
+    def __init__(self,
+                 name: str,
+                 params: Dict[str, Any],
+                 is_supervisor: bool = False,
+                 description: Optional[str] = None,
+                 tools: Optional[List[ToolTemplate]] = None,
+                 mcp_tools: Optional[List[Dict[str, Any]]] = None,
+                 children: Optional[List['NodeTemplate']] = None):
+        """Initialize the template. See the class attributes for the meaning of each argument."""
+        self.name = name
+        self.params = params
+        self.is_supervisor = is_supervisor
+        self.description = description if description is not None else params.get('system_message', '')
+        self.tools = tools or []
+        self.mcp_tools = mcp_tools or []
+        self.children = children or []
+
+    def build(self,
+              workflow_id: Optional[str] = None,
+              history_base_path: Optional[str] = None,
+              lazy: bool = False) -> Union[Supervisor, Agent]:
+        """
+        Build the node and, for a Supervisor, its children.
+
+        Args:
+            workflow_id (Optional[str]): The session of a root node. Children are assigned
+                to their parent's session when they are registered.
+            history_base_path (Optional[str]): The root directory for storing history logs.
+            lazy (bool): Register the children as LazyNode stand-ins instead of building them.
+
+        Returns:
+            Union[Supervisor, Agent]: The node.
+        """
+        if not self.is_supervisor:
+            return Agent(**self.params,
+                         tools=[tool.build() for tool in self.tools],
+                         mcp_tools=self.mcp_tools,
+                         workflow_id=workflow_id,
+                         history_base_path=history_base_path)
+
+        supervisor = Supervisor(**self.params, workflow_id=workflow_id, history_base_path=history_base_path)
+        for child in self.children:
+            if lazy:
+                supervisor.register_agent(child.stand_in(history_base_path=history_base_path))
+            else:
+                supervisor.register_agent(child.build(history_base_path=history_base_path))
+        return supervisor
+
+    def stand_in(self, history_base_path: Optional[str] = None) -> LazyNode:
+        """Return a LazyNode that builds the node, with lazy children, on first delegation."""
+        return LazyNode(self.name,
+                        self.description,
+                        builder=lambda: self.build(history_base_path=history_base_path, lazy=True),
+                        is_supervisor=self.is_supervisor)
+
+
+class WorkflowTemplate:
+    """
+    A workflow configuration compiled once and instantiated for every session.
+
+    Attributes:
+        config (Dict[str, Any]): The validated configuration.
+        root (NodeTemplate): The compiled root Supervisor or Agent.
+    """
+
+    def __init__(self, config: Dict[str, Any], root: NodeTemplate):
+        """Initialize the template. See the class attributes for the meaning of each argument."""
+        self.config = config
+        self.root = root
+
+    def instantiate(self,
+                    workflow_id: Optional[str] = None,
+                    history_base_path: Optional[str] = None,
+                    lazy: bool = False) -> Union[Supervisor, Agent]:
+        """
+        Build a workflow from the template.
+
+        Args:
+            workflow_id (Optional[str]): The session of the workflow. Defaults to the
+                configuration's workflow_id, or a new id.
+            history_base_path (Optional[str]): The root directory for storing history logs.
+            lazy (bool): Build the children of supervisors on first delegation
+                (see xronai.core.lazy).
+
+        Returns:
+            Union[Supervisor, Agent]: The root Supervisor or Agent of the workflow.
+        """
+        workflow_id = workflow_id or self.config.get('workflow_id') or str(uuid.uuid4())
+        return self.root.build(workflow_id=workflow_id, history_base_path=history_base_path, lazy=lazy)
+
+    def __repr__(self) -> str:
+        return f"WorkflowTemplate(root={self.root.name})"
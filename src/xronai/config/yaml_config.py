@@ -3,22 +3,59 @@ YAML configuration loader module.
 
 This module provides functions for loading YAML configuration files
 and expanding environment variables within the configuration.
+
+Files are parsed with libyaml's C loader when PyYAML was built with it. Loaded
+configurations are cached per file for the whole process: loading a file again
+returns a copy of the cached configuration as long as the file's modification time
+and size and the values of the environment variables it references are unchanged.
 """
 
 import os
+import re
+import copy
+import threading
+import collections
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set, Tuple
+from .config_validator import ConfigValidator
+
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Variable references understood by os.path.expandvars: $NAME and ${NAME}.
+_ENV_VAR = re.compile(r'\$(\w+|\{[^}]*\})')
+
+CACHE_SIZE = 32
+
+
+class _CachedConfig:
+    """A parsed configuration file and its last expansion."""
+
+    def __init__(self, stat_key: Tuple[int, int], raw: Any, env_vars: Set[str]):
+        self.stat_key = stat_key
+        self.raw = raw
+        self.env_vars = env_vars
+        self.env_values: Optional[Tuple[Optional[str], ...]] = None
+        self.expanded: Any = None
+        self.validated = False
+
 
+_cache: 'collections.OrderedDict[str, _CachedConfig]' = collections.OrderedDict()
+_cache_lock = threading.Lock()
 
-def load_yaml_config(file_path: str) -> Dict[str, Any]:
+
+def load_yaml_config(file_path: str, validate: bool = False) -> Dict[str, Any]:
     """
     Load a YAML configuration file and expand its environment variables.
 
     This function reads a YAML file, parses its contents, and then
     expands any environment variables found within the configuration.
+    The result is cached (see the module docstring); the caller receives
+    its own copy and may modify it.
 
     Args:
         file_path (str): The path to the YAML configuration file.
+        validate (bool): Also validate the configuration with ConfigValidator. A cached
+            configuration is only validated once.
 
     Returns:
         Dict[str, Any]: The loaded and processed configuration as a dictionary.
@@ -27,11 +64,27 @@ def load_yaml_config(file_path: str) -> Dict[str, Any]:
         FileNotFoundError: If the specified file_path does not exist.
         yaml.YAMLError: If there's an error parsing the YAML file.
         IOError: If there's an error reading the file.
+        ConfigValidationError: If validate is True and the configuration is invalid.
     """
+    path = os.path.abspath(file_path)
     try:
-        with open(file_path, 'r') as file:
-            config = yaml.safe_load(file)
-        return expand_env_vars(config)
+        stat = os.stat(path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        with _cache_lock:
+            entry = _cache.get(path)
+            if entry is not None:
+                _cache.move_to_end(path)
+
+        if entry is None or entry.stat_key != stat_key:
+            with open(path, 'r') as file:
+                raw = yaml.load(file, Loader=_Loader)
+            env_vars: Set[str] = set()
+            _collect_env_vars(raw, env_vars)
+            entry = _CachedConfig(stat_key, raw, env_vars)
+            with _cache_lock:
+                _cache[path] = entry
+                while len(_cache) > CACHE_SIZE:
+                    _cache.popitem(last=False)
     except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {file_path}")
     except yaml.YAMLError as e:
@@ -39,6 +92,16 @@ def load_yaml_config(file_path: str) -> Dict[str, Any]:
     except IOError as e:
         raise IOError(f"Error reading configuration file: {e}")
 
+    env_values = tuple(os.environ.get(name) for name in sorted(entry.env_vars))
+    with _cache_lock:
+        if entry.env_values != env_values:
+            entry.expanded, entry.env_values, entry.validated = expand_env_vars(entry.raw), env_values, False
+        if validate and not entry.validated:
+            ConfigValidator.validate(entry.expanded)
+            entry.validated = True
+        expanded = entry.expanded
+    return copy.deepcopy(expanded)
+
 
 def expand_env_vars(config: Any) -> Any:
     """
@@ -63,6 +126,19 @@ def expand_env_vars(config: Any) -> Any:
         return {k: expand_env_vars(v) for k, v in config.items()}
     elif isinstance(config, list):
         return [expand_env_vars(i) for i in config]
-    elif isinstance(config, str):
+    elif isinstance(config, str) and '$' in config:
         return os.path.expandvars(config)
     return config
+
+
+def _collect_env_vars(config: Any, names: Set[str]) -> None:
+    """Add the names of the environment variables a configuration references to names."""
+    if isinstance(config, dict):
+        for value in config.values():
+            _collect_env_vars(value, names)
+    elif isinstance(config, list):
+        for item in config:
+            _collect_env_vars(item, names)
+    elif isinstance(config, str) and '$' in config:
+        for match in _ENV_VAR.finditer(config):
+            names.add(match.group(1).strip('{}'))
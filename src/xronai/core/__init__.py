@@ -1,5 +1,27 @@
-from .ai import AI
-from .agents import Agent
-from .supervisor import Supervisor
+import importlib
+from typing import Any, List
 
-__all__ = ['AI', 'Agent', 'Supervisor']
+__all__ = ['AI', 'Agent', 'Supervisor', 'CancellationToken', 'RunCancelledError', 'LazyNode']
+
+# Imported on first access, so that modules needing only the light classes (cancellation,
+# lazy nodes) do not import the OpenAI and MCP clients.
+_LAZY_IMPORTS = {
+    'AI': '.ai',
+    'Agent': '.agents',
+    'Supervisor': '.supervisor',
+    'CancellationToken': '.cancellation',
+    'RunCancelledError': '.cancellation',
+    'LazyNode': '.lazy',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
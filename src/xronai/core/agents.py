@@ -8,14 +8,16 @@ with additional features like tool usage and chat history management.
 import json, asyncio, uuid
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional, Any, Callable
+from typing import List, Dict, Optional, Any, Callable, Tuple
 from openai.types.chat import ChatCompletionMessage
 from xronai.core.ai import AI
-from xronai.history import HistoryManager, EntityType
+from xronai.core.cancellation import CancellationToken, RunCancelledError
+from xronai.history import HistoryManager, EntityType, RunCheckpoint, BlobStore
+from xronai.tools.execution import ToolPolicy, execute_tool
+from xronai.tools.tool_cache import tool_cache_id
 from xronai.utils import Debugger
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.sse import sse_client
-from mcp.client.stdio import stdio_client
+
+READ_TOOL_OUTPUT = "read_tool_output"
 
 
 class Agent(AI):
@@ -38,7 +40,10 @@ class Agent(AI):
                  mcp_servers: Optional[List[Dict[str, Any]]] = None,
                  output_schema: Optional[Dict[str, Any]] = None,
                  strict: bool = False,
-                 history_base_path: Optional[str] = None):
+                 history_base_path: Optional[str] = None,
+                 tool_result_max_chars: Optional[int] = None,
+                 mcp_tools: Optional[List[Dict[str, Any]]] = None,
+                 checkpoint_runs: bool = False):
         """
         Initialize the Agent instance.
 
@@ -56,10 +61,20 @@ class Agent(AI):
                 List of dicts, where each defines an MCP server/proxy:
                 - For remote/SSE: {'type': 'sse', 'url': ..., 'auth_token': ...}
                 - For local/stdio: {'type': 'stdio', 'script_path': 'server.py'}
+                Either may add a 'policy' dict (see xronai.tools.execution.ToolPolicy)
+                applied to all of its tools.
                 All discovered tools are available as functions to the agent.
             output_schema (Optional[Dict[str, Any]]): Schema for agent's output format.
             strict (bool): If True, always enforce output schema.
             history_base_path (Optional[str]): The root directory for storing history logs.
+            tool_result_max_chars (Optional[int]): Longest tool result kept in the chat history.
+                A longer result is stored once in the session's blob store, the history keeps
+                its beginning and a reference, and a ``read_tool_output`` tool is registered
+                to page through the rest. None, the default, keeps every result in full.
+            mcp_tools (Optional[List[Dict[str, Any]]]): Tools already discovered from
+                ``mcp_servers`` by ``discover_mcp_tools``. If given, discovery is skipped.
+            checkpoint_runs (bool): Checkpoint the runs this agent answers as the entry point,
+                so they can be continued with ``resume`` (see xronai.history.checkpoint).
 
         Raises:
             ValueError: If the name is empty.
@@ -73,7 +88,7 @@ class Agent(AI):
         self.workflow_id = workflow_id
         self.history_base_path = history_base_path
         self.use_tools = use_tools
-        self.tools = tools or []
+        self.tools = list(tools or [])
         self.system_message = system_message
         self.keep_history = keep_history
         self.history_manager = None
@@ -84,6 +99,16 @@ class Agent(AI):
         self._mcp_tool_names = set()
         self.output_schema = output_schema
         self.strict = strict
+        self.tool_result_max_chars = tool_result_max_chars
+        self.checkpoint_runs = checkpoint_runs
+        self._memory_blobs = BlobStore()
+
+        if mcp_tools is not None:
+            self.tools.extend(mcp_tools)
+            self._mcp_tool_names = {tool['metadata']['function']['name'] for tool in mcp_tools}
+
+        if self.tool_result_max_chars and (self.tools or self.mcp_servers):
+            self.tools.append(self._read_tool_output_tool())
 
         if system_message:
             self.set_system_message(system_message)
@@ -94,7 +119,7 @@ class Agent(AI):
         try:
             asyncio.get_running_loop()
         except RuntimeError:
-            if self.mcp_servers:
+            if self.mcp_servers and mcp_tools is None:
                 asyncio.run(self._load_mcp_tools())
 
     def _initialize_workflow(self):
@@ -172,14 +197,27 @@ class Agent(AI):
         Args:
             message (str): The system message to set.
         """
-        if self.output_schema:
+        self.system_message = self.compose_system_message(message, self.output_schema)
+        self._reset_chat_history()
+
+    @staticmethod
+    def compose_system_message(message: str, output_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Return the system message an agent uses, including the output schema instruction if any.
+
+        Args:
+            message (str): The configured system message.
+            output_schema (Optional[Dict[str, Any]]): Schema for the agent's output format.
+
+        Returns:
+            str: The system message.
+        """
+        if output_schema:
             schema_instruction = ("\n\nYOU MUST ALWAYS RESPOND IN THE FOLLOWING FORMAT:\n"
-                                  f"{json.dumps(self.output_schema, indent=2)}\n"
+                                  f"{json.dumps(output_schema, indent=2)}\n"
                                   "Your entire response must be valid JSON matching this schema.\n")
             message = message + schema_instruction
-
-        self.system_message = message
-        self._reset_chat_history()
+        return message
 
     def _validate_and_format_response(self, response: str) -> str:
         """
@@ -216,27 +254,46 @@ class Agent(AI):
                 self.debugger.log("Schema enforcement failed", level="error")
                 return response
 
-    def chat(self, query: str, sender_name: Optional[str] = None, on_event: Optional[Callable] = None) -> str:
+    def chat(self,
+             query: str,
+             sender_name: Optional[str] = None,
+             on_event: Optional[Callable] = None,
+             cancel_token: Optional[CancellationToken] = None,
+             checkpoint: Optional[RunCheckpoint] = None) -> str:
         """
         Process a chat interaction with the agent.
 
+        When the agent is the entry point, keeps a history and has ``checkpoint_runs`` set,
+        the run is checkpointed after every step and can be continued with ``resume`` if
+        it is interrupted.
+
         Args:
             query (str): The query to process.
             sender_name (Optional[str]): Name of the entity sending the query.
                                        If None, this agent is treated as the top-level entry point.
             on_event (Optional[Callable]): A callback function to stream events to.
+            cancel_token (Optional[CancellationToken]): Token that stops the run between
+                LLM requests and tool calls once cancelled or past its deadline.
+            checkpoint (Optional[RunCheckpoint]): Checkpoint of the run this query belongs
+                to, passed on by a delegating Supervisor.
 
         Returns:
             str: The agent's response to the query.
 
         Raises:
             RuntimeError: If there's an error processing the query or using tools.
+            RunCancelledError: If the run was cancelled or its deadline has passed.
         """
         self.debugger.log(f"Query received from {sender_name or 'direct'}: {query}")
 
         is_entry_point = sender_name is None
         if is_entry_point:
-            self._emit_event(on_event, "WORKFLOW_START", {"user_query": query})
+            if self.history_manager and self.checkpoint_runs:
+                checkpoint = RunCheckpoint.start(self.history_manager.workflow_path, self.name, query)
+            self._emit_event(on_event, "WORKFLOW_START", {
+                "user_query": query,
+                "run_id": checkpoint.run_id if checkpoint else None
+            })
 
         if not self.keep_history:
             self._reset_chat_history()
@@ -251,11 +308,98 @@ class Agent(AI):
                                                                sender_type=sender_type,
                                                                sender_name=sender_name or "user")
 
+        if checkpoint:
+            checkpoint.push_frame(self.name, query, sender_name, query_msg_id, len(self.chat_history))
+
+        return self._chat_loop(query_msg_id, is_entry_point, on_event, cancel_token, checkpoint)
+
+    def resume(self,
+               run_id: str,
+               on_event: Optional[Callable] = None,
+               cancel_token: Optional[CancellationToken] = None) -> str:
+        """
+        Continue an interrupted run from its last completed step.
+
+        LLM requests and tool calls that completed before the interruption are not
+        repeated. A tool call that was in progress is run again.
+
+        Args:
+            run_id (str): ID of the run, as reported in its WORKFLOW_START event.
+            on_event (Optional[Callable]): A callback function to stream events to.
+            cancel_token (Optional[CancellationToken]): Token that stops the run.
+
+        Returns:
+            str: The agent's response to the run's query.
+
+        Raises:
+            ValueError: If the agent keeps no history, or the run does not exist (runs that
+                completed are not kept) or was not started on this agent.
+            RuntimeError: If there's an error processing the query or using tools.
+            RunCancelledError: If the run was cancelled or its deadline has passed.
+        """
+        if not self.history_manager:
+            raise ValueError("Runs can only be resumed by an agent with a workflow history")
+
+        checkpoint = RunCheckpoint.load(self.history_manager.workflow_path, run_id, entity=self.name)
+        if checkpoint.status == RunCheckpoint.COMPLETED:
+            return checkpoint.response
+
+        self.debugger.log(f"Resuming run {run_id} at depth {len(checkpoint.frames)}")
+        checkpoint.finish(RunCheckpoint.RUNNING)
+        self._emit_event(on_event, "WORKFLOW_START", {"user_query": checkpoint.query, "run_id": run_id, "resumed": True})
+        return self._resume_frame(checkpoint, 0, on_event, cancel_token)
+
+    def _resume_frame(self,
+                      checkpoint: RunCheckpoint,
+                      depth: int,
+                      on_event: Optional[Callable] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> str:
+        """Rebuild the chat history of a checkpointed frame from the session history and continue its loop."""
+        frame = checkpoint.frames[depth]
+        self.chat_history = checkpoint.restore_history(depth, self.history_manager, self.chat_history)
+
+        pending = None
+        last = self.chat_history[-1] if self.chat_history else {}
+        if last.get('role') == 'assistant' and last.get('tool_calls'):
+            pending = (ChatCompletionMessage(**last), frame['pending_msg_id'])
+
+        return self._chat_loop(frame['query_msg_id'], depth == 0, on_event, cancel_token, checkpoint, pending)
+
+    def _chat_loop(self,
+                   query_msg_id: Optional[str],
+                   is_entry_point: bool,
+                   on_event: Optional[Callable] = None,
+                   cancel_token: Optional[CancellationToken] = None,
+                   checkpoint: Optional[RunCheckpoint] = None,
+                   pending: Optional[Tuple[ChatCompletionMessage, Optional[str]]] = None) -> str:
+        """
+        Alternate LLM requests and tool calls until the model answers the query.
+
+        Args:
+            query_msg_id (Optional[str]): History ID of the query being answered.
+            is_entry_point (bool): Whether this agent is the entry point of the run.
+            on_event (Optional[Callable]): The event callback function.
+            cancel_token (Optional[CancellationToken]): Token that stops the run.
+            checkpoint (Optional[RunCheckpoint]): Checkpoint updated after every step.
+            pending (Optional[Tuple[ChatCompletionMessage, Optional[str]]]): A tool call
+                already in the chat history that still has to be run, with its history ID.
+
+        Returns:
+            str: The agent's response to the query.
+        """
         while True:
             try:
+                if pending:
+                    message, tool_msg_id = pending
+                    pending = None
+                    self._process_tool_call(message, tool_msg_id, on_event=on_event, cancel_token=cancel_token)
+                    if checkpoint:
+                        checkpoint.update_frame(len(self.chat_history))
+
                 response = self.generate_response(self.chat_history,
                                                   tools=[tool['metadata'] for tool in self.tools],
-                                                  use_tools=self.use_tools).choices[0]
+                                                  use_tools=self.use_tools,
+                                                  cancel_token=cancel_token).choices[0]
 
                 if not response.finish_reason == "tool_calls":
                     user_query_answer = response.message.content
@@ -270,6 +414,8 @@ class Agent(AI):
                                                             sender_type=EntityType.AGENT,
                                                             sender_name=self.name,
                                                             parent_id=query_msg_id)
+                    if checkpoint:
+                        checkpoint.complete_frame(user_query_answer)
 
                     if is_entry_point:
                         self._emit_event(on_event, "FINAL_RESPONSE", {
@@ -307,8 +453,25 @@ class Agent(AI):
                                                                       sender_name=self.name,
                                                                       parent_id=query_msg_id,
                                                                       tool_call_id=tool_call.id)
+                if checkpoint:
+                    checkpoint.update_frame(len(self.chat_history), pending_msg_id=tool_msg_id)
+
+                pending = (response.message, tool_msg_id)
 
-                self._process_tool_call(response.message, tool_msg_id, on_event=on_event)
+            except RunCancelledError as e:
+                self.debugger.log(f"{self.name} stopped: {e}", level="warning")
+                if is_entry_point:
+                    if checkpoint:
+                        checkpoint.finish(RunCheckpoint.CANCELLED, str(e))
+                    self._emit_event(on_event, "WORKFLOW_CANCELLED", {
+                        "source": {
+                            "name": self.name,
+                            "type": "AGENT"
+                        },
+                        "reason": str(e)
+                    })
+                    self._emit_event(on_event, "WORKFLOW_END", {})
+                raise
 
             except Exception as e:
                 error_msg = f"Error in chat processing: {str(e)}"
@@ -320,6 +483,8 @@ class Agent(AI):
                     "error_message": error_msg
                 })
                 if is_entry_point:
+                    if checkpoint:
+                        checkpoint.finish(RunCheckpoint.FAILED, error_msg)
                     self._emit_event(on_event, "WORKFLOW_END", {})
                 self.debugger.log(error_msg)
                 raise RuntimeError(error_msg)
@@ -327,7 +492,8 @@ class Agent(AI):
     def _process_tool_call(self,
                            message: ChatCompletionMessage,
                            parent_msg_id: Optional[str] = None,
-                           on_event: Optional[Callable] = None) -> None:
+                           on_event: Optional[Callable] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> None:
         """
         Process a tool call from the chat response.
 
@@ -335,13 +501,18 @@ class Agent(AI):
             message (ChatCompletionMessage): The message containing the tool call.
             parent_msg_id (Optional[str]): ID of the parent message in history.
             on_event (Optional[Callable]): The event callback function.
+            cancel_token (Optional[CancellationToken]): The tool is not run if this token is cancelled.
 
         Raises:
             ValueError: If the specified tool is not found or if there's an error in processing arguments.
+            RunCancelledError: If the run was cancelled before the tool was executed.
         """
         if not hasattr(message, 'tool_calls') or not message.tool_calls:
             raise ValueError("Message does not contain tool calls")
 
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+
         function_call = message.tool_calls[0]
         target_tool_name = function_call.function.name
 
@@ -374,37 +545,57 @@ class Agent(AI):
             self.debugger.log(error_msg, level="error")
             raise ValueError(error_msg)
 
-        tool_function = target_tool['tool']
-
-        try:
-            if hasattr(tool_function, '__kwdefaults__'):
-                tool_feedback = tool_function(**tool_arguments)
-            else:
-                tool_feedback = tool_function(tool_arguments)
-
-            self.debugger.log(f"Tool execution successful")
-            self.debugger.log(f"Tool response: {str(tool_feedback)}")
-
+        def on_output(stream: str, text: str) -> None:
             self._emit_event(
-                on_event, "AGENT_TOOL_RESPONSE", {
+                on_event, "AGENT_TOOL_OUTPUT", {
                     "source": {
                         "name": target_tool_name,
                         "type": "TOOL"
                     },
                     "tool_call_id": function_call.id,
-                    "result": str(tool_feedback)
+                    "stream": stream,
+                    "content": text
                 })
 
-            tool_response_msg = {"role": "tool", "content": str(tool_feedback), "tool_call_id": function_call.id}
+        cached = []
+        try:
+            tool_feedback = execute_tool(target_tool,
+                                         tool_arguments,
+                                         cancel_token=cancel_token,
+                                         on_output=on_output if on_event else None,
+                                         on_cache_hit=lambda: cached.append(True))
+            content, content_ref = self._limit_tool_result(str(tool_feedback))
+
+            self.debugger.log("Tool result served from cache" if cached else "Tool execution successful")
+            self.debugger.log(f"Tool response: {content}")
+
+            response_data = {
+                "source": {
+                    "name": target_tool_name,
+                    "type": "TOOL"
+                },
+                "tool_call_id": function_call.id,
+                "result": content
+            }
+            if content_ref:
+                response_data["content_ref"] = content_ref
+            if cached:
+                response_data["cached"] = True
+            self._emit_event(on_event, "AGENT_TOOL_RESPONSE", response_data)
+
+            tool_response_msg = {"role": "tool", "content": content, "tool_call_id": function_call.id}
             self.chat_history.append(tool_response_msg)
 
             if self.history_manager:
-                self.history_manager.append_message(message=tool_response_msg,
+                history_msg = {**tool_response_msg, "content_ref": content_ref} if content_ref else tool_response_msg
+                self.history_manager.append_message(message=history_msg,
                                                     sender_type=EntityType.TOOL,
                                                     sender_name=target_tool_name,
                                                     parent_id=parent_msg_id,
                                                     tool_call_id=function_call.id)
 
+        except RunCancelledError:
+            raise
         except Exception as e:
             error_msg = f"Tool execution failed: {str(e)}"
             self._emit_event(on_event, "ERROR", {
@@ -417,23 +608,127 @@ class Agent(AI):
             self.debugger.log(error_msg, level="error")
             raise RuntimeError(error_msg) from e
 
+    @property
+    def blob_store(self) -> BlobStore:
+        """The store of tool results too long for the chat history: the session's, or an in-memory one."""
+        return self.history_manager.blob_store if self.history_manager else self._memory_blobs
+
+    def _limit_tool_result(self, result: str) -> Tuple[str, Optional[str]]:
+        """
+        Shorten a tool result that exceeds ``tool_result_max_chars``.
+
+        Args:
+            result (str): The full tool result.
+
+        Returns:
+            Tuple[str, Optional[str]]: The content for the chat history, and the blob
+                reference of the full result if it was shortened.
+        """
+        limit = self.tool_result_max_chars
+        if not limit or len(result) <= limit:
+            return result, None
+
+        content_ref = self.blob_store.put(result)
+        note = f"[Result truncated: showing characters 0-{limit} of {len(result)}. Full result stored as {content_ref}."
+        if any(tool['metadata']['function']['name'] == READ_TOOL_OUTPUT for tool in self.tools):
+            note += f" Call {READ_TOOL_OUTPUT} with this ref and offset={limit} to read more."
+        return f"{result[:limit]}\n\n{note}]", content_ref
+
+    def _read_tool_output(self, ref: str, offset: int = 0, limit: Optional[int] = None) -> str:
+        """
+        Return a page of a stored tool result. Registered as the ``read_tool_output`` tool.
+
+        Args:
+            ref (str): The reference given in the truncated result.
+            offset (int): Character offset to start at.
+            limit (Optional[int]): Characters to return, at most a little less than
+                ``tool_result_max_chars`` so the page itself is not truncated.
+
+        Returns:
+            str: The page followed by its position in the result, or an error message.
+        """
+        try:
+            content = self.blob_store.get(ref)
+        except KeyError as e:
+            return f"Error: {e.args[0]}"
+
+        page_size = max(1, self.tool_result_max_chars - 200)
+        limit = page_size if limit is None else max(1, min(int(limit), page_size))
+        offset = max(0, int(offset))
+        end = min(len(content), offset + limit)
+        position = f"[Characters {offset}-{end} of {len(content)}."
+        position += f" Call again with offset={end} for more.]" if end < len(content) else " End of result.]"
+        return f"{content[offset:end]}\n\n{position}"
+
+    def _read_tool_output_tool(self) -> Dict[str, Any]:
+        """Build the tool dictionary of ``read_tool_output``."""
+        return {
+            "tool": self._read_tool_output,
+            "metadata": {
+                "type": "function",
+                "function": {
+                    "name": READ_TOOL_OUTPUT,
+                    "description": "Reads part of a tool result that was too long to be returned in full.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "ref": {
+                                "type": "string",
+                                "description": "The reference of the full result, as given in the truncated result."
+                            },
+                            "offset": {
+                                "type": "integer",
+                                "description": "Character offset to start reading at."
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of characters to read."
+                            }
+                        },
+                        "required": ["ref"]
+                    }
+                }
+            }
+        }
+
     async def _load_mcp_tools(self):
         """
         Discover and register tools from all MCP servers configured in self.mcp_servers.
 
+        Any previously loaded MCP tools are removed first. See ``discover_mcp_tools``.
+        """
+        self._remove_all_mcp_tools()
+        mcp_tools = await self.discover_mcp_tools(self.mcp_servers)
+        self.tools.extend(mcp_tools)
+        self._mcp_tool_names = {tool['metadata']['function']['name'] for tool in mcp_tools}
+        self.tools_metadata = [tool['metadata'] for tool in self.tools]
+
+    @staticmethod
+    async def discover_mcp_tools(mcp_servers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Discover the tools of MCP servers.
+
         This method connects to each specified MCP server using the configured transport
         (either "sse" or "stdio"), retrieves the available tools, converts their schemas
-        to OpenAI-compatible format, and registers proxy functions for each tool. It
-        removes any previously loaded MCP tools before loading new ones.
+        to OpenAI-compatible format, and builds proxy functions for each tool. The tool
+        dictionaries hold no agent state, so they can be shared by several agents (see
+        the ``mcp_tools`` argument of the constructor).
 
-        Raises:
-            ValueError: If an unknown transport type is encountered in the MCP server config.
-            Exception: For any network, process, or protocol-level error during tool discovery.
+        Args:
+            mcp_servers (List[Dict[str, Any]]): The MCP server configurations.
+
+        Returns:
+            List[Dict[str, Any]]: The discovered tools. Servers that fail are reported and skipped.
         """
-        self._remove_all_mcp_tools()
-        self._mcp_tool_names = set()
-        for server in self.mcp_servers:
+        # The MCP client is imported here, so agents without MCP servers never load it.
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.sse import sse_client
+        from mcp.client.stdio import stdio_client
+
+        tools = []
+        for server in mcp_servers:
             ttype = server.get("type", "sse")  # default to sse
+            policy = ToolPolicy.from_config(server.get("policy"))
             try:
                 if ttype == "sse":
                     url = server["url"]
@@ -446,17 +741,24 @@ class Agent(AI):
                             ntools_resp = await session.list_tools()
                             ntools = ntools_resp.tools
                             for tool in ntools:
-                                openai_tool_meta = self._convert_mcp_tool_to_openai(tool)
+                                openai_tool_meta = Agent._convert_mcp_tool_to_openai(tool)
                                 tname = openai_tool_meta["function"]["name"]
-                                proxy = self._build_mcp_tool_proxy(transport_type="sse",
-                                                                   conf={
-                                                                       "url": url,
-                                                                       "auth_token": auth_token
-                                                                   },
-                                                                   tool_name=tname)
-                                tool_dict = {"tool": proxy, "metadata": openai_tool_meta, "_mcp_tool": True}
-                                self.tools.append(tool_dict)
-                                self._mcp_tool_names.add(tname)
+                                proxy = Agent._build_mcp_tool_proxy(transport_type="sse",
+                                                                    conf={
+                                                                        "url": url,
+                                                                        "auth_token": auth_token
+                                                                    },
+                                                                    tool_name=tname,
+                                                                    raise_errors=policy is not None)
+                                tool_dict = {
+                                    "tool": proxy,
+                                    "metadata": openai_tool_meta,
+                                    "cache_id": tool_cache_id(f"mcp:{url}:{tname}"),
+                                    "_mcp_tool": True
+                                }
+                                if policy:
+                                    tool_dict["policy"] = policy
+                                tools.append(tool_dict)
                 elif ttype == "stdio":
                     script_path = server["script_path"]
                     server_params = StdioServerParameters(command="python", args=[script_path], env=None)
@@ -466,21 +768,29 @@ class Agent(AI):
                             ntools_resp = await session.list_tools()
                             ntools = ntools_resp.tools
                             for tool in ntools:
-                                openai_tool_meta = self._convert_mcp_tool_to_openai(tool)
+                                openai_tool_meta = Agent._convert_mcp_tool_to_openai(tool)
                                 tname = openai_tool_meta["function"]["name"]
-                                proxy = self._build_mcp_tool_proxy(transport_type="stdio",
-                                                                   conf={"script_path": script_path},
-                                                                   tool_name=tname)
-                                tool_dict = {"tool": proxy, "metadata": openai_tool_meta, "_mcp_tool": True}
-                                self.tools.append(tool_dict)
-                                self._mcp_tool_names.add(tname)
+                                proxy = Agent._build_mcp_tool_proxy(transport_type="stdio",
+                                                                    conf={"script_path": script_path},
+                                                                    tool_name=tname,
+                                                                    raise_errors=policy is not None)
+                                tool_dict = {
+                                    "tool": proxy,
+                                    "metadata": openai_tool_meta,
+                                    "cache_id": tool_cache_id(f"mcp:{script_path}:{tname}"),
+                                    "_mcp_tool": True
+                                }
+                                if policy:
+                                    tool_dict["policy"] = policy
+                                tools.append(tool_dict)
                 else:
                     raise ValueError(f"[MCP] Unknown transport type: {ttype}")
             except Exception as e:
                 print(f"[MCP] Error loading tools from {server}: {e}")
-        self.tools_metadata = [tool['metadata'] for tool in self.tools]
+        return tools
 
-    def _convert_mcp_tool_to_openai(self, tool) -> Dict[str, Any]:
+    @staticmethod
+    def _convert_mcp_tool_to_openai(tool) -> Dict[str, Any]:
         """
         Convert an MCP tool object to an OpenAI-compatible function/tool schema.
 
@@ -519,7 +829,8 @@ class Agent(AI):
             openai_tool["function"]["parameters"]["required"] = property_names
         return openai_tool
 
-    def _build_mcp_tool_proxy(self, transport_type, conf, tool_name):
+    @staticmethod
+    def _build_mcp_tool_proxy(transport_type, conf, tool_name, raise_errors=False):
         """
         Create a synchronous Python proxy function for invoking an MCP tool.
 
@@ -531,6 +842,8 @@ class Agent(AI):
             transport_type (str): The MCP transport type ("sse" or "stdio").
             conf (dict): Connection configuration dictionary (e.g., URL or script_path).
             tool_name (str): Name of the tool to invoke on the MCP server.
+            raise_errors (bool): If True, failures are raised instead of being returned as an
+                error string, so a tool policy can retry them or open the circuit.
 
         Returns:
             Callable: A Python function that accepts keyword arguments and returns the tool's result.
@@ -538,6 +851,9 @@ class Agent(AI):
         Raises:
             Exception: If calling the MCP tool fails for transport or invocation reasons.
         """
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.sse import sse_client
+        from mcp.client.stdio import stdio_client
 
         def proxy(**kwargs):
 
@@ -581,6 +897,8 @@ class Agent(AI):
                 else:
                     raise ValueError(f"Unknown MCP transport {transport_type}")
             except Exception as e:
+                if raise_errors:
+                    raise
                 return f"[MCP] Tool '{tool_name}' call failed: {e}"
 
         return proxy
@@ -4,9 +4,14 @@ AI module for handling interactions with OpenAI's API.
 This module provides a base AI class for generating responses using OpenAI's chat completions.
 """
 
+import time
 import openai
 from typing import List, Dict, Any, Optional
 from openai.types.chat import ChatCompletion
+from xronai.core.cancellation import CancellationToken
+from xronai.core.latency import get_histogram
+from xronai.core.llm_policy import estimate_tokens, record_retry
+from xronai.core.routing import HedgingPolicy, LLMEndpoint, RoutingPolicy, build_endpoints
 
 
 class AI:
@@ -23,7 +28,10 @@ class AI:
 
         Args:
             llm_config (Dict[str, str]): Configuration for the language model.
-                Must contain 'api_key' and 'model'. May optionally include 'base_url' and 'temperature'.
+                Must contain 'api_key' and 'model'. May optionally include 'base_url' and 'temperature',
+                a 'retry' policy and 'rate_limit' limits (see xronai.core.llm_policy), and
+                fallback 'endpoints' with 'routing' rules and latency-based 'hedging'
+                (see xronai.core.routing).
 
         Raises:
             ValueError: If required configuration keys are missing or if tools are enabled but not provided.
@@ -32,20 +40,39 @@ class AI:
             raise ValueError("llm_config must contain 'api_key' and 'model'")
 
         self.llm_config = llm_config
-        self.client = openai.OpenAI(base_url=llm_config.get('base_url', 'https://api.openai.com/v1'),
-                                    api_key=llm_config['api_key'])
+        # Clients are shared per (base_url, api_key) and created with max_retries=0: retries
+        # are handled by generate_response so they can honor the retry policy, the rate
+        # limiter and cancellation.
+        self.endpoints = build_endpoints(llm_config)
+        self.client = self.endpoints[0].client
+        self.retry_policy = self.endpoints[0].retry_policy
+        self.rate_limiter = self.endpoints[0].rate_limiter
+        self.routing = None
+        if len(self.endpoints) > 1 or 'routing' in llm_config:
+            self.routing = RoutingPolicy.from_config(llm_config.get('routing'))
+        self.hedging = HedgingPolicy.from_config(llm_config['hedging']) if llm_config.get('hedging') else None
 
     def generate_response(self,
                           messages: List[Dict[str, str]],
                           tools: Optional[List[Dict[str, Any]]] = None,
-                          use_tools: bool = False) -> ChatCompletion:
+                          use_tools: bool = False,
+                          cancel_token: Optional[CancellationToken] = None) -> ChatCompletion:
         """
         Execute a chat completion.
 
+        Requests wait for the shared rate limiter of their model, if one is configured.
+        Rate limiting, timeouts, connection errors and server errors are retried according
+        to the retry policy. If further endpoints are configured, a request that still
+        fails moves on to the next one according to the routing rules. With hedging, a
+        request slower than the model's usual latency is duplicated and the first answer wins.
+
         Args:
             messages (List[Dict[str, str]]): List of conversation messages.
             tools (Optional[List[Dict[str, Any]]]): List of tools for function calling.
             use_tools (bool): Whether to use function calling with tools.
+            cancel_token (Optional[CancellationToken]): Token of the run this request belongs to.
+                The request is not sent if it is cancelled, and its remaining time is used
+                as the request timeout.
 
         Returns:
             ChatCompletion: The response from the OpenAI API.
@@ -53,27 +80,119 @@ class AI:
         Raises:
             openai.OpenAIError: If there's an error in the API call.
             ValueError: If tools are requested but not provided.
+            RunCancelledError: If the run was cancelled or its deadline has passed.
         """
         if use_tools and not tools:
             raise ValueError("Tools must be provided when use_tools is True")
 
-        try:
-            params = self.llm_config.copy()
-
-            params.pop('api_key', None)
-            params.pop('base_url', None)
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
 
-            params['messages'] = messages
+        request = {'messages': messages}
+        if use_tools:
+            request['tools'] = tools
+            request['tool_choice'] = 'auto'
 
-            if use_tools:
-                params['tools'] = tools
-                params['tool_choice'] = 'auto'
+        try:
+            if self.hedging is None:
+                return self._route(request, cancel_token)
 
-            return self.client.chat.completions.create(**params)
+            first = self.routing.order(self.endpoints, request)[0] if self.routing else self.endpoints[0]
+            target = next((e for e in self.endpoints if e.model == self.hedging.endpoint), first)
+            return self.hedging.run(primary=lambda: self._route(request, cancel_token),
+                                    hedge=lambda: self._complete(target, request, cancel_token),
+                                    model=first.model,
+                                    cancel_token=cancel_token)
 
         except openai.OpenAIError as e:
             raise openai.OpenAIError(f"Chat completion failed: {str(e)}")
 
+    def _route(self, request: Dict[str, Any], cancel_token: Optional[CancellationToken] = None) -> ChatCompletion:
+        """Send a request to the primary endpoint, or across the endpoints by the routing rules."""
+        if self.routing is None:
+            return self._complete(self.endpoints[0], request, cancel_token)
+
+        endpoints = self.routing.order(self.endpoints, request)
+        attempts = [
+            lambda endpoint=endpoint, last=(i == len(endpoints) - 1): self._complete(
+                endpoint, request, cancel_token, timeout=self.routing.timeout, can_fall_back=not last)
+            for i, endpoint in enumerate(endpoints)
+        ]
+        return self.routing.run(attempts, cancel_token)
+
+    def _complete(self,
+                  endpoint: LLMEndpoint,
+                  request: Dict[str, Any],
+                  cancel_token: Optional[CancellationToken] = None,
+                  timeout: Optional[float] = None,
+                  can_fall_back: bool = False) -> ChatCompletion:
+        """
+        Send a request to one endpoint, applying its rate limiter and retry policy.
+
+        Args:
+            endpoint (LLMEndpoint): The endpoint to send the request to.
+            request (Dict[str, Any]): The messages and tool parameters of the request.
+            cancel_token (Optional[CancellationToken]): Token of the run this request belongs to.
+            timeout (Optional[float]): Seconds each attempt may take.
+            can_fall_back (bool): Whether another endpoint follows this one. A timeout the
+                routing rules fall back on is then raised right away instead of retried.
+
+        Returns:
+            ChatCompletion: The response from the endpoint.
+
+        Raises:
+            openai.OpenAIError: The error of the last attempt, unchanged.
+            RunCancelledError: If the run was cancelled or its deadline has passed.
+        """
+        # The primary endpoint goes through self.client so it can be replaced after construction.
+        client = self.client if endpoint is self.endpoints[0] else endpoint.client
+        params = {**endpoint.params, **request}
+
+        estimated_tokens = 0
+        if endpoint.rate_limiter:
+            estimated_tokens = estimate_tokens(messages=request['messages'],
+                                               tools=request.get('tools'),
+                                               max_tokens=params.get('max_tokens'))
+
+        for attempt in range(endpoint.retry_policy.max_retries + 1):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            if endpoint.rate_limiter:
+                endpoint.rate_limiter.acquire(estimated_tokens, cancel_token)
+
+            attempt_timeout = timeout
+            if cancel_token and cancel_token.remaining() is not None:
+                remaining = cancel_token.remaining()
+                attempt_timeout = remaining if timeout is None else min(timeout, remaining)
+            if attempt_timeout is not None:
+                params['timeout'] = attempt_timeout
+
+            started = time.monotonic()
+            try:
+                response = client.chat.completions.create(**params)
+            except openai.OpenAIError as e:
+                # A timed-out endpoint is likely to time out again, so the next one is
+                # tried right away; other errors exhaust this endpoint's retries first.
+                if can_fall_back and isinstance(e, openai.APITimeoutError) and self.routing.should_fall_back(e):
+                    raise
+                if attempt < endpoint.retry_policy.max_retries and endpoint.retry_policy.is_retryable(e):
+                    delay = endpoint.retry_policy.delay(attempt + 1, e)
+                    remaining = cancel_token.remaining() if cancel_token else None
+                    if remaining is None or delay < remaining:
+                        record_retry(endpoint.model)
+                        if cancel_token:
+                            cancel_token.wait(delay)
+                        else:
+                            time.sleep(delay)
+                        continue
+                raise
+
+            get_histogram(endpoint.model).record(time.monotonic() - started)
+            if endpoint.rate_limiter:
+                usage = getattr(response, 'usage', None)
+                endpoint.rate_limiter.record_usage(estimated_tokens, getattr(usage, 'total_tokens', None))
+            return response
+
     def __str__(self) -> str:
         """Return a string representation of the AI instance."""
         return f"AI(model={self.llm_config['model']})"
@@ -0,0 +1,104 @@
+"""
+Cooperative cancellation for workflow runs.
+
+A CancellationToken is passed to Agent.chat or Supervisor.chat and travels with the
+run through delegations, tool calls and LLM requests. The run checks it between
+steps and stops with RunCancelledError once it is cancelled or its deadline passes.
+A step that is already in progress (an LLM request or a tool call) is not
+interrupted, but LLM requests are given the remaining time as their timeout.
+"""
+
+import time
+import threading
+from typing import Optional
+
+
+class RunCancelledError(Exception):
+    """Raised inside a run when its cancellation token is cancelled or its deadline expires."""
+    pass
+
+
+class CancellationToken:
+    """
+    A thread-safe cancellation flag with an optional deadline.
+
+    Attributes:
+        reason (Optional[str]): Why the token was cancelled, if it was.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Initialize the token.
+
+        Args:
+            timeout (Optional[float]): Seconds from now after which the run is cancelled.
+        """
+        self._event = threading.Event()
+        self._deadline: Optional[float] = None
+        self.reason: Optional[str] = None
+        if timeout is not None:
+            self.set_timeout(timeout)
+
+    def set_timeout(self, timeout: float) -> None:
+        """
+        Set the deadline to ``timeout`` seconds from now.
+
+        Args:
+            timeout (float): Seconds the run may still take.
+        """
+        self._deadline = time.monotonic() + timeout
+
+    def cancel(self, reason: str = "Run was cancelled") -> None:
+        """
+        Cancel the run.
+
+        Args:
+            reason (str): Human-readable reason, reported in the raised error and events.
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token was cancelled or its deadline has passed."""
+        if not self._event.is_set() and self._deadline is not None and time.monotonic() >= self._deadline:
+            self.cancel("Run deadline exceeded")
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left until the deadline.
+
+        Returns:
+            Optional[float]: Remaining time (never negative), or None if there is no deadline.
+        """
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raise if the run should stop.
+
+        Raises:
+            RunCancelledError: If the token was cancelled or its deadline has passed.
+        """
+        if self.cancelled:
+            raise RunCancelledError(self.reason)
+
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleep for up to ``seconds``, waking early on cancellation or at the deadline.
+
+        Args:
+            seconds (float): Maximum time to sleep.
+
+        Returns:
+            bool: True if the token is cancelled when the wait ends.
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._event.wait(seconds)
+        return self.cancelled
@@ -0,0 +1,183 @@
+"""
+Latency histograms for LLM requests.
+
+Every successful chat completion records its duration in a per-model histogram with
+logarithmically spaced buckets, so percentiles can be read cheaply at any time. The
+histograms only keep recent durations (the last one to two windows of 1000 requests
+or five minutes), so percentiles track the current latency of a model. The
+hedging policy uses them to decide how long to wait before sending a duplicate
+request, and the server reports them in its metrics.
+"""
+
+import math
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class LatencyHistogram:
+    """
+    A thread-safe histogram of recent durations with logarithmic buckets.
+
+    Bucket ``i`` holds durations up to ``min_value * growth**i`` seconds, which keeps
+    the relative error of a percentile below ``growth - 1``.
+
+    Durations are counted in two windows: the current one and the one before it. The
+    current window is rotated out once it holds ``window_size`` durations or is
+    ``window_seconds`` old, so percentiles cover the last one to two windows and
+    follow shifts in upstream latency.
+
+    Attributes:
+        count (int): Number of durations in the two windows.
+        total (float): Sum of the durations in the two windows, in seconds.
+    """
+
+    def __init__(self,
+                 min_value: float = 0.01,
+                 max_value: float = 600.0,
+                 growth: float = 1.1,
+                 window_size: int = 1000,
+                 window_seconds: float = 300.0):
+        """
+        Initialize the histogram.
+
+        Args:
+            min_value (float): Upper bound of the first bucket, in seconds.
+            max_value (float): Durations above this are counted in the last bucket.
+            growth (float): Ratio between the bounds of consecutive buckets.
+            window_size (int): Durations after which the current window is rotated.
+            window_seconds (float): Seconds after which the current window is rotated.
+        """
+        self.min_value = min_value
+        self.growth = growth
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self._log_growth = math.log(growth)
+        self._size = int(math.ceil(math.log(max_value / min_value) / self._log_growth)) + 1
+        self._lock = threading.Lock()
+        self._current = _Window(self._size)
+        self._previous = _Window(self._size)
+        self._started = time.monotonic()
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            self._rotate_if_due()
+            return self._current.count + self._previous.count
+
+    @property
+    def total(self) -> float:
+        with self._lock:
+            self._rotate_if_due()
+            return self._current.total + self._previous.total
+
+    def record(self, seconds: float) -> None:
+        """Record one duration."""
+        index = 0
+        if seconds > self.min_value:
+            index = min(self._size - 1, int(math.ceil(math.log(seconds / self.min_value) / self._log_growth)))
+        with self._lock:
+            self._rotate_if_due()
+            self._current.add(index, seconds)
+            if self._current.count >= self.window_size:
+                self._rotate()
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Return the duration below which ``p`` percent of the recent durations fall.
+
+        Args:
+            p (float): The percentile, between 0 and 100.
+
+        Returns:
+            Optional[float]: The upper bound of the bucket holding the percentile, in
+                seconds, or None if nothing was recorded recently.
+        """
+        with self._lock:
+            self._rotate_if_due()
+            count = self._current.count + self._previous.count
+            if not count:
+                return None
+            rank = max(1, math.ceil(count * p / 100))
+            seen = 0
+            for index, (current, previous) in enumerate(zip(self._current.buckets, self._previous.buckets)):
+                seen += current + previous
+                if seen >= rank:
+                    return self.min_value * self.growth**index
+        return None
+
+    def _rotate_if_due(self) -> None:
+        """Rotate the windows if the current one is too old. Called with the lock held."""
+        elapsed = time.monotonic() - self._started
+        if elapsed >= 2 * self.window_seconds:
+            # Both windows are out of date.
+            self._previous = _Window(self._size)
+            self._rotate()
+        elif elapsed >= self.window_seconds:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Start a new current window. Called with the lock held."""
+        self._previous, self._current = self._current, _Window(self._size)
+        self._started = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the count, mean and common percentiles in milliseconds."""
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+
+        count, total = self.count, self.total
+        return {
+            "count": count,
+            "mean_ms": ms(total / count) if count else None,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+        }
+
+
+class _Window:
+    """The bucket counts of one window of a LatencyHistogram."""
+
+    def __init__(self, size: int):
+        self.buckets: List[int] = [0] * size
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, index: int, seconds: float) -> None:
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def get_histogram(model: str) -> LatencyHistogram:
+    """
+    Return the process-wide latency histogram of a model, creating it on first use.
+
+    Args:
+        model (str): The model name.
+
+    Returns:
+        LatencyHistogram: The model's histogram.
+    """
+    with _histograms_lock:
+        if model not in _histograms:
+            _histograms[model] = LatencyHistogram()
+        return _histograms[model]
+
+
+def latency_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Return latency statistics for every model that served a request in this process.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Statistics keyed by model name.
+    """
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {model: histogram.stats() for model, histogram in histograms.items()}
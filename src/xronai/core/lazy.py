@@ -0,0 +1,96 @@
+"""
+Deferred construction of workflow nodes.
+
+A ``LazyNode`` stands in for an Agent or assistant Supervisor in its parent's
+``registered_agents``. It carries only what the parent needs to offer it as a
+delegation tool (its name and description) and records the session it is assigned
+to. The real node is built the first time it is delegated to, then pointed at the
+recorded session and given its chat history. The parent Supervisor then replaces the
+stand-in with the built node.
+
+Building a workflow with lazy children therefore costs one node regardless of the
+size of the tree: clients, debug logs, history managers, tool imports and MCP tool
+discovery of a branch are only paid for in sessions that use it.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+
+class LazyNode:
+    """
+    A workflow node that is built on first use.
+
+    Attributes:
+        name (str): Name of the node, as used in its delegation tool.
+        system_message (str): Description of the node offered to the parent supervisor.
+        is_supervisor (bool): Whether the node is an assistant Supervisor.
+        workflow_id (Optional[str]): The session the node is assigned to.
+        history_base_path (Optional[str]): Root directory of the session histories.
+    """
+
+    def __init__(self, name: str, system_message: str, builder: Callable[[], Any], is_supervisor: bool = False):
+        """
+        Initialize the stand-in.
+
+        Args:
+            name (str): Name of the node.
+            system_message (str): Description offered to the parent supervisor; the
+                system message the built node will have.
+            builder (Callable[[], Any]): Builds the Agent or Supervisor. Called once.
+            is_supervisor (bool): Whether the node is an assistant Supervisor.
+        """
+        self.name = "".join(name.split())
+        self.system_message = system_message
+        self.is_supervisor = is_supervisor
+        self.is_assistant = is_supervisor
+        self.workflow_id: Optional[str] = None
+        self.history_base_path: Optional[str] = None
+        self.history_manager = None
+        self._builder = builder
+        self._node = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        """Whether the node has been built."""
+        return self._node is not None
+
+    def set_workflow_id(self, workflow_id: str, history_base_path: Optional[str] = None) -> None:
+        """Assign the node to a session. A node that is already built is moved to the session at once."""
+        self.workflow_id = workflow_id
+        self.history_base_path = history_base_path
+        if self._node is not None:
+            self._attach(self._node)
+
+    def resolve(self) -> Any:
+        """
+        Return the node, building it first if needed.
+
+        Returns:
+            Union[Agent, Supervisor]: The built node, assigned to the recorded session
+                and with its chat history loaded.
+        """
+        with self._lock:
+            if self._node is None:
+                node = self._builder()
+                if self.workflow_id:
+                    self._attach(node)
+                self._node = node
+            return self._node
+
+    def _attach(self, node: Any) -> None:
+        """Point a built node at the recorded session and load its chat history."""
+        node.set_workflow_id(self.workflow_id, history_base_path=self.history_base_path)
+        if node.history_manager:
+            node.chat_history = node.history_manager.load_chat_history(node.name)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the stand-in does not have itself.
+        if name.startswith('__') or name in ('_builder', '_node', '_lock'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        state = "built" if self.is_built else "not built"
+        return f"LazyNode(name={self.name}, {state})"
@@ -0,0 +1,314 @@
+"""
+Retry and rate-limit policies for LLM requests.
+
+Both are configured in an llm_config next to the model settings:
+
+    llm_config:
+      model: gpt-4o
+      api_key: ${LLM_API_KEY}
+      base_url: https://api.openai.com/v1
+      retry:
+        max_retries: 4        # attempts after the first one
+        backoff: 1.0          # first delay, doubled on each retry, with jitter
+        max_backoff: 30
+      rate_limit:
+        rpm: 500              # requests per minute
+        tpm: 200000           # tokens per minute
+
+Retries cover rate limiting, timeouts, connection errors and 5xx responses, and wait
+as long as the server asks through ``Retry-After`` / ``retry-after-ms``. Rate limiters
+are token buckets shared by every agent in the process that talks to the same
+(base_url, model), so requests queue on the client instead of being rejected by the
+provider.
+"""
+
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+import openai
+
+from xronai.core.cancellation import CancellationToken
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for failed LLM requests.
+
+    Attributes:
+        max_retries (int): Attempts made after the first one.
+        backoff (float): Base delay before the first retry, in seconds.
+        max_backoff (float): Upper bound for a computed delay.
+        max_retry_after (float): Upper bound for a delay requested by the server.
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff: float = 1.0,
+                 max_backoff: float = 30.0,
+                 max_retry_after: float = 120.0):
+        """Initialize the policy. See the class attributes for the meaning of each argument."""
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'RetryPolicy':
+        """
+        Build a policy from the ``retry`` section of an llm_config.
+
+        Args:
+            config (Optional[Dict[str, Any]]): The retry settings, or None for the defaults.
+
+        Returns:
+            RetryPolicy: The policy.
+        """
+        return cls(**(config or {}))
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """
+        Whether a failed request is worth retrying.
+
+        Args:
+            error (Exception): The error raised by the OpenAI client.
+
+        Returns:
+            bool: True for timeouts, connection errors, rate limiting and server errors.
+        """
+        if isinstance(error, openai.APIConnectionError):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+        return False
+
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (starting at 1).
+
+        A delay requested by the server through ``retry-after-ms`` or ``Retry-After`` takes
+        precedence over the computed backoff.
+
+        Args:
+            attempt (int): The retry number.
+            error (Optional[Exception]): The error of the failed attempt.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        delay = min(self.max_backoff, self.backoff * 2**(attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+
+def _retry_after(error: Optional[Exception]) -> Optional[float]:
+    """Read the delay a server asked for from the response headers of an error."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+    except ValueError:
+        pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    """A token bucket refilled continuously at ``per_minute / 60`` tokens per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens, going into debt if needed; return the seconds until the debt is paid."""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens (or take more, if negative) once the real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute limiter.
+
+    Each request reserves one request and its estimated tokens up front and waits until
+    the buckets can cover them, so concurrent callers are served in arrival order. The
+    token estimate is corrected with the real usage once the response arrives.
+
+    Attributes:
+        rpm (Optional[float]): Requests per minute, or None for no limit.
+        tpm (Optional[float]): Tokens per minute, or None for no limit.
+        waits (int): Requests that had to wait.
+        total_wait (float): Seconds spent waiting, summed over requests.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rpm (Optional[float]): Requests per minute.
+            tpm (Optional[float]): Tokens per minute.
+        """
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.total_wait = 0.0
+        self.rpm: Optional[float] = None
+        self.tpm: Optional[float] = None
+        self._requests: Optional[_TokenBucket] = None
+        self._tokens: Optional[_TokenBucket] = None
+        self.configure(rpm, tpm)
+
+    def configure(self, rpm: Optional[float] = None, tpm: Optional[float] = None) -> None:
+        """Change the limits, resetting the buckets if they differ from the current ones."""
+        with self._lock:
+            if self.rpm != rpm:
+                self._requests = _TokenBucket(rpm) if rpm else None
+            if self.tpm != tpm:
+                self._tokens = _TokenBucket(tpm) if tpm else None
+            self.rpm, self.tpm = rpm, tpm
+
+    def acquire(self, estimated_tokens: int = 0, cancel_token: Optional[CancellationToken] = None) -> None:
+        """
+        Wait until a request with ``estimated_tokens`` tokens may be sent.
+
+        Args:
+            estimated_tokens (int): Estimated prompt and completion tokens of the request.
+            cancel_token (Optional[CancellationToken]): Ends the wait early if the run is cancelled.
+
+        Raises:
+            RunCancelledError: If the run is cancelled while waiting.
+        """
+        with self._lock:
+            wait = 0.0
+            if self._requests:
+                wait = max(wait, self._requests.reserve(1))
+            if self._tokens:
+                wait = max(wait, self._tokens.reserve(estimated_tokens))
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+
+        if wait > 0:
+            if cancel_token:
+                cancel_token.wait(wait)
+                cancel_token.raise_if_cancelled()
+            else:
+                time.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket with the usage reported by the provider.
+
+        Args:
+            estimated_tokens (int): The estimate passed to ``acquire``.
+            actual_tokens (Optional[int]): Total tokens of the response, if reported.
+        """
+        if actual_tokens is None:
+            return
+        with self._lock:
+            if self._tokens:
+                self._tokens.refund(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the limits and wait counters."""
+        return {"rpm": self.rpm, "tpm": self.tpm, "waits": self.waits, "total_wait_s": round(self.total_wait, 3)}
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_retries: Dict[str, int] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url: str, model: str, config: Optional[Dict[str, Any]]) -> Optional[RateLimiter]:
+    """
+    Return the process-wide limiter for a (base_url, model) pair.
+
+    Args:
+        base_url (str): The API base URL.
+        model (str): The model name.
+        config (Optional[Dict[str, Any]]): The ``rate_limit`` section of the llm_config with
+            'rpm' and/or 'tpm'. The most recent configuration of a pair wins.
+
+    Returns:
+        Optional[RateLimiter]: The shared limiter, or None if no limits are configured.
+    """
+    if not config:
+        return None
+    key = (base_url, model)
+    with _registry_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(config.get('rpm'), config.get('tpm'))
+        else:
+            limiter.configure(config.get('rpm'), config.get('tpm'))
+        return limiter
+
+
+def record_retry(model: str) -> None:
+    """Count a retried LLM request for the metrics."""
+    with _registry_lock:
+        _retries[model] = _retries.get(model, 0) + 1
+
+
+def llm_metrics() -> Dict[str, Any]:
+    """
+    Return retry counts per model and the state of every rate limiter.
+
+    Returns:
+        Dict[str, Any]: Metrics with 'retries' and 'rate_limiters' keys.
+    """
+    with _registry_lock:
+        return {
+            "retries": dict(_retries),
+            "rate_limiters": {f"{model}@{base_url}": limiter.stats() for (base_url, model), limiter in _limiters.items()}
+        }
+
+
+def estimate_tokens(messages: Any, tools: Any = None, max_tokens: Optional[int] = None) -> int:
+    """
+    Roughly estimate the tokens of a request (about four characters per token).
+
+    Args:
+        messages (Any): The request messages.
+        tools (Any): The tool schemas sent with the request.
+        max_tokens (Optional[int]): The completion limit, counted in full when set.
+
+    Returns:
+        int: The estimated token count.
+    """
+    size = len(str(messages)) + (len(str(tools)) if tools else 0)
+    return size // 4 + (max_tokens or 256)
@@ -0,0 +1,462 @@
+"""
+Routing of LLM requests across several endpoints.
+
+An llm_config may list further endpoints after its primary model. Entries inherit any
+setting they do not override (typically api_key and base_url) from the primary:
+
+    llm_config:
+      model: gpt-4o
+      api_key: ${LLM_API_KEY}
+      base_url: https://api.openai.com/v1
+      endpoints:
+        - model: gpt-4o-mini
+        - model: llama-3.1-70b
+          base_url: https://inference.example.com/v1
+          api_key: ${BACKUP_API_KEY}
+      routing:
+        fallback_on: [error, timeout]   # move to the next endpoint on these failures
+        timeout: 20                     # seconds per attempt before it counts as a timeout
+        hedge_after: 4                  # start the next endpoint if no answer after 4 s
+        short_prompt:                   # send short prompts to a cheaper model first
+          max_chars: 2000
+          model: gpt-4o-mini
+
+Endpoints are tried in order. Retries and rate limiting apply per endpoint: a
+retryable error (rate limiting, a server error) is retried on the same endpoint, and
+the request falls back once its retries are exhausted or the error is not retryable.
+A timeout falls back right away when ``timeout`` is in ``fallback_on``. With ``hedge_after`` the next endpoint is started while the previous one
+is still running, and the first successful answer wins. Requests run in threads, and
+the synchronous OpenAI client cannot abort a request in flight, so the losing requests
+are abandoned: they finish in the background and their results are discarded.
+
+Hedging with a delay derived from observed latency is configured separately:
+
+    llm_config:
+      hedging:
+        percentile: 95          # hedge once a request is slower than the model's p95
+        min_samples: 20         # requests to observe before trusting the percentile
+        initial_delay: 8        # delay used until then (no hedging if unset)
+        min_delay: 0.5
+        budget: 0.05            # at most 5% extra requests per model
+        endpoint: gpt-4o-mini   # optional: send the duplicate to another configured model
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import openai
+
+from xronai.core.cancellation import CancellationToken, RunCancelledError
+from xronai.core.latency import get_histogram
+from xronai.core.llm_policy import RetryPolicy, get_rate_limiter
+
+ROUTING_KEYS = ('endpoints', 'routing', 'hedging')
+"""llm_config keys that configure routing rather than a single endpoint."""
+
+CLIENT_KEYS = ('api_key', 'base_url', 'retry', 'rate_limit')
+"""Endpoint settings used to build the client, not sent with the request."""
+
+FALLBACK_CONDITIONS = ('error', 'timeout')
+
+# One pool per nesting depth: a race started inside an attempt of another race (routing
+# hedges inside latency hedging) gets threads from the next pool, so it never waits for
+# threads that its own caller is holding in a full pool.
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+_race_depth = threading.local()
+_clients: Dict[Tuple[str, str], openai.OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_executor(depth: int = 0) -> ThreadPoolExecutor:
+    with _executor_lock:
+        executor = _executors.get(depth)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix=f"xronai-llm-{depth}")
+            _executors[depth] = executor
+        return executor
+
+
+def _at_depth(depth: int, attempt: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap an attempt so races it starts use the pool of the next depth."""
+
+    def run():
+        _race_depth.value = depth + 1
+        try:
+            return attempt()
+        finally:
+            _race_depth.value = 0
+
+    return run
+
+
+def get_client(base_url: str, api_key: str) -> openai.OpenAI:
+    """
+    Return the process-wide OpenAI client for a (base_url, api_key) pair.
+
+    Clients are thread-safe and hold a pool of keep-alive connections, so every agent
+    talking to the same endpoint shares one instead of opening its own. Retries are
+    disabled on the client; they are applied by the retry policy of each request.
+
+    Args:
+        base_url (str): The API base URL.
+        api_key (str): The API key.
+
+    Returns:
+        openai.OpenAI: The shared client.
+    """
+    key = (base_url, api_key)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = openai.OpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+        return _clients[key]
+
+
+class LLMEndpoint:
+    """
+    One model behind one API endpoint, with its own client, retry policy and rate limiter.
+
+    Attributes:
+        config (Dict[str, Any]): The endpoint's complete settings.
+        params (Dict[str, Any]): Request parameters (model, temperature, ...).
+        name (str): Display name, ``model@base_url``.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the endpoint.
+
+        Args:
+            config (Dict[str, Any]): Settings with at least 'model' and 'api_key'.
+        """
+        self.config = config
+        self.model = config['model']
+        self.base_url = config.get('base_url', 'https://api.openai.com/v1')
+        self.name = f"{self.model}@{self.base_url}"
+        self.params = {k: v for k, v in config.items() if k not in CLIENT_KEYS and k not in ROUTING_KEYS}
+        self.client = get_client(self.base_url, config['api_key'])
+        self.retry_policy = RetryPolicy.from_config(config.get('retry'))
+        self.rate_limiter = get_rate_limiter(self.base_url, self.model, config.get('rate_limit'))
+
+
+def build_endpoints(llm_config: Dict[str, Any]) -> List[LLMEndpoint]:
+    """
+    Create the primary endpoint and the fallback endpoints of an llm_config.
+
+    Args:
+        llm_config (Dict[str, Any]): The agent's LLM configuration.
+
+    Returns:
+        List[LLMEndpoint]: The endpoints in routing order, primary first.
+    """
+    base = {k: v for k, v in llm_config.items() if k not in ROUTING_KEYS}
+    return [LLMEndpoint(base)] + [LLMEndpoint({**base, **entry}) for entry in llm_config.get('endpoints', [])]
+
+
+class RoutingPolicy:
+    """
+    Rules for spreading a request over an ordered list of endpoints.
+
+    Attributes:
+        fallback_on (frozenset): Failure kinds ('error', 'timeout') that move on to the next endpoint.
+        timeout (Optional[float]): Seconds each attempt may take.
+        hedge_after (Optional[float]): Seconds after which the next endpoint is started in parallel.
+        short_prompt (Optional[Dict[str, Any]]): 'max_chars' and 'model' of the short-prompt rule.
+    """
+
+    def __init__(self,
+                 fallback_on: Optional[List[str]] = None,
+                 timeout: Optional[float] = None,
+                 hedge_after: Optional[float] = None,
+                 short_prompt: Optional[Dict[str, Any]] = None):
+        """Initialize the policy. See the class attributes for the meaning of each argument."""
+        self.fallback_on = frozenset(FALLBACK_CONDITIONS if fallback_on is None else fallback_on)
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.short_prompt = short_prompt
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'RoutingPolicy':
+        """
+        Build a policy from the ``routing`` section of an llm_config.
+
+        Args:
+            config (Optional[Dict[str, Any]]): The routing rules, or None for plain fallback.
+
+        Returns:
+            RoutingPolicy: The policy.
+        """
+        return cls(**(config or {}))
+
+    def order(self, endpoints: List[LLMEndpoint], request: Dict[str, Any]) -> List[LLMEndpoint]:
+        """
+        Return the endpoints in the order they should be tried for a request.
+
+        Args:
+            endpoints (List[LLMEndpoint]): The configured endpoints, primary first.
+            request (Dict[str, Any]): The request parameters, including 'messages'.
+
+        Returns:
+            List[LLMEndpoint]: The endpoints to try, in order.
+        """
+        if not self.short_prompt:
+            return list(endpoints)
+        if len(str(request['messages'])) > self.short_prompt.get('max_chars', 0):
+            return list(endpoints)
+        preferred = [e for e in endpoints if e.model == self.short_prompt.get('model')]
+        return preferred + [e for e in endpoints if e not in preferred]
+
+    def should_fall_back(self, error: Exception) -> bool:
+        """Whether a failed attempt should be followed by the next endpoint."""
+        kind = 'timeout' if isinstance(error, openai.APITimeoutError) else 'error'
+        return kind in self.fallback_on
+
+    def run(self,
+            attempts: List[Callable[[], Any]],
+            cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Run attempts in order until one succeeds.
+
+        Args:
+            attempts (List[Callable[[], Any]]): One callable per endpoint, in routing order.
+            cancel_token (Optional[CancellationToken]): Token of the run the request belongs to.
+
+        Returns:
+            Any: The result of the first successful attempt.
+
+        Raises:
+            RunCancelledError: If the run is cancelled.
+            Exception: The error of the last attempt if none succeeded.
+        """
+        if self.hedge_after is None:
+            return self._run_sequential(attempts)
+        return race(attempts, self.hedge_after, self.should_fall_back, cancel_token)
+
+    def _run_sequential(self, attempts: List[Callable[[], Any]]) -> Any:
+        for index, attempt in enumerate(attempts):
+            try:
+                return attempt()
+            except RunCancelledError:
+                raise
+            except Exception as e:
+                if index == len(attempts) - 1 or not self.should_fall_back(e):
+                    raise
+
+
+def race(attempts: List[Callable[[], Any]],
+         hedge_after: float,
+         should_fall_back: Callable[[Exception], bool],
+         cancel_token: Optional[CancellationToken] = None,
+         allow_hedge: Optional[Callable[[], bool]] = None) -> Any:
+    """
+    Start attempts one after another, each ``hedge_after`` seconds after the previous one
+    or as soon as the previous one failed, and return the first success.
+
+    Args:
+        attempts (List[Callable[[], Any]]): The attempts, in the order they may be started.
+        hedge_after (float): Seconds to wait for the running attempts before starting the next.
+        should_fall_back (Callable[[Exception], bool]): Whether a failure starts the next attempt.
+        cancel_token (Optional[CancellationToken]): Token of the run the request belongs to.
+        allow_hedge (Optional[Callable[[], bool]]): Asked before an attempt is started because
+            the running ones are slow (not because one failed); returning False stops hedging.
+
+    Returns:
+        Any: The result of the first successful attempt. Slower attempts are abandoned.
+
+    Raises:
+        RunCancelledError: If the run is cancelled.
+        Exception: The error of the last failed attempt if none succeeded.
+    """
+    depth = getattr(_race_depth, 'value', 0)
+    executor = _get_executor(depth)
+    pending: Dict[Future, int] = {}
+    next_index = 0
+    hedging = True
+    last_error: Optional[Exception] = None
+
+    def start():
+        nonlocal next_index
+        pending[executor.submit(_at_depth(depth, attempts[next_index]))] = next_index
+        next_index += 1
+
+    start()
+    while pending:
+        timeout = hedge_after if hedging and next_index < len(attempts) else None
+        if cancel_token and cancel_token.remaining() is not None:
+            timeout = cancel_token.remaining() if timeout is None else min(timeout, cancel_token.remaining())
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+
+        if not done:
+            if next_index < len(attempts):
+                if allow_hedge is None or allow_hedge():
+                    start()
+                else:
+                    hedging = False
+            continue
+
+        for future in done:
+            pending.pop(future)
+            try:
+                result = future.result()
+            except RunCancelledError:
+                raise
+            except Exception as e:
+                last_error = e
+                if next_index < len(attempts) and should_fall_back(e):
+                    start()
+                continue
+            for other in pending:
+                other.cancel()
+            return result
+
+    raise last_error
+
+
+class _HedgeBudget:
+    """Counts requests and hedges of one model, decaying so the ratio follows recent traffic."""
+
+    WINDOW = 1000
+
+    def __init__(self):
+        self.requests = 0.0
+        self.hedges = 0.0
+        self.hedges_total = 0
+        self.hedge_wins = 0
+
+    def record_request(self) -> None:
+        self.requests += 1
+        if self.requests > self.WINDOW:
+            self.requests /= 2
+            self.hedges /= 2
+
+    def try_spend(self, budget: float) -> bool:
+        if self.hedges + 1 > budget * self.requests:
+            return False
+        self.hedges += 1
+        self.hedges_total += 1
+        return True
+
+
+_budgets: Dict[str, _HedgeBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+class HedgingPolicy:
+    """
+    Sends a duplicate of a slow request and keeps whichever answer arrives first.
+
+    Attributes:
+        percentile (float): Latency percentile of the model after which a request is hedged.
+        min_samples (int): Recorded requests needed before the percentile is used.
+        initial_delay (Optional[float]): Delay used before ``min_samples`` requests were seen.
+            If None, no hedging happens until then.
+        min_delay (float): Lower bound for the hedging delay, in seconds.
+        max_delay (Optional[float]): Upper bound for the hedging delay, in seconds.
+        budget (float): Maximum ratio of hedged to total requests per model.
+        endpoint (Optional[str]): Model of the configured endpoint that receives the
+            duplicate. Defaults to the endpoint of the original request.
+    """
+
+    def __init__(self,
+                 percentile: float = 95,
+                 min_samples: int = 20,
+                 initial_delay: Optional[float] = None,
+                 min_delay: float = 0.05,
+                 max_delay: Optional[float] = None,
+                 budget: float = 0.05,
+                 endpoint: Optional[str] = None):
+        """Initialize the policy. See the class attributes for the meaning of each argument."""
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.endpoint = endpoint
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'HedgingPolicy':
+        """
+        Build a policy from the ``hedging`` section of an llm_config.
+
+        Args:
+            config (Dict[str, Any]): The hedging settings.
+
+        Returns:
+            HedgingPolicy: The policy.
+        """
+        return cls(**config)
+
+    def delay(self, model: str) -> Optional[float]:
+        """
+        Return how long to wait for a request to a model before hedging it.
+
+        Args:
+            model (str): The model of the original request.
+
+        Returns:
+            Optional[float]: The delay in seconds, or None if the request should not be hedged.
+        """
+        histogram = get_histogram(model)
+        if histogram.count < self.min_samples:
+            delay = self.initial_delay
+        else:
+            delay = histogram.percentile(self.percentile)
+        if delay is None:
+            return None
+        delay = max(self.min_delay, delay)
+        return min(delay, self.max_delay) if self.max_delay is not None else delay
+
+    def run(self,
+            primary: Callable[[], Any],
+            hedge: Callable[[], Any],
+            model: str,
+            cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Run the primary request and hedge it if it is slow and the budget allows.
+
+        Args:
+            primary (Callable[[], Any]): Sends the original request.
+            hedge (Callable[[], Any]): Sends the duplicate request.
+            model (str): The model of the original request, for its latency and budget.
+            cancel_token (Optional[CancellationToken]): Token of the run the request belongs to.
+
+        Returns:
+            Any: The first successful response.
+        """
+        with _budgets_lock:
+            budget = _budgets.setdefault(model, _HedgeBudget())
+            budget.record_request()
+
+        delay = self.delay(model)
+        if delay is None:
+            return primary()
+
+        def allow_hedge() -> bool:
+            with _budgets_lock:
+                return budget.try_spend(self.budget)
+
+        winner, result = race([lambda: (0, primary()), lambda: (1, hedge())],
+                              delay,
+                              lambda e: False,
+                              cancel_token,
+                              allow_hedge=allow_hedge)
+        if winner:
+            with _budgets_lock:
+                budget.hedge_wins += 1
+        return result
+
+
+def hedging_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Return hedging counters per model.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Hedged requests and how many of them answered first.
+    """
+    with _budgets_lock:
+        return {model: {"hedges": b.hedges_total, "hedge_wins": b.hedge_wins} for model, b in _budgets.items()}
@@ -8,11 +8,13 @@ users and multiple specialized AI agents.
 import json, uuid
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Union, Callable
+from typing import List, Dict, Any, Optional, Union, Callable, Tuple
 from openai.types.chat import ChatCompletionMessage
 from xronai.core import AI
 from xronai.core import Agent
-from xronai.history import HistoryManager, EntityType
+from xronai.core.cancellation import CancellationToken, RunCancelledError
+from xronai.core.lazy import LazyNode
+from xronai.history import HistoryManager, EntityType, RunCheckpoint
 from xronai.utils import Debugger
 
 
@@ -35,7 +37,8 @@ class Supervisor(AI):
                  is_assistant: bool = False,
                  system_message: Optional[str] = None,
                  use_agents: bool = True,
-                 history_base_path: Optional[str] = None):
+                 history_base_path: Optional[str] = None,
+                 checkpoint_runs: bool = False):
         """
         Initialize the Supervisor instance.
 
@@ -47,6 +50,8 @@ class Supervisor(AI):
             system_message (Optional[str]): The initial system message for the agent.
             use_agents (bool): Whether to use agents or not.
             history_base_path (Optional[str]): The root directory for storing history logs.
+            checkpoint_runs (bool): Checkpoint the runs this supervisor answers as the entry
+                point, so they can be continued with ``resume`` (see xronai.history.checkpoint).
 
         Raises:
             ValueError: If the name is empty or if workflow management rules are violated.
@@ -60,6 +65,7 @@ class Supervisor(AI):
         self.is_assistant = is_assistant
         self.workflow_id = workflow_id
         self.history_base_path = history_base_path
+        self.checkpoint_runs = checkpoint_runs
 
         self.chat_history: List[Dict[str, str]] = []
         self._pending_registrations: List[Union[Agent, 'Supervisor']] = []
@@ -140,12 +146,13 @@ class Supervisor(AI):
         """
         self.system_message = {"role": "system", "content": system_prompt}
 
-    def register_agent(self, agent: Union[Agent, 'Supervisor']) -> None:
+    def register_agent(self, agent: Union[Agent, 'Supervisor', LazyNode]) -> None:
         """
         Register a new agent or assistant supervisor.
 
         Args:
-            agent (Union[Agent, Supervisor]): The agent or assistant supervisor to register.
+            agent (Union[Agent, Supervisor, LazyNode]): The agent or assistant supervisor to register,
+                or a stand-in that builds it on first delegation.
 
         Raises:
             ValueError: If attempting to register a main supervisor or if registration rules are violated.
@@ -176,10 +183,11 @@ class Supervisor(AI):
         self.debugger.update_workflow_id(workflow_id)
         self.history_manager = HistoryManager(workflow_id, base_path=self.history_base_path)
         self._initialize_chat_history()
-        self._process_pending_registrations()
 
         for agent in self.registered_agents:
             agent.set_workflow_id(workflow_id, history_base_path=history_base_path)
+        # Pending agents are assigned to the session as they are registered.
+        self._process_pending_registrations()
 
     def _process_pending_registrations(self) -> None:
         """Process any pending agent registrations."""
@@ -249,6 +257,24 @@ class Supervisor(AI):
         if not history_file.exists():
             history_file.touch()
 
+    def _resolve_agent(self, agent: Union[Agent, 'Supervisor', LazyNode]) -> Union[Agent, 'Supervisor']:
+        """
+        Return a registered agent ready to chat, building it if it is a LazyNode.
+
+        The built node replaces the stand-in in ``registered_agents``.
+
+        Args:
+            agent (Union[Agent, Supervisor, LazyNode]): A registered agent.
+
+        Returns:
+            Union[Agent, Supervisor]: The agent itself, or the node built from the stand-in.
+        """
+        if not isinstance(agent, LazyNode):
+            return agent
+        node = agent.resolve()
+        self.registered_agents = [node if registered is agent else registered for registered in self.registered_agents]
+        return node
+
     def get_registered_agents(self) -> List[str]:
         """
         Get the names of all registered agents.
@@ -262,7 +288,9 @@ class Supervisor(AI):
                           message: ChatCompletionMessage,
                           parent_msg_id: str,
                           supervisor_chain: Optional[List[str]] = None,
-                          on_event: Optional[Callable] = None) -> str:
+                          on_event: Optional[Callable] = None,
+                          cancel_token: Optional[CancellationToken] = None,
+                          checkpoint: Optional[RunCheckpoint] = None) -> str:
         """
         Delegate a task to the appropriate agent based on the supervisor's response.
 
@@ -271,6 +299,8 @@ class Supervisor(AI):
             parent_msg_id (str): ID of the parent message in history.
             supervisor_chain (Optional[List[str]]): Chain of supervisors involved in delegation.
             on_event (Optional[Callable]): The event callback function.
+            cancel_token (Optional[CancellationToken]): Cancellation token passed on to the agent.
+            checkpoint (Optional[RunCheckpoint]): Checkpoint of the run, passed on to the agent.
 
         Returns:
             str: The response from the delegated agent.
@@ -295,6 +325,7 @@ class Supervisor(AI):
 
         if not target_agent:
             raise ValueError(f"No agent found with name '{target_agent_name}'")
+        target_agent = self._resolve_agent(target_agent)
 
         self.debugger.log(f"[DELEGATION] Agent: {target_agent_name}")
         self.debugger.log(f"[REASONING] {reasoning}")
@@ -320,7 +351,9 @@ class Supervisor(AI):
 
         agent_response = target_agent.chat(query=f"CONTEXT:\n{context}\n\nQUERY:\n{query}",
                                            sender_name=self.name,
-                                           on_event=on_event)
+                                           on_event=on_event,
+                                           cancel_token=cancel_token,
+                                           checkpoint=checkpoint)
         self.debugger.log(f"[RESPONSE] {target_agent_name}: {agent_response}")
         return agent_response
 
@@ -328,25 +361,42 @@ class Supervisor(AI):
              query: str,
              sender_name: Optional[str] = None,
              supervisor_chain: Optional[List[str]] = None,
-             on_event: Optional[Callable] = None) -> str:
+             on_event: Optional[Callable] = None,
+             cancel_token: Optional[CancellationToken] = None,
+             checkpoint: Optional[RunCheckpoint] = None) -> str:
         """
         Process user input and generate a response using the appropriate agents.
 
+        When the supervisor is the entry point and has ``checkpoint_runs`` set, the run,
+        including the delegation stack, is checkpointed after every step and can be
+        continued with ``resume`` if it is interrupted.
+
         Args:
             query (str): The user's input query.
             sender_name (Optional[str]): Name of the sender (for assistant supervisors).
             supervisor_chain (Optional[List[str]]): Chain of supervisors in delegation.
             on_event (Optional[Callable]): A callback function to stream events to.
+            cancel_token (Optional[CancellationToken]): Token that stops the run, including
+                delegated agents, once cancelled or past its deadline.
+            checkpoint (Optional[RunCheckpoint]): Checkpoint of the run this query belongs
+                to, passed on by a delegating Supervisor.
 
         Returns:
             str: The final response to the user's query.
 
         Raises:
             RuntimeError: If there's an error in processing the user input.
+            RunCancelledError: If the run was cancelled or its deadline has passed.
         """
         self.debugger.log(f"[USER INPUT] {query}")
 
-        self._emit_event(on_event, "WORKFLOW_START", {"user_query": query})
+        if sender_name is None and self.checkpoint_runs:
+            checkpoint = RunCheckpoint.start(self.history_manager.workflow_path, self.name, query)
+
+        self._emit_event(on_event, "WORKFLOW_START", {
+            "user_query": query,
+            "run_id": checkpoint.run_id if checkpoint else None
+        })
 
         current_chain = supervisor_chain or []
         if self.name not in current_chain:
@@ -361,11 +411,154 @@ class Supervisor(AI):
             sender_name=sender_name or "user",
             supervisor_chain=current_chain)
 
+        if checkpoint:
+            checkpoint.push_frame(self.name,
+                                  query,
+                                  sender_name,
+                                  user_msg_id,
+                                  len(self.chat_history),
+                                  supervisor_chain=current_chain)
+
+        return self._chat_loop(user_msg_id, current_chain, sender_name, on_event, cancel_token, checkpoint)
+
+    def resume(self,
+               run_id: str,
+               on_event: Optional[Callable] = None,
+               cancel_token: Optional[CancellationToken] = None) -> str:
+        """
+        Continue an interrupted run from its last completed step.
+
+        The chat histories of the supervisor and of every agent the run was delegated to
+        are rebuilt from the session history, and the most deeply delegated agent continues
+        where it stopped. LLM requests, tool calls and delegations that completed before
+        the interruption are not repeated. A tool call that was in progress is run again.
+
+        Args:
+            run_id (str): ID of the run, as reported in its WORKFLOW_START event.
+            on_event (Optional[Callable]): A callback function to stream events to.
+            cancel_token (Optional[CancellationToken]): Token that stops the run.
+
+        Returns:
+            str: The final response to the run's query.
+
+        Raises:
+            ValueError: If the run does not exist (runs that completed are not kept), was not
+                started on this supervisor, or was delegated to an agent that is no longer
+                registered.
+            RuntimeError: If there's an error in processing the query.
+            RunCancelledError: If the run was cancelled or its deadline has passed.
+        """
+        checkpoint = RunCheckpoint.load(self.history_manager.workflow_path, run_id, entity=self.name)
+        if checkpoint.status == RunCheckpoint.COMPLETED:
+            return checkpoint.response
+
+        self.debugger.log(f"[RESUME] Run {run_id} at depth {len(checkpoint.frames)}")
+        checkpoint.finish(RunCheckpoint.RUNNING)
+        self._emit_event(on_event, "WORKFLOW_START", {"user_query": checkpoint.query, "run_id": run_id, "resumed": True})
+        return self._resume_frame(checkpoint, 0, on_event, cancel_token)
+
+    def _resume_frame(self,
+                      checkpoint: RunCheckpoint,
+                      depth: int,
+                      on_event: Optional[Callable] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> str:
+        """
+        Rebuild the chat history of a checkpointed frame from the session history and
+        continue its loop.
+
+        A delegation in progress is resumed in the agent of the next frame. A delegation
+        that returned before the interruption uses the recorded result.
+        """
+        frame = checkpoint.frames[depth]
+        self.chat_history = checkpoint.restore_history(depth, self.history_manager, self.chat_history)
+
+        pending = None
+        last = self.chat_history[-1] if self.chat_history else {}
+        if last.get('role') == 'assistant' and last.get('tool_calls'):
+            feedback = None
+            if depth + 1 < len(checkpoint.frames):
+                child_name = checkpoint.frames[depth + 1]['entity']
+                child = next((agent for agent in self.registered_agents if agent.name == child_name), None)
+                if not child:
+                    raise ValueError(f"Run {checkpoint.run_id} was delegated to unknown agent '{child_name}'")
+                child = self._resolve_agent(child)
+                feedback = lambda: child._resume_frame(checkpoint, depth + 1, on_event, cancel_token)
+            elif frame['result'] is not None:
+                feedback = lambda: frame['result']
+            pending = (ChatCompletionMessage(**last), frame['pending_msg_id'], feedback)
+
+        return self._chat_loop(frame['query_msg_id'], frame['supervisor_chain'] or [self.name], frame['sender_name'],
+                               on_event, cancel_token, checkpoint, pending)
+
+    def _chat_loop(self,
+                   user_msg_id: str,
+                   current_chain: List[str],
+                   sender_name: Optional[str] = None,
+                   on_event: Optional[Callable] = None,
+                   cancel_token: Optional[CancellationToken] = None,
+                   checkpoint: Optional[RunCheckpoint] = None,
+                   pending: Optional[Tuple[ChatCompletionMessage, str, Optional[Callable[[], str]]]] = None) -> str:
+        """
+        Alternate LLM requests and delegations until the model answers the query.
+
+        Args:
+            user_msg_id (str): History ID of the query being answered.
+            current_chain (List[str]): Chain of supervisors in delegation.
+            sender_name (Optional[str]): Name of the sender, None for the entry point.
+            on_event (Optional[Callable]): The event callback function.
+            cancel_token (Optional[CancellationToken]): Token that stops the run.
+            checkpoint (Optional[RunCheckpoint]): Checkpoint updated after every step.
+            pending (Optional[Tuple]): A delegation already in the chat history that still
+                needs its result: the message, its history ID, and a callable returning the
+                result (None to delegate again).
+
+        Returns:
+            str: The final response to the query.
+        """
         try:
             while True:
+                if pending:
+                    message, tool_msg_id, feedback = pending
+                    pending = None
+                    tool_call = message.tool_calls[0]
+                    if feedback:
+                        agent_feedback = feedback()
+                    else:
+                        agent_feedback = self.delegate_to_agent(message,
+                                                                tool_msg_id,
+                                                                supervisor_chain=current_chain,
+                                                                on_event=on_event,
+                                                                cancel_token=cancel_token,
+                                                                checkpoint=checkpoint)
+
+                    self._emit_event(
+                        on_event,
+                        "AGENT_RESPONSE",
+                        {
+                            "source": {
+                                "name": tool_call.function.name.replace("delegate_to_", ""),
+                                "type": "AGENT"
+                            },  # A bit of a hack to get agent name
+                            "content": agent_feedback
+                        })
+
+                    feedback_msg = {"role": "tool", "content": agent_feedback, "tool_call_id": tool_call.id}
+                    self.chat_history.append(feedback_msg)
+
+                    target_agent_name = tool_call.function.name.replace("delegate_to_", "")
+                    self.history_manager.append_message(message=feedback_msg,
+                                                        sender_type=EntityType.TOOL,
+                                                        sender_name=target_agent_name,
+                                                        parent_id=tool_msg_id,
+                                                        tool_call_id=tool_call.id,
+                                                        supervisor_chain=current_chain)
+                    if checkpoint:
+                        checkpoint.update_frame(len(self.chat_history))
+
                 supervisor_response = self.generate_response(self.chat_history,
                                                              tools=self.available_tools,
-                                                             use_tools=self.use_agents).choices[0]
+                                                             use_tools=self.use_agents,
+                                                             cancel_token=cancel_token).choices[0]
 
                 if not supervisor_response.finish_reason == "tool_calls":
                     query_answer = supervisor_response.message.content
@@ -380,6 +573,8 @@ class Supervisor(AI):
                                                         sender_name=self.name,
                                                         parent_id=user_msg_id,
                                                         supervisor_chain=current_chain)
+                    if checkpoint:
+                        checkpoint.complete_frame(query_answer)
 
                     self._emit_event(
                         on_event, "FINAL_RESPONSE", {
@@ -417,50 +612,32 @@ class Supervisor(AI):
                     parent_id=user_msg_id,
                     tool_call_id=tool_call.id,
                     supervisor_chain=current_chain)
-
-                if hasattr(supervisor_response.message, 'tool_calls') and supervisor_response.message.tool_calls:
-                    agent_feedback = self.delegate_to_agent(supervisor_response.message,
-                                                            tool_msg_id,
-                                                            supervisor_chain=current_chain,
-                                                            on_event=on_event)
-
-                    self._emit_event(
-                        on_event,
-                        "AGENT_RESPONSE",
-                        {
-                            "source": {
-                                "name": tool_call.function.name.replace("delegate_to_", ""),
-                                "type": "AGENT"
-                            },  # A bit of a hack to get agent name
-                            "content": agent_feedback
-                        })
-
-                    feedback_msg = {"role": "tool", "content": agent_feedback, "tool_call_id": tool_call.id}
-                    self.chat_history.append(feedback_msg)
-
-                    target_agent_name = tool_call.function.name.replace("delegate_to_", "")
-                    self.history_manager.append_message(message=feedback_msg,
-                                                        sender_type=EntityType.TOOL,
-                                                        sender_name=target_agent_name,
-                                                        parent_id=tool_msg_id,
-                                                        tool_call_id=tool_call.id,
-                                                        supervisor_chain=current_chain)
-                else:
-                    final_content = supervisor_response.message.content
-                    self._emit_event(
-                        on_event, "FINAL_RESPONSE", {
-                            "source": {
-                                "name": self.name,
-                                "type": "ASSISTANT_SUPERVISOR" if self.is_assistant else "SUPERVISOR"
-                            },
-                            "content": final_content
-                        })
-                    self._emit_event(on_event, "WORKFLOW_END", {})
-                    return final_content
+                if checkpoint:
+                    checkpoint.update_frame(len(self.chat_history), pending_msg_id=tool_msg_id)
+
+                pending = (supervisor_response.message, tool_msg_id, None)
+
+        except RunCancelledError as e:
+            self.debugger.log(f"[CANCELLED] {e}", level="warning")
+            if sender_name is None:
+                if checkpoint:
+                    checkpoint.finish(RunCheckpoint.CANCELLED, str(e))
+                self._emit_event(
+                    on_event, "WORKFLOW_CANCELLED", {
+                        "source": {
+                            "name": self.name,
+                            "type": "ASSISTANT_SUPERVISOR" if self.is_assistant else "SUPERVISOR"
+                        },
+                        "reason": str(e)
+                    })
+                self._emit_event(on_event, "WORKFLOW_END", {})
+            raise
 
         except Exception as e:
             error_msg = f"Error in processing user input: {str(e)}"
             self.debugger.log(f"[ERROR] {error_msg}", level="error")
+            if sender_name is None and checkpoint:
+                checkpoint.finish(RunCheckpoint.FAILED, error_msg)
             self._emit_event(
                 on_event, "ERROR", {
                     "source": {
@@ -605,7 +782,7 @@ class Supervisor(AI):
                 self.name,
             'registered_agents': [{
                 'name': agent.name,
-                'type': 'supervisor' if isinstance(agent, Supervisor) else 'agent'
+                'type': 'supervisor' if isinstance(agent, Supervisor) or getattr(agent, 'is_supervisor', False) else 'agent'
             } for agent in self.registered_agents]
         }
 
@@ -629,7 +806,11 @@ class Supervisor(AI):
             agent_prefix = "└── " if is_last_agent else "├── "
             current_indent = indent + ("    " if is_last_agent else "│   ")
 
-            if isinstance(agent, Supervisor):
+            if isinstance(agent, LazyNode):
+                node_type = "Assistant Supervisor" if agent.is_supervisor else "Agent"
+                print(f"{indent}{agent_prefix}{node_type}: {agent.name}")
+                print(f"{current_indent}└── Not built yet")
+            elif isinstance(agent, Supervisor):
                 print(f"{indent}{agent_prefix}Assistant Supervisor: {agent.name}")
                 agent.display_agent_graph(current_indent, skip_header=True)  # Skip header for recursive calls
             else:
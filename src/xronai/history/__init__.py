@@ -1,3 +1,6 @@
 from .history_manager import HistoryManager, EntityType
+from .session_index import SessionIndex
+from .checkpoint import RunCheckpoint
+from .blob_store import BlobStore
 
-__all__ = ['HistoryManager', 'EntityType']
+__all__ = ['HistoryManager', 'EntityType', 'SessionIndex', 'RunCheckpoint', 'BlobStore']
@@ -0,0 +1,277 @@
+"""
+Content-addressed storage for large message content.
+
+Large strings of the history (see xronai.history.history_manager) and large tool
+results are written once to a ``BlobStore`` instead of being copied into the history
+log, the chat history and every later LLM request. The history keeps a reference to
+the blob. All sessions under a history root share one store, so content repeated
+across sessions (system messages, tool schemas, shared context) is stored once:
+
+    <base_path>/.blobs/<first 2 hex digits>/<sha256 hex>
+
+Histories written before the store was shared keep their blobs in
+``<base_path>/<workflow_id>/blobs/``, which is still read.
+
+References have the form ``sha256:<hex>``. Storing the same content twice writes it
+once. A store without a directory keeps its blobs in memory, for agents that do not
+persist their history. Recently read blobs are cached for the whole process; since
+blobs are addressed by their content, the cache can never be stale.
+
+Deleting a session leaves its blobs behind, since other sessions may reference them.
+``BlobStore.collect_garbage`` removes the blobs no session references any more; the
+server runs it at startup and after deleting sessions. Blobs written or reused within
+the grace period are kept, so content stored by a run whose history record is not
+written yet is never collected.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import collections
+from pathlib import Path
+from typing import Dict, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+REF_PREFIX = "sha256:"
+
+_REF_PATTERN = re.compile(rb"sha256:([0-9a-f]{64})")
+
+
+class BlobStore:
+    """
+    A content-addressed store of text blobs.
+
+    Attributes:
+        root (Optional[Path]): The blob directory, or None for an in-memory store.
+        fallback (Optional[Path]): A directory of older blobs that is read, never written.
+    """
+
+    DIRNAME = "blobs"
+    SHARED_DIRNAME = ".blobs"
+    CACHE_CHARS = 32 * 1024 * 1024
+    GC_GRACE_SECONDS = 3600
+
+    _cache: 'collections.OrderedDict[str, str]' = collections.OrderedDict()
+    _cache_chars = 0
+    _cache_lock = threading.Lock()
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, fallback: Optional[Union[str, Path]] = None):
+        """
+        Initialize the store.
+
+        Args:
+            root (Optional[Union[str, Path]]): The blob directory. It is created on the
+                first write. If None, blobs are kept in memory.
+            fallback (Optional[Union[str, Path]]): A directory of older blobs to read
+                references from when they are not in root.
+        """
+        self.root = Path(root) if root is not None else None
+        self.fallback = Path(fallback) if fallback is not None else None
+        self._memory: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_workflow(cls, workflow_path: Union[str, Path]) -> 'BlobStore':
+        """Return the shared store of the history root holding a session directory."""
+        workflow_path = Path(workflow_path)
+        return cls(workflow_path.parent / cls.SHARED_DIRNAME, fallback=workflow_path / cls.DIRNAME)
+
+    def put(self, content: str) -> str:
+        """
+        Store content.
+
+        Args:
+            content (str): The content to store.
+
+        Returns:
+            str: The reference of the content.
+        """
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        ref = REF_PREFIX + digest
+        if self.root is None:
+            with self._lock:
+                self._memory[digest] = content
+            return ref
+
+        path = self._path(digest)
+        try:
+            # Reusing a blob restarts its grace period, so a sweep cannot remove it
+            # before the record that references it is written.
+            os.utime(path)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp, path)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """
+        Return the content of a reference.
+
+        Args:
+            ref (str): A reference returned by ``put``.
+
+        Returns:
+            str: The stored content.
+
+        Raises:
+            KeyError: If the reference is malformed or not in the store.
+        """
+        digest = self._digest(ref)
+        if self.root is None:
+            with self._lock:
+                if digest not in self._memory:
+                    raise KeyError(f"Unknown blob: {ref}")
+                return self._memory[digest]
+
+        with self._cache_lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+
+        path = self._find(digest)
+        if path is None:
+            raise KeyError(f"Unknown blob: {ref}")
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        if len(content) <= self.CACHE_CHARS // 8:
+            with self._cache_lock:
+                if digest not in BlobStore._cache:
+                    BlobStore._cache[digest] = content
+                    BlobStore._cache_chars += len(content)
+                while BlobStore._cache_chars > self.CACHE_CHARS:
+                    BlobStore._cache_chars -= len(BlobStore._cache.popitem(last=False)[1])
+        return content
+
+    def exists(self, ref: str) -> bool:
+        """Return whether the store holds a reference."""
+        try:
+            digest = self._digest(ref)
+        except KeyError:
+            return False
+        if self.root is None:
+            with self._lock:
+                return digest in self._memory
+        return self._find(digest) is not None
+
+    @staticmethod
+    def is_ref(value: object) -> bool:
+        """Return whether a value looks like a blob reference."""
+        return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+    def _digest(self, ref: str) -> str:
+        digest = ref[len(REF_PREFIX):] if self.is_ref(ref) else ""
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise KeyError(f"Invalid blob reference: {ref}")
+        return digest
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _find(self, digest: str) -> Optional[Path]:
+        """Return the file holding a blob, in root or else in the fallback directory."""
+        for root in (self.root, self.fallback):
+            if root is not None:
+                path = root / digest[:2] / digest
+                if path.exists():
+                    return path
+        return None
+
+    @classmethod
+    def collect_garbage(cls, base_path: Union[str, Path], grace_seconds: Optional[float] = None) -> int:
+        """
+        Remove the blobs of a history root's shared store that no session references.
+
+        Every file of every session directory is scanned for references, decompressing
+        sealed history segments. Blobs modified within the grace period are kept. If a
+        file cannot be read, nothing is removed.
+
+        Args:
+            base_path (Union[str, Path]): The history root.
+            grace_seconds (Optional[float]): Age below which blobs are kept. Defaults to
+                GC_GRACE_SECONDS.
+
+        Returns:
+            int: The number of blobs removed.
+        """
+        base_path = Path(base_path)
+        store = base_path / cls.SHARED_DIRNAME
+        if not store.is_dir():
+            return 0
+
+        cutoff = time.time() - (cls.GC_GRACE_SECONDS if grace_seconds is None else grace_seconds)
+        try:
+            referenced = _referenced_digests(base_path)
+        except OSError as e:
+            logger.warning("Skipping blob garbage collection: %s", e)
+            return 0
+        removed = 0
+        for prefix in os.scandir(store):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                digest = entry.name.split('.', 1)[0]
+                try:
+                    if digest in referenced or entry.stat().st_mtime >= cutoff:
+                        continue
+                    os.remove(entry.path)
+                    removed += 1 if entry.name == digest else 0
+                except FileNotFoundError:
+                    continue
+        if removed:
+            logger.info("Removed %d unreferenced blobs from %s", removed, store)
+        return removed
+
+
+def _referenced_digests(base_path: Path) -> Set[str]:
+    """
+    Return the digests referenced by any file of the session directories under a history root.
+
+    Raises:
+        OSError: If a file cannot be read, since its references would be missed.
+    """
+    from .storage import _CODEC_SUFFIXES, _decompress
+
+    compressed = {suffix: codec for codec, suffix in _CODEC_SUFFIXES.items()}
+    referenced: Set[str] = set()
+    for session in os.scandir(base_path):
+        if not session.is_dir() or session.name == BlobStore.SHARED_DIRNAME:
+            continue
+        for root, dirs, files in os.walk(session.path):
+            dirs[:] = [d for d in dirs if d != BlobStore.DIRNAME]
+            for name in files:
+                path = os.path.join(root, name)
+                codec = next((codec for suffix, codec in compressed.items() if name.endswith(suffix)), None)
+                try:
+                    if codec:
+                        with open(path, 'rb') as f:
+                            data = _decompress(f.read(), codec)
+                        referenced.update(m.decode('ascii') for m in _REF_PATTERN.findall(data))
+                    else:
+                        _scan_file(path, referenced)
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    raise OSError(f"Cannot scan {path} for blob references: {e}") from e
+    return referenced
+
+
+def _scan_file(path: str, referenced: Set[str], chunk_size: int = 1024 * 1024) -> None:
+    """Add the digests referenced in a file to referenced, reading it in chunks."""
+    overlap = len(REF_PREFIX) + 64
+    tail = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            data = tail + chunk
+            referenced.update(m.decode('ascii') for m in _REF_PATTERN.findall(data))
+            tail = data[-overlap:]
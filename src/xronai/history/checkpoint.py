@@ -0,0 +1,278 @@
+"""
+Checkpoints of runs in progress, so an interrupted run can be resumed.
+
+A run is one query to the entry point of a workflow. While it is in progress its state
+is a stack of frames, one per active chat loop: the entry point at the bottom and the
+most deeply delegated agent at the top. A frame holds what its loop needs to continue
+without repeating completed work:
+
+    {"entity": "Researcher",
+     "query": "...",                    # the query the loop is answering
+     "sender_name": "Main",             # None for the entry point
+     "query_msg_id": "...",             # history ID of that query
+     "supervisor_chain": ["Main"],
+     "history_base": 12,                # length of the entity's chat history before the query
+     "history_len": 15,                 # and after its last step
+     "pending_msg_id": "...",           # tool call or delegation awaiting its result
+     "result": null}                    # the delegation's result, once it has returned
+
+A frame does not copy the chat history. The messages of the run are already in the
+session history, so the frame only records where they start and how many of them the
+last step had written, and saving a step costs the same however long the conversation.
+
+Checkpointing is enabled per entry point with ``checkpoint_runs=True`` (the server
+enables it). The checkpoint is rewritten atomically after every completed step (an LLM
+response, a tool result, a finished delegation), next to the session history, and
+deleted once the run completes:
+
+    <base_path>/<workflow_id>/runs/<run_id>.json
+
+``Agent.resume`` and ``Supervisor.resume`` rebuild the chat histories of all frames from
+the session history and continue the top one from its last step, so LLM requests and
+tool calls that completed before the interruption are not repeated. A tool call that was
+in flight when the process died is run again.
+"""
+
+import os
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+class RunCheckpoint:
+    """
+    The persisted state of one run.
+
+    Attributes:
+        path (Path): The checkpoint file.
+        data (Dict[str, Any]): The checkpoint content: 'run_id', 'entity', 'query',
+            'status', 'frames', 'response', 'error', 'created_at' and 'updated_at'.
+    """
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    RUNS_DIRNAME = "runs"
+
+    def __init__(self, path: Path, data: Dict[str, Any]):
+        self.path = path
+        self.data = data
+
+    @property
+    def run_id(self) -> str:
+        return self.data['run_id']
+
+    @property
+    def status(self) -> str:
+        return self.data['status']
+
+    @property
+    def query(self) -> str:
+        return self.data['query']
+
+    @property
+    def response(self) -> Optional[str]:
+        return self.data.get('response')
+
+    @property
+    def frames(self) -> List[Dict[str, Any]]:
+        return self.data['frames']
+
+    @classmethod
+    def start(cls, workflow_path: Union[str, Path], entity: str, query: str) -> 'RunCheckpoint':
+        """
+        Create the checkpoint of a new run.
+
+        Args:
+            workflow_path (Union[str, Path]): The session directory holding the history.
+            entity (str): Name of the entry point answering the query.
+            query (str): The user's query.
+
+        Returns:
+            RunCheckpoint: The checkpoint, not yet written.
+        """
+        run_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+        data = {
+            "run_id": run_id,
+            "entity": entity,
+            "query": query,
+            "status": cls.RUNNING,
+            "frames": [],
+            "response": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        return cls(Path(workflow_path) / cls.RUNS_DIRNAME / f"{run_id}.json", data)
+
+    @classmethod
+    def load(cls, workflow_path: Union[str, Path], run_id: str, entity: Optional[str] = None) -> 'RunCheckpoint':
+        """
+        Load the checkpoint of a run.
+
+        Args:
+            workflow_path (Union[str, Path]): The session directory holding the history.
+            run_id (str): ID of the run.
+            entity (Optional[str]): If given, the entry point the run must have been started on.
+
+        Returns:
+            RunCheckpoint: The checkpoint.
+
+        Raises:
+            ValueError: If the run does not exist or was started on another entry point.
+        """
+        path = Path(workflow_path) / cls.RUNS_DIRNAME / f"{run_id}.json"
+        if Path(run_id).name != run_id or not path.exists():
+            raise ValueError(f"Run not found: {run_id}")
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if entity is not None and data['entity'] != entity:
+            raise ValueError(f"Run {run_id} was started on '{data['entity']}', not '{entity}'")
+        return cls(path, data)
+
+    @classmethod
+    def list_runs(cls, workflow_path: Union[str, Path]) -> List[Dict[str, Any]]:
+        """
+        Summarize the runs of a session, most recently updated first.
+
+        Args:
+            workflow_path (Union[str, Path]): The session directory holding the history.
+
+        Returns:
+            List[Dict[str, Any]]: For each run its 'run_id', 'entity', 'query', 'status',
+                'depth' (number of active frames), 'error', 'created_at' and 'updated_at'.
+        """
+        runs_dir = Path(workflow_path) / cls.RUNS_DIRNAME
+        if not runs_dir.is_dir():
+            return []
+        runs = []
+        for path in runs_dir.glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            summary = {key: data.get(key) for key in ('run_id', 'entity', 'query', 'status', 'error', 'created_at',
+                                                       'updated_at')}
+            summary['depth'] = len(data.get('frames', []))
+            runs.append(summary)
+        runs.sort(key=lambda run: run['updated_at'] or "", reverse=True)
+        return runs
+
+    def push_frame(self,
+                   entity: str,
+                   query: str,
+                   sender_name: Optional[str],
+                   query_msg_id: Optional[str],
+                   history_len: int,
+                   supervisor_chain: Optional[List[str]] = None) -> None:
+        """
+        Record that an entity started answering a query, and save.
+
+        Args:
+            entity (str): Name of the entity.
+            query (str): The query.
+            sender_name (Optional[str]): Name of the delegating entity; None for the entry point.
+            query_msg_id (Optional[str]): History ID of the query.
+            history_len (int): Length of the entity's chat history, ending with the query.
+            supervisor_chain (Optional[List[str]]): Chain of supervisors in delegation.
+        """
+        self.frames.append({
+            "entity": entity,
+            "query": query,
+            "sender_name": sender_name,
+            "query_msg_id": query_msg_id,
+            "supervisor_chain": list(supervisor_chain) if supervisor_chain else None,
+            "history_base": history_len - 1,
+            "history_len": history_len,
+            "pending_msg_id": None,
+            "result": None,
+        })
+        self.save()
+
+    def update_frame(self, history_len: int, pending_msg_id: Optional[str] = None) -> None:
+        """
+        Record a completed step of the top frame, and save.
+
+        Args:
+            history_len (int): Length of the entity's chat history after the step.
+            pending_msg_id (Optional[str]): History ID of the tool call or delegation the
+                step started, if it ended with one.
+        """
+        frame = self.frames[-1]
+        frame['history_len'] = history_len
+        frame['pending_msg_id'] = pending_msg_id
+        frame['result'] = None
+        self.save()
+
+    def complete_frame(self, result: str) -> None:
+        """
+        Record that the top frame answered its query, and save.
+
+        The answer is kept in the frame below until that frame records it as the result
+        of its delegation. If the top frame is the entry point, the run is completed and
+        its checkpoint deleted.
+
+        Args:
+            result (str): The answer of the top frame.
+        """
+        self.frames.pop()
+        if self.frames:
+            self.frames[-1]['result'] = result
+            self.save()
+            return
+
+        self.data['status'] = self.COMPLETED
+        self.data['response'] = result
+        self.data['error'] = None
+        self.delete()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Set the status of the run, keeping its frames so it can be resumed, and save."""
+        self.data['status'] = status
+        self.data['error'] = error
+        self.save()
+
+    def restore_history(self, depth: int, history_manager: Any, chat_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Return the chat history the entity of a frame had after its last checkpointed step.
+
+        The messages from before the run are taken from the entity's current chat history,
+        which is loaded from the session history first if it is too short. The run's
+        messages are rebuilt from the session history.
+
+        Args:
+            depth (int): Index of the frame.
+            history_manager (HistoryManager): The history of the session.
+            chat_history (List[Dict[str, Any]]): The entity's current chat history.
+
+        Returns:
+            List[Dict[str, Any]]: The chat history to continue the frame with.
+        """
+        frame = self.frames[depth]
+        if len(chat_history) < frame['history_base']:
+            chat_history = history_manager.load_chat_history(frame['entity'])
+        run_messages = history_manager.load_run_messages(frame['entity'], frame['query_msg_id'],
+                                                         frame['history_len'] - frame['history_base'])
+        return chat_history[:frame['history_base']] + run_messages
+
+    def delete(self) -> None:
+        """Remove the checkpoint file."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def save(self) -> None:
+        """Write the checkpoint atomically."""
+        self.data['updated_at'] = datetime.utcnow().isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
@@ -3,9 +3,10 @@ This module provides functionality for managing conversation history in hierarch
 AI workflows. It handles storage and retrieval of messages between users,
 supervisors, agents, and tools within a workflow.
 
-The module uses a JSONL-based storage system where each workflow's conversation
-history is stored in a dedicated file, supporting message threading, delegation
-chains, and relationship tracking between different entities.
+By default each workflow's conversation history is stored in a dedicated JSONL
+file, supporting message threading, delegation chains, and relationship tracking
+between different entities. An optional segmented format stores compressed
+fixed-size segments plus a sidecar index (see xronai.history.storage).
 
 Components:
     EntityType: Enum for different entity types (USER, MAIN_SUPERVISOR, etc.)
@@ -13,6 +14,14 @@ Components:
 
 Structure:
     <base_path>/{workflow_id}/history.jsonl  (default base_path is 'xronai_logs')
+    <base_path>/{workflow_id}/segments/      (segmented format)
+    <base_path>/.blobs/                      (large content, see xronai.history.blob_store)
+
+Large strings (message content and tool call arguments of at least
+XRONAI_HISTORY_BLOB_THRESHOLD characters, default 4096) are interned: stored once in
+the blob store shared by all workflows under base_path and written to the history as
+references, listed in the record's 'interned' field. They are resolved transparently
+when the history is read, and only for the records a read actually returns.
 
 Note:
     Workflow directory must be initialized by a main supervisor before use.
@@ -22,9 +31,13 @@ import os, collections
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Union
 from pathlib import Path
 from enum import Enum
+from .storage import open_history_store
+from .blob_store import BlobStore
+
+DEFAULT_BLOB_THRESHOLD = 4096
 
 
 class EntityType(str, Enum):
@@ -49,9 +62,17 @@ class HistoryManager:
         base_path (Path): The root directory for storing all logs.
         workflow_path (Path): Path to the specific directory for this workflow's logs.
         history_file (Path): Path to the JSONL file storing the conversation history.
+        storage_format (str): On-disk format of the history ('jsonl' or 'segmented').
+        blob_store (BlobStore): Store of large content referenced from the history, shared
+            by all workflows under base_path.
+        blob_threshold (int): Length from which strings are interned in the blob store; 0 disables.
     """
 
-    def __init__(self, workflow_id: str, base_path: Optional[str] = None):
+    def __init__(self,
+                 workflow_id: str,
+                 base_path: Optional[str] = None,
+                 storage_format: Optional[str] = None,
+                 blob_threshold: Optional[int] = None):
         """
         Initialize the HistoryManager.
 
@@ -60,9 +81,18 @@ class HistoryManager:
                              Must be provided by a main supervisor.
             base_path (Optional[str]): The root directory for history logs. 
                                        Defaults to 'xronai_logs'.
+            storage_format (Optional[str]): Format used when the history is new: 'jsonl' or
+                                            'segmented'. Defaults to the XRONAI_HISTORY_FORMAT
+                                            environment variable, then 'jsonl'. The format of an
+                                            existing history is always detected from disk.
+            blob_threshold (Optional[int]): Length from which message content and tool call
+                                            arguments are interned. Defaults to the
+                                            XRONAI_HISTORY_BLOB_THRESHOLD environment variable,
+                                            then 4096. 0 disables interning.
 
         Raises:
-            ValueError: If workflow_id is None or workflow directory doesn't exist.
+            ValueError: If workflow_id is None, workflow directory doesn't exist or the
+                        storage format is unknown.
         """
         if not workflow_id:
             raise ValueError("workflow_id must be provided")
@@ -76,6 +106,13 @@ class HistoryManager:
             raise ValueError(f"Workflow directory does not exist: {self.workflow_path}. "
                              "It should be created by the main supervisor.")
 
+        self._store = open_history_store(self.workflow_path, storage_format)
+        self.storage_format = self._store.format
+        self.blob_store = BlobStore.for_workflow(self.workflow_path)
+        if blob_threshold is None:
+            blob_threshold = int(os.getenv("XRONAI_HISTORY_BLOB_THRESHOLD", DEFAULT_BLOB_THRESHOLD))
+        self.blob_threshold = blob_threshold
+
     def append_message(self,
                        message: Dict[str, Any],
                        sender_type: EntityType,
@@ -129,10 +166,7 @@ class HistoryManager:
             **message  # Include original message fields
         }
 
-        # Append to history file
-        with open(self.history_file, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
-
+        self._store.append(self._intern(entry))
         return message_id
 
     def load_chat_history(self, entity_name: str) -> List[Dict[str, Any]]:
@@ -156,11 +190,7 @@ class HistoryManager:
         Example:
             >>> agent.chat_history = history_manager.load_chat_history("AgentName")
         """
-        if not self.history_file.exists():
-            return []
-
-        with open(self.history_file, "r") as f:
-            all_msgs = [json.loads(line) for line in f]
+        all_msgs = self._store.read_for_entity(entity_name)
 
         system = next((m for m in all_msgs if m["role"] == "system" and m["sender_name"] == entity_name), None)
         history = []
@@ -181,42 +211,73 @@ class HistoryManager:
 
         for user_msg in delegated_user_msgs:
             history.append(self._format_for_chat_history(user_msg))
-
-            queue = collections.deque()
-
-            children = [m for m in all_msgs if m.get("parent_id") == user_msg["message_id"]]
-            children = [m for m in children if m["sender_name"] == entity_name or m["role"] == "tool"]
-            children.sort(key=lambda x: x["timestamp"])
-
-            for ch in children:
-                queue.append(ch)
-            while queue:
-                msg = queue.popleft()
-                formatted = self._format_for_chat_history(msg)
-                if formatted not in history:
-                    history.append(formatted)
-                if msg["role"] == "assistant" and msg.get("tool_calls"):
-                    for tool_call in msg["tool_calls"]:
-                        tool_msgs = [
-                            t for t in all_msgs if t["role"] == "tool" and t.get("tool_call_id") == tool_call["id"] and
-                            t.get("parent_id") == msg["message_id"]
-                        ]
-                        tool_msgs.sort(key=lambda x: x["timestamp"])
-                        for tmsg in tool_msgs:
-                            tfmt = self._format_for_chat_history(tmsg)
-                            if tfmt not in history:
-                                history.append(tfmt)
-
-                            wrapups = [
-                                mm for mm in all_msgs
-                                if mm.get("parent_id") == tmsg["message_id"] and mm["sender_name"] == entity_name
-                            ]
-                            wrapups.sort(key=lambda x: x["timestamp"])
-                            for wmsg in wrapups:
-                                queue.append(wmsg)
+            self._append_thread(history, user_msg, all_msgs, entity_name)
 
         return history
 
+    def load_run_messages(self, entity_name: str, query_msg_id: str, count: int) -> List[Dict[str, Any]]:
+        """
+        Rebuild the messages an entity exchanged while answering one query.
+
+        Used to resume a checkpointed run: the checkpoint records where the entity's
+        messages start and how many of them had been written, not the messages.
+
+        Args:
+            entity_name (str): Name of the entity.
+            query_msg_id (str): History ID of the query the entity was answering.
+            count (int): Number of messages to return, starting with the query.
+
+        Returns:
+            List[Dict[str, Any]]: The query and the messages that followed it, in the
+                chat_history format.
+
+        Raises:
+            ValueError: If the query is not in the history.
+        """
+        all_msgs = self._store.read_for_entity(entity_name)
+        user_msg = next((m for m in all_msgs if m["message_id"] == query_msg_id), None)
+        if user_msg is None:
+            raise ValueError(f"Message not found in history: {query_msg_id}")
+        messages = [self._format_for_chat_history(user_msg)]
+        self._append_thread(messages, user_msg, all_msgs, entity_name)
+        return messages[:count]
+
+    def _append_thread(self, history: List[Dict[str, Any]], user_msg: Dict[str, Any], all_msgs: List[Dict[str, Any]],
+                       entity_name: str) -> None:
+        """Append the entity's responses to a query, with their tool calls and results, in order."""
+        queue = collections.deque()
+
+        children = [m for m in all_msgs if m.get("parent_id") == user_msg["message_id"]]
+        children = [m for m in children if m["sender_name"] == entity_name or m["role"] == "tool"]
+        children.sort(key=lambda x: x["timestamp"])
+
+        for ch in children:
+            queue.append(ch)
+        while queue:
+            msg = queue.popleft()
+            formatted = self._format_for_chat_history(msg)
+            if formatted not in history:
+                history.append(formatted)
+            if msg["role"] == "assistant" and msg.get("tool_calls"):
+                for tool_call in msg["tool_calls"]:
+                    tool_msgs = [
+                        t for t in all_msgs if t["role"] == "tool" and t.get("tool_call_id") == tool_call["id"] and
+                        t.get("parent_id") == msg["message_id"]
+                    ]
+                    tool_msgs.sort(key=lambda x: x["timestamp"])
+                    for tmsg in tool_msgs:
+                        tfmt = self._format_for_chat_history(tmsg)
+                        if tfmt not in history:
+                            history.append(tfmt)
+
+                        wrapups = [
+                            mm for mm in all_msgs
+                            if mm.get("parent_id") == tmsg["message_id"] and mm["sender_name"] == entity_name
+                        ]
+                        wrapups.sort(key=lambda x: x["timestamp"])
+                        for wmsg in wrapups:
+                            queue.append(wmsg)
+
     def get_frontend_history(self) -> List[Dict[str, Any]]:
         """
         Get complete conversation history formatted for frontend display.
@@ -227,12 +288,7 @@ class HistoryManager:
         Example:
             >>> history = history_manager.get_frontend_history()
         """
-        if not self.history_file.exists():
-            return []
-
-        messages = []
-        with open(self.history_file, 'r') as f:
-            messages = [json.loads(line) for line in f]
+        messages = [self._resolve(msg) for msg in self._store.read_all()]
 
         # Add delegation chain information for display
         for msg in messages:
@@ -249,6 +305,33 @@ class HistoryManager:
 
         return self._build_conversation_thread(messages)
 
+    def get_raw_messages(self) -> List[Dict[str, Any]]:
+        """
+        Get every persisted message of the workflow, sorted by timestamp.
+
+        Returns:
+            List[Dict[str, Any]]: Raw history records as stored, oldest first.
+        """
+        return self._sort_messages([self._resolve(msg) for msg in self._store.read_all()])
+
+    def iter_raw_messages(self, start_id: Optional[str] = None, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the persisted messages of the workflow in write order, reading
+        the history only as far as the caller consumes it.
+
+        Args:
+            start_id (Optional[str]): ID of the message to start at (inclusive).
+            reverse (bool): Iterate from the newest message backwards.
+
+        Returns:
+            Iterator[Dict[str, Any]]: Raw history records as stored.
+
+        Raises:
+            ValueError: If start_id does not match any message.
+        """
+        for msg in self._store.iter_records(start_id, reverse):
+            yield self._resolve(msg)
+
     def _format_for_chat_history(self, msg: Dict[str, Any]) -> Dict[str, Any]:
         """
         Format a raw persisted message as an LLM-compatible chat turn.
@@ -272,6 +355,7 @@ class HistoryManager:
             # For role='tool'
             {'role': 'tool', 'content': '42', 'tool_call_id': 'call_xyz', 'name': 'calculate'}
         """
+        msg = self._resolve(msg)
         formatted = {
             "role": msg["role"],
             "content": msg.get("content", ""),
@@ -293,15 +377,10 @@ class HistoryManager:
         Returns:
             bool: True if system message exists, False otherwise
         """
-        if not self.history_file.exists():
-            return False
-
-        with open(self.history_file, 'r') as f:
-            for line in f:
-                msg = json.loads(line)
-                if (msg['role'] == 'system' and msg['sender_name'] == entity_name and
-                        msg['workflow_id'] == self.workflow_id):
-                    return True
+        for msg in self._store.read_for_entity(entity_name):
+            if (msg['role'] == 'system' and msg['sender_name'] == entity_name and
+                    msg['workflow_id'] == self.workflow_id):
+                return True
         return False
 
     def _sort_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -345,9 +424,7 @@ class HistoryManager:
 
     def clear_history(self) -> None:
         """Clear the entire conversation history for the current workflow."""
-        if self.history_file.exists():
-            self.history_file.unlink()
-            self.history_file.touch()
+        self._store.clear()
 
     def get_messages_by_entity(self, entity_name: str) -> List[Dict[str, Any]]:
         """
@@ -359,10 +436,60 @@ class HistoryManager:
         Returns:
             List[Dict[str, Any]]: All messages related to the entity
         """
-        messages = []
-        with open(self.history_file, 'r') as f:
-            for line in f:
-                msg = json.loads(line)
-                if msg['sender_name'] == entity_name:
-                    messages.append(msg)
+        messages = [
+            self._resolve(msg) for msg in self._store.read_for_entity(entity_name) if msg['sender_name'] == entity_name
+        ]
         return self._sort_messages(messages)
+
+    def _intern(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move large strings of a record to the blob store.
+
+        Args:
+            entry (Dict[str, Any]): The record to persist.
+
+        Returns:
+            Dict[str, Any]: The record as written, with references in place of large
+                strings and their field paths in 'interned', or the record itself if
+                nothing was interned.
+        """
+        if not self.blob_threshold:
+            return entry
+
+        def large(value: Any) -> bool:
+            return isinstance(value, str) and len(value) >= self.blob_threshold
+
+        interned = []
+        stored = entry
+        if large(entry.get('content')):
+            stored = {**entry, 'content': self.blob_store.put(entry['content'])}
+            interned.append('content')
+
+        tool_calls = entry.get('tool_calls') or []
+        if any(large(call.get('function', {}).get('arguments')) for call in tool_calls):
+            stored = {**stored, 'tool_calls': [dict(call) for call in tool_calls]}
+            for i, call in enumerate(stored['tool_calls']):
+                if large(call.get('function', {}).get('arguments')):
+                    ref = self.blob_store.put(call['function']['arguments'])
+                    call['function'] = {**call['function'], 'arguments': ref}
+                    interned.append(f"tool_calls.{i}.function.arguments")
+
+        if interned:
+            stored['interned'] = interned
+        return stored
+
+    def _resolve(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a record with its interned strings read back from the blob store."""
+        if not msg.get('interned'):
+            return msg
+
+        resolved = {key: value for key, value in msg.items() if key != 'interned'}
+        for path in msg['interned']:
+            if path == 'content':
+                resolved['content'] = self.blob_store.get(msg['content'])
+            elif path.startswith('tool_calls.'):
+                index = int(path.split('.')[1])
+                resolved['tool_calls'] = [dict(call) for call in resolved['tool_calls']]
+                call = resolved['tool_calls'][index]
+                call['function'] = {**call['function'], 'arguments': self.blob_store.get(call['function']['arguments'])}
+        return resolved
@@ -0,0 +1,438 @@
+"""
+Lightweight metadata index over all sessions (workflows) stored under a history root.
+
+The index is an append-only JSONL log of small change records kept next to the
+session directories, so listing sessions with their metadata never has to scan
+directories or open histories. The layers that run sessions record them: the server
+and the batch runner write one record per run with the messages and bytes it added
+(see ``SessionIndex.track``). Core history writes do not touch the index; sessions
+written without it (a Supervisor or Agent used directly, Studio) are picked up by
+``reconcile`` when the history root's directory listing changes.
+
+Records are deltas (N messages, N bytes), so writers in different processes never
+overwrite each other's counts. Once enough deltas have accumulated, the log is
+compacted into one snapshot record per session. Writers hold a shared ``flock`` on
+the lock file while appending and compaction holds it exclusively, so no append is
+lost when the compacted log replaces the old one. On platforms without ``fcntl`` the
+lock is a no-op and a single process should write the index.
+
+Structure:
+    <base_path>/sessions_index.jsonl
+    <base_path>/sessions_index.lock
+
+Record format:
+    {"id": session_id, "op": "create" | "append" | "delete" | "snapshot", "ts": ..., ...}
+
+A compacted log starts with a ``{"op": "generation", "id": <unique id>}`` record that
+tells readers the file was replaced.
+"""
+
+import os
+import json
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .storage import open_history_store
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+SESSION_SORT_FIELDS = ("updated_at", "created_at", "message_count", "size")
+
+SESSION_LOCK_FILENAME = ".lock"
+"""Lock file a run holds in its session directory, see xronai.server.session_lock."""
+
+
+class SessionIndex:
+    """
+    Maintains created/updated timestamps, message count, last query preview and
+    size for every session under a history root.
+
+    Attributes:
+        base_path (Path): The history root holding one directory per session.
+        index_file (Path): Path to the append-only index log.
+        lock_file (Path): Path to the file locked while the log is written.
+    """
+
+    INDEX_FILENAME = "sessions_index.jsonl"
+    LOCK_FILENAME = "sessions_index.lock"
+    PREVIEW_LENGTH = 120
+    COMPACT_AFTER = 1000
+    """Delta records, beyond one per session, after which the log is compacted."""
+
+    _instances: Dict[Path, 'SessionIndex'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, base_path: Path):
+        """
+        Initialize the index for a history root.
+
+        Args:
+            base_path (Path): The history root holding one directory per session.
+        """
+        self.base_path = Path(base_path)
+        self.index_file = self.base_path / self.INDEX_FILENAME
+        self.lock_file = self.base_path / self.LOCK_FILENAME
+        self._lock = threading.RLock()
+        self._reconciled: Optional[int] = None
+        self._reset()
+
+    @classmethod
+    def for_path(cls, base_path: Path) -> 'SessionIndex':
+        """
+        Return the shared index for a history root.
+
+        Args:
+            base_path (Path): The history root.
+
+        Returns:
+            SessionIndex: The process-wide index instance for that root.
+        """
+        key = Path(base_path).resolve()
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    def _reset(self) -> None:
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self._identity: Optional[Tuple[int, bytes]] = None
+        self._deltas = 0
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = False) -> Iterator[None]:
+        """Hold the index's lock file: shared to append records, exclusive to replace the log."""
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        with self._file_lock():
+            with open(self.index_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        self._compact_if_needed()
+
+    def record_created(self, session_id: str) -> None:
+        """Record that a session was created."""
+        self._write({"id": session_id, "op": "create", "ts": _now()})
+
+    def record_append(self,
+                      session_id: str,
+                      timestamp: Optional[str] = None,
+                      size: int = 0,
+                      query: Optional[str] = None,
+                      messages: int = 1) -> None:
+        """
+        Record that messages were appended to a session's history.
+
+        Args:
+            session_id (str): ID of the session.
+            timestamp (Optional[str]): Timestamp of the last message. Defaults to now.
+            size (int): Number of bytes the messages added to the history.
+            query (Optional[str]): The user query among the messages, if any.
+            messages (int): Number of messages appended.
+        """
+        record = {"id": session_id, "op": "append", "ts": timestamp or _now(), "n": messages, "b": size}
+        if query:
+            record["q"] = query[:self.PREVIEW_LENGTH]
+        self._write(record)
+
+    @contextmanager
+    def track(self, session_id: str, query: Optional[str] = None) -> Iterator[None]:
+        """
+        Record the messages a block appends to a session's history as one index record,
+        written when the block exits, even if it raises.
+
+        The messages are counted by the session's history store in this process, so the
+        block must hold the session's lock (see xronai.server.session_lock) for the count
+        to be exact.
+
+        Args:
+            session_id (str): ID of the session. Its directory must exist.
+            query (Optional[str]): The user query the block answers, shown as the preview.
+        """
+        store = open_history_store(self.base_path / session_id)
+        messages, size = store.records_appended, store.bytes_appended
+        try:
+            yield
+        finally:
+            if store.records_appended > messages:
+                self.record_append(session_id,
+                                   size=max(0, store.bytes_appended - size),
+                                   query=query,
+                                   messages=store.records_appended - messages)
+
+    def record_deleted(self, session_id: str) -> None:
+        """Record that a session was deleted."""
+        self._write({"id": session_id, "op": "delete", "ts": _now()})
+
+    def _refresh(self) -> None:
+        """Apply records written since the last read, including those of other processes."""
+        try:
+            f = open(self.index_file, 'rb')
+        except FileNotFoundError:
+            self._reset()
+            return
+
+        with f:
+            # Compaction replaces the file, and the new one may reuse the inode of an
+            # older one; the unique first line of a compacted log tells them apart.
+            identity = (os.fstat(f.fileno()).st_ino, f.readline())
+            if identity != self._identity:
+                self._reset()
+                self._identity = identity
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+                if line.strip():
+                    record = json.loads(line)
+                    if record["op"] == "generation":
+                        continue
+                    self._apply(record)
+                    if record["op"] != "snapshot":
+                        self._deltas += 1
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        session_id, op, ts = record["id"], record["op"], record.get("ts")
+
+        if op == "delete":
+            self._sessions.pop(session_id, None)
+            return
+
+        if op == "snapshot":
+            self._sessions[session_id] = {k: v for k, v in record.items() if k not in ("id", "op", "ts")}
+            self._sessions[session_id]["session_id"] = session_id
+            return
+
+        info = self._sessions.setdefault(session_id, {
+            "session_id": session_id,
+            "created_at": ts,
+            "updated_at": ts,
+            "message_count": 0,
+            "last_query": None,
+            "size": 0,
+        })
+        info["created_at"] = min(info["created_at"], ts)
+        info["updated_at"] = max(info["updated_at"], ts)
+        if op == "append":
+            info["message_count"] += record.get("n", 1)
+            info["size"] += record.get("b", 0)
+            if record.get("q"):
+                info["last_query"] = record["q"]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata of one session.
+
+        Args:
+            session_id (str): ID of the session.
+
+        Returns:
+            Optional[Dict[str, Any]]: The session metadata, or None if unknown.
+        """
+        with self._lock:
+            self._refresh()
+            info = self._sessions.get(session_id)
+            return dict(info) if info else None
+
+    def list_sessions(self,
+                      sort_by: str = "updated_at",
+                      descending: bool = True,
+                      offset: int = 0,
+                      limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        List sessions with their metadata.
+
+        Args:
+            sort_by (str): One of 'updated_at', 'created_at', 'message_count' or 'size'.
+            descending (bool): Whether to sort in descending order.
+            offset (int): Number of sessions to skip.
+            limit (Optional[int]): Maximum number of sessions to return.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: The requested page and the total number of sessions.
+
+        Raises:
+            ValueError: If sort_by is not a known field.
+        """
+        if sort_by not in SESSION_SORT_FIELDS:
+            raise ValueError(f"sort_by must be one of {SESSION_SORT_FIELDS}")
+
+        with self._lock:
+            self.reconcile()
+            items = sorted(self._sessions.values(), key=lambda s: (s[sort_by], s["session_id"]), reverse=descending)
+            end = offset + limit if limit is not None else None
+            return [dict(s) for s in items[offset:end]], len(items)
+
+    def rebuild(self) -> None:
+        """
+        Rebuild the index by scanning the session directories on disk.
+
+        Used once for history roots created before the index existed. The result is
+        written as snapshot records, replacing any existing index.
+        """
+        snapshots = [self._snapshot(path) for path in _session_dirs(self.base_path)]
+        with self._file_lock(exclusive=True):
+            self._write_snapshot(snapshots)
+
+    def reconcile(self) -> None:
+        """
+        Index the session directories the index does not know about, and drop the
+        sessions whose directory is gone.
+
+        Runs only when the history root's modification time changed since the last
+        reconciliation, which happens whenever a session directory is created or
+        removed. A session locked by a run (see xronai.server.session_lock) is left to
+        the run's own index record and looked at again on the next call.
+        """
+        with self._lock:
+            self._refresh()
+            try:
+                mtime = os.stat(self.base_path).st_mtime_ns
+            except FileNotFoundError:
+                return
+            if mtime == self._reconciled:
+                return
+
+            paths = {path.name: path for path in _session_dirs(self.base_path)}
+            records, complete = [], True
+            for session_id, path in paths.items():
+                if session_id in self._sessions:
+                    continue
+                with _try_session_lock(path) as locked:
+                    if locked:
+                        records.append(self._snapshot(path))
+                    else:
+                        complete = False
+            for session_id in self._sessions:
+                if session_id not in paths and not (self.base_path / session_id).is_dir():
+                    records.append({"id": session_id, "op": "delete", "ts": _now()})
+
+            if records:
+                with self._file_lock():
+                    with open(self.index_file, 'a') as f:
+                        f.writelines(json.dumps(record) + '\n' for record in records)
+                self._refresh()
+            if complete:
+                self._reconciled = mtime
+
+    def _snapshot(self, path: Path) -> Dict[str, Any]:
+        """Build the snapshot record of a session by reading its history."""
+        from .history_manager import HistoryManager
+
+        messages = HistoryManager(path.name, base_path=str(self.base_path)).get_raw_messages()
+        created = datetime.utcfromtimestamp(path.stat().st_ctime).isoformat()
+        queries = [m.get("content") for m in messages if m.get("sender_type") == "user" and m.get("content")]
+        return {
+            "id": path.name,
+            "op": "snapshot",
+            "created_at": messages[0]["timestamp"] if messages else created,
+            "updated_at": messages[-1]["timestamp"] if messages else created,
+            "message_count": len(messages),
+            "last_query": queries[-1][:self.PREVIEW_LENGTH] if queries else None,
+            "size": _history_size(path),
+        }
+
+    def compact(self) -> None:
+        """Rewrite the index log as one snapshot record per session."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            self._write_snapshot([{
+                "id": sid,
+                "op": "snapshot",
+                **{k: v for k, v in info.items() if k != "session_id"}
+            } for sid, info in self._sessions.items()])
+
+    def _compact_if_needed(self) -> None:
+        """Compact the log once its delta records outnumber the sessions by COMPACT_AFTER."""
+        with self._lock:
+            self._refresh()
+            if self._deltas > len(self._sessions) + self.COMPACT_AFTER:
+                self.compact()
+
+    def ensure_ready(self) -> None:
+        """
+        Build the index if missing, otherwise compact it and index the sessions written
+        without it. Intended for server startup.
+        """
+        if self.index_file.exists():
+            self.compact()
+            self.reconcile()
+        elif self.base_path.exists():
+            self.rebuild()
+
+    def _write_snapshot(self, records: List[Dict[str, Any]]) -> None:
+        """Replace the log with the records. Called with the lock file held exclusively."""
+        with self._lock:
+            self.base_path.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_name(self.index_file.name + ".tmp")
+            with open(tmp, 'w') as f:
+                f.write(json.dumps({"op": "generation", "id": uuid.uuid4().hex, "ts": _now()}) + '\n')
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            os.replace(tmp, self.index_file)
+            self._reset()
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _session_dirs(base_path: Path) -> Iterator[Path]:
+    """Yield the directories under a history root that hold a history."""
+    for entry in os.scandir(base_path):
+        path = Path(entry.path)
+        if entry.is_dir() and ((path / "history.jsonl").exists() or (path / "segments").exists()):
+            yield path
+
+
+@contextmanager
+def _try_session_lock(path: Path) -> Iterator[bool]:
+    """Take a session's lock (see xronai.server.session_lock) without waiting. Yields whether it was taken."""
+    if fcntl is None:
+        yield True
+        return
+
+    try:
+        fd = os.open(path / SESSION_LOCK_FILENAME, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        yield False
+        return
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
+
+
+def _history_size(path: Path) -> int:
+    total = 0
+    if (path / "history.jsonl").exists():
+        total += (path / "history.jsonl").stat().st_size
+    for root, _, files in os.walk(path / "segments"):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
@@ -0,0 +1,589 @@
+"""
+Storage backends for workflow conversation history.
+
+Two on-disk formats are supported:
+
+    jsonl:      One JSON record per line in ``history.jsonl`` (the default).
+    segmented:  Records are grouped into fixed-size segments that are compressed
+                (gzip, or zstd when the ``zstandard`` package is installed) once
+                full. A sidecar index maps every message_id to its segment and
+                offset and records per-entity segment membership, so reading one
+                entity's turns only decompresses the segments that contain them.
+
+Structure (segmented):
+    <workflow_path>/segments/index.jsonl         (sidecar index)
+    <workflow_path>/segments/seg-000000.jsonl.gz (sealed, compressed segment)
+    <workflow_path>/segments/seg-000001.jsonl    (active, uncompressed segment)
+
+Both stores are shared per directory within a process, since every Agent and
+Supervisor of a workflow holds its own HistoryManager over the same files. Only the
+``XRONAI_HISTORY_STORE_CACHE`` most recently opened stores (default 64) are kept once
+no HistoryManager uses them; an evicted store drops its cached segments, and is
+freed with its index when its last HistoryManager goes away. The
+segmented store keeps its index in memory and checks the size and identity of the
+index file before every read and append, picking up records appended by other
+processes (server workers, for example) and reloading if the history was replaced.
+Writers in different processes must still take turns; the server's session lock
+serializes them.
+"""
+
+import os
+import gzip
+import json
+import shutil
+import threading
+import weakref
+import collections
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+JSONL_FORMAT = "jsonl"
+SEGMENTED_FORMAT = "segmented"
+HISTORY_FORMATS = (JSONL_FORMAT, SEGMENTED_FORMAT)
+
+DEFAULT_SEGMENT_SIZE = 256
+DEFAULT_STORE_CACHE_SIZE = 64
+
+_CODEC_SUFFIXES = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+_REVERSE_READ_BLOCK = 64 * 1024
+
+
+class JsonlHistoryStore:
+    """
+    Stores history records as plain JSON lines in a single file.
+
+    Attributes:
+        history_file (Path): Path to the JSONL file storing the conversation history.
+        records_appended (int): Records appended by this process.
+        bytes_appended (int): Bytes appended by this process.
+    """
+
+    format = JSONL_FORMAT
+
+    def __init__(self, workflow_path: Path):
+        """
+        Initialize the store.
+
+        Args:
+            workflow_path (Path): Directory of the workflow whose history is stored.
+        """
+        self.workflow_path = workflow_path
+        self.history_file = workflow_path / "history.jsonl"
+        self.records_appended = 0
+        self.bytes_appended = 0
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Append a record to the history file.
+
+        Args:
+            entry (Dict[str, Any]): The history record to append.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        line = json.dumps(entry) + '\n'
+        with open(self.history_file, 'a') as f:
+            f.write(line)
+        with self._lock:
+            self.records_appended += 1
+            self.bytes_appended += len(line)
+        return len(line)
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return every record in write order."""
+        if not self.history_file.exists():
+            return []
+        with open(self.history_file, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def read_for_entity(self, entity_name: str) -> List[Dict[str, Any]]:
+        """Return the records relevant to an entity. JSONL has no index, so this reads everything."""
+        return self.read_all()
+
+    def iter_records(self, start_id: Optional[str] = None, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield records in write order, or newest first, reading the file as they are consumed.
+
+        Args:
+            start_id (Optional[str]): Start at the record with this message_id (inclusive).
+                Lines before it are skipped without being parsed.
+            reverse (bool): Yield newest first, reading the file backwards from its end.
+
+        Raises:
+            ValueError: If start_id does not match any record.
+        """
+        if not self.history_file.exists():
+            if start_id:
+                raise ValueError(f"Message not found: {start_id}")
+            return
+
+        with open(self.history_file, 'rb') as f:
+            lines = _lines_reversed(f) if reverse else f
+            found = start_id is None
+            for line in lines:
+                if not line.strip():
+                    continue
+                if not found:
+                    if start_id.encode('utf-8') not in line:
+                        continue
+                    record = json.loads(line)
+                    found = record.get('message_id') == start_id
+                    if found:
+                        yield record
+                    continue
+                yield json.loads(line)
+        if not found:
+            raise ValueError(f"Message not found: {start_id}")
+
+    def is_stale(self) -> bool:
+        """The JSONL store keeps no in-memory state, so it is never stale."""
+        return False
+
+    def drop_caches(self) -> None:
+        """The JSONL store caches nothing."""
+
+    def clear(self) -> None:
+        """Remove all records."""
+        if self.history_file.exists():
+            self.history_file.unlink()
+            self.history_file.touch()
+
+
+class SegmentedHistoryStore:
+    """
+    Stores history records in compressed fixed-size segments with a sidecar index.
+
+    Records are appended to an uncompressed active segment. Once it holds
+    ``segment_size`` records it is compressed into a sealed segment and a new
+    active segment is started. The repeated ``workflow_id`` field is omitted on
+    disk and restored on read.
+
+    Index lines have the form::
+
+        {"m": message_id, "g": segment, "o": offset, "s": sender_name,
+         "r": role, "p": parent_id, "t": supervisor_chain tail}
+
+    Attributes:
+        records_appended (int): Records appended by this process.
+        bytes_appended (int): Uncompressed bytes appended by this process.
+    """
+
+    format = SEGMENTED_FORMAT
+    _CACHED_SEGMENTS = 8
+
+    def __init__(self, workflow_path: Path, segment_size: int = DEFAULT_SEGMENT_SIZE, codec: Optional[str] = None):
+        """
+        Initialize the store, recovering its state from the index if present.
+
+        Args:
+            workflow_path (Path): Directory of the workflow whose history is stored.
+            segment_size (int): Number of records per segment.
+            codec (Optional[str]): 'gzip' or 'zstd'. Defaults to zstd when available, else gzip.
+
+        Raises:
+            ValueError: If segment_size is not positive or the codec is unknown.
+        """
+        if segment_size <= 0:
+            raise ValueError("segment_size must be positive")
+
+        self.workflow_path = workflow_path
+        self.segments_path = workflow_path / "segments"
+        self.index_file = self.segments_path / "index.jsonl"
+        self.history_file = workflow_path / "history.jsonl"
+        self.segment_size = segment_size
+        self.codec = codec or ("zstd" if _zstd_available() else "gzip")
+        if self.codec not in _CODEC_SUFFIXES:
+            raise ValueError(f"Unknown history codec: {self.codec}")
+
+        self.records_appended = 0
+        self.bytes_appended = 0
+        self._lock = threading.RLock()
+        self._sealed_cache: "collections.OrderedDict[int, List[str]]" = collections.OrderedDict()
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the in-memory index from the sidecar index file."""
+        self._index: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._entity_segments: Dict[str, Set[int]] = collections.defaultdict(set)
+        self._index_inode: Optional[int] = None
+        self._index_offset = 0
+        self._sealed_cache.clear()
+        self._read_index_tail()
+
+    def _read_index_tail(self) -> None:
+        """Index the complete lines added to the index file since it was last read."""
+        try:
+            with open(self.index_file, 'rb') as f:
+                self._index_inode = os.fstat(f.fileno()).st_ino
+                f.seek(self._index_offset)
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+
+        # A line still being written by another process is picked up on the next read.
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._add_to_index(json.loads(line))
+        self._index_offset += end
+        self._update_active_segment()
+
+    def _refresh(self) -> None:
+        """
+        Bring the in-memory index up to date with the index file. Called with the lock held.
+
+        Appends made by other processes are read incrementally. If the index file was
+        removed, replaced or truncated, the index is rebuilt from scratch.
+        """
+        try:
+            stat = os.stat(self.index_file)
+        except FileNotFoundError:
+            if self._index:
+                self._load_index()
+            return
+
+        if stat.st_ino != self._index_inode or stat.st_size < self._index_offset:
+            self._load_index()
+        elif stat.st_size > self._index_offset:
+            self._read_index_tail()
+
+    def _update_active_segment(self) -> None:
+        """Derive the active segment and its record count from the last indexed record."""
+        self._active_segment = 0
+        self._active_count = 0
+        if self._index:
+            last = self._index[-1]
+            self._active_segment = last["g"]
+            self._active_count = last["o"] + 1
+            if self._active_count >= self.segment_size or self._find_sealed(last["g"]):
+                self._active_segment += 1
+                self._active_count = 0
+
+    def _add_to_index(self, item: Dict[str, Any]) -> None:
+        self._index.append(item)
+        self._by_id[item["m"]] = item
+        self._entity_segments[item["s"]].add(item["g"])
+
+    def _segment_file(self, segment: int, sealed: bool, codec: Optional[str] = None) -> Path:
+        if sealed:
+            suffix = _CODEC_SUFFIXES[codec or self.codec]
+        else:
+            suffix = ".jsonl"
+        return self.segments_path / f"seg-{segment:06d}{suffix}"
+
+    def _find_sealed(self, segment: int) -> Optional[tuple]:
+        """Return (path, codec) of a sealed segment, whichever codec wrote it."""
+        for codec in _CODEC_SUFFIXES:
+            path = self._segment_file(segment, sealed=True, codec=codec)
+            if path.exists():
+                return path, codec
+        return None
+
+    def is_stale(self) -> bool:
+        """Whether the files backing this store were removed behind its back."""
+        return bool(self._index) and not self.index_file.exists()
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Append a record to the active segment and index it.
+
+        Args:
+            entry (Dict[str, Any]): The history record to append.
+
+        Returns:
+            int: Number of uncompressed bytes written.
+        """
+        stored = {k: v for k, v in entry.items() if k != 'workflow_id'}
+        line = json.dumps(stored) + '\n'
+        chain = entry.get('supervisor_chain') or []
+
+        with self._lock:
+            self._refresh()
+            self.segments_path.mkdir(parents=True, exist_ok=True)
+            item = {
+                "m": entry['message_id'],
+                "g": self._active_segment,
+                "o": self._active_count,
+                "s": entry.get('sender_name'),
+                "r": entry.get('role'),
+                "p": entry.get('parent_id'),
+                "t": chain[-1] if chain else None,
+            }
+            with open(self._segment_file(self._active_segment, sealed=False), 'a') as f:
+                f.write(line)
+            with open(self.index_file, 'ab') as f:
+                f.write((json.dumps(item) + '\n').encode('utf-8'))
+                self._index_offset = f.tell()
+                self._index_inode = os.fstat(f.fileno()).st_ino
+
+            self._add_to_index(item)
+            self.records_appended += 1
+            self.bytes_appended += len(line)
+            self._active_count += 1
+            if self._active_count >= self.segment_size:
+                self._seal_active_segment()
+
+        return len(line)
+
+    def _seal_active_segment(self) -> None:
+        """Compress the active segment and start a new one."""
+        active = self._segment_file(self._active_segment, sealed=False)
+        sealed = self._segment_file(self._active_segment, sealed=True)
+        tmp = sealed.with_name(sealed.name + ".tmp")
+
+        with open(active, 'rb') as f:
+            raw = f.read()
+        with open(tmp, 'wb') as f:
+            f.write(_compress(raw, self.codec))
+        os.replace(tmp, sealed)
+        active.unlink()
+
+        self._active_segment += 1
+        self._active_count = 0
+
+    def _read_segment(self, segment: int) -> List[str]:
+        """Return the raw lines of a segment, decompressing sealed ones through a small cache."""
+        if segment in self._sealed_cache:
+            self._sealed_cache.move_to_end(segment)
+            return self._sealed_cache[segment]
+
+        found = self._find_sealed(segment)
+        if found:
+            path, codec = found
+            with open(path, 'rb') as f:
+                lines = _decompress(f.read(), codec).decode('utf-8').splitlines()
+            self._sealed_cache[segment] = lines
+            if len(self._sealed_cache) > self._CACHED_SEGMENTS:
+                self._sealed_cache.popitem(last=False)
+            return lines
+
+        active = self._segment_file(segment, sealed=False)
+        if not active.exists():
+            return []
+        with open(active, 'r') as f:
+            return f.read().splitlines()
+
+    def _read_segments(self, segments: Iterable[int], wanted: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        records = []
+        workflow_id = self.workflow_path.name
+        for segment in sorted(set(segments)):
+            for line in self._read_segment(segment):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if wanted is not None and record['message_id'] not in wanted:
+                    continue
+                records.append({'workflow_id': workflow_id, **record})
+        return records
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return every record in write order."""
+        with self._lock:
+            self._refresh()
+            return self._read_segments(range(self._active_segment + 1))
+
+    def read_for_entity(self, entity_name: str) -> List[Dict[str, Any]]:
+        """
+        Return the records needed to rebuild an entity's chat history.
+
+        The index is used to select the entity's own messages, the user messages
+        delegated to it or answered by it, and the tool results that reply to
+        its messages. Only the segments holding those records are read.
+
+        Args:
+            entity_name (str): Name of the supervisor or agent.
+
+        Returns:
+            List[Dict[str, Any]]: The relevant records in write order.
+        """
+        with self._lock:
+            self._refresh()
+            own_ids = {item["m"] for item in self._index if item["s"] == entity_name}
+            parents_of_own = {self._by_id[mid]["p"] for mid in own_ids if self._by_id[mid]["p"]}
+
+            wanted = set(own_ids)
+            for item in self._index:
+                if item["r"] == "user" and (item["t"] == entity_name or item["m"] in parents_of_own):
+                    wanted.add(item["m"])
+            for item in self._index:
+                if item["r"] == "tool" and item["p"] in wanted:
+                    wanted.add(item["m"])
+
+            segments = {self._by_id[mid]["g"] for mid in wanted}
+            return self._read_segments(segments, wanted)
+
+    def iter_records(self, start_id: Optional[str] = None, reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield records in write order, or newest first, reading segments as they are consumed.
+
+        Args:
+            start_id (Optional[str]): Start at the record with this message_id (inclusive).
+                The index locates it, so earlier (or, in reverse, later) segments are not read.
+            reverse (bool): Yield newest first.
+
+        Raises:
+            ValueError: If start_id does not match any record.
+        """
+        with self._lock:
+            self._refresh()
+            if start_id is None:
+                segment = 0 if not reverse else self._active_segment
+                offset = None
+            else:
+                item = self._by_id.get(start_id)
+                if item is None:
+                    raise ValueError(f"Message not found: {start_id}")
+                segment, offset = item["g"], item["o"]
+            last_segment = self._active_segment
+
+        segments = range(segment, -1, -1) if reverse else range(segment, last_segment + 1)
+        workflow_id = self.workflow_path.name
+        for current in segments:
+            with self._lock:
+                lines = self._read_segment(current)
+            if current == segment and offset is not None:
+                lines = lines[:offset + 1] if reverse else lines[offset:]
+            for line in (reversed(lines) if reverse else lines):
+                if line.strip():
+                    yield {'workflow_id': workflow_id, **json.loads(line)}
+
+    def entity_segments(self, entity_name: str) -> Set[int]:
+        """Return the segments containing messages sent by an entity."""
+        with self._lock:
+            self._refresh()
+            return set(self._entity_segments.get(entity_name, ()))
+
+    def locate(self, message_id: str) -> Optional[Dict[str, int]]:
+        """
+        Look up where a message is stored.
+
+        Args:
+            message_id (str): ID of the message.
+
+        Returns:
+            Optional[Dict[str, int]]: ``{"segment": ..., "offset": ...}``, or None if unknown.
+        """
+        with self._lock:
+            self._refresh()
+            item = self._by_id.get(message_id)
+        if item is None:
+            return None
+        return {"segment": item["g"], "offset": item["o"]}
+
+    def drop_caches(self) -> None:
+        """Free the decompressed segments kept for reads. The index is kept."""
+        with self._lock:
+            self._sealed_cache.clear()
+
+    def clear(self) -> None:
+        """Remove all segments and the index."""
+        with self._lock:
+            if self.segments_path.exists():
+                shutil.rmtree(self.segments_path)
+            self._load_index()
+
+
+# Every store still in use, so a directory never has two stores in one process, and
+# the most recently opened ones, kept alive even when unused.
+_stores: "weakref.WeakValueDictionary[Path, Any]" = weakref.WeakValueDictionary()
+_recent_stores: "collections.OrderedDict[Path, Any]" = collections.OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def open_history_store(workflow_path: Path, storage_format: Optional[str] = None) -> Any:
+    """
+    Return the shared history store for a workflow directory.
+
+    The format of an existing history is detected from disk. For a new history
+    ``storage_format`` is used, falling back to the ``XRONAI_HISTORY_FORMAT``
+    environment variable and then to 'jsonl'.
+
+    Args:
+        workflow_path (Path): Directory of the workflow.
+        storage_format (Optional[str]): 'jsonl' or 'segmented'.
+
+    Returns:
+        Union[JsonlHistoryStore, SegmentedHistoryStore]: The store for the directory.
+
+    Raises:
+        ValueError: If the storage format is unknown.
+    """
+    key = workflow_path.resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and store.workflow_path.exists() and not store.is_stale():
+            _remember_store(key, store)
+            return store
+
+        history_file = workflow_path / "history.jsonl"
+        if (workflow_path / "segments").exists():
+            fmt = SEGMENTED_FORMAT
+        elif history_file.exists() and history_file.stat().st_size > 0:
+            fmt = JSONL_FORMAT
+        else:
+            fmt = storage_format or os.getenv("XRONAI_HISTORY_FORMAT", JSONL_FORMAT)
+
+        if fmt == SEGMENTED_FORMAT:
+            store = SegmentedHistoryStore(workflow_path,
+                                          segment_size=int(
+                                              os.getenv("XRONAI_HISTORY_SEGMENT_SIZE", DEFAULT_SEGMENT_SIZE)),
+                                          codec=os.getenv("XRONAI_HISTORY_CODEC") or None)
+        elif fmt == JSONL_FORMAT:
+            store = JsonlHistoryStore(workflow_path)
+        else:
+            raise ValueError(f"Unknown history format '{fmt}'. Expected one of {HISTORY_FORMATS}.")
+
+        _stores[key] = store
+        _remember_store(key, store)
+        return store
+
+
+def _remember_store(key: Path, store: Any) -> None:
+    """Mark a store as the most recently opened, evicting the oldest beyond the cache size. Called with the lock held."""
+    _recent_stores[key] = store
+    _recent_stores.move_to_end(key)
+    limit = int(os.getenv("XRONAI_HISTORY_STORE_CACHE", DEFAULT_STORE_CACHE_SIZE))
+    while len(_recent_stores) > max(limit, 0):
+        _, evicted = _recent_stores.popitem(last=False)
+        evicted.drop_caches()
+
+
+def _lines_reversed(f) -> Iterator[bytes]:
+    """Yield the lines of a binary file from last to first, reading it backwards in blocks."""
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    tail = b''
+    while position > 0:
+        size = min(_REVERSE_READ_BLOCK, position)
+        position -= size
+        f.seek(position)
+        lines = (f.read(size) + tail).split(b'\n')
+        tail = lines.pop(0)
+        yield from reversed(lines)
+    yield tail
+
+
+def _zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
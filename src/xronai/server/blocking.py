@@ -0,0 +1,133 @@
+"""
+Helpers for keeping blocking work off the server's event loop.
+
+Filesystem access, history parsing and workflow construction are synchronous. The
+FastAPI handlers hand them to a dedicated thread pool through ``run_blocking`` so a
+large history read in one session never stalls the WebSockets of the others.
+``LoopLagMonitor`` measures how long the loop was blocked anyway.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """
+    Return the thread pool used for blocking I/O, creating it on first use.
+
+    The pool size is read from the XRONAI_IO_WORKERS environment variable (default 8).
+    """
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=int(os.getenv("XRONAI_IO_WORKERS", "8")),
+                                          thread_name_prefix="xronai-io")
+    return _io_executor
+
+
+def shutdown_io_executor() -> None:
+    """Shut down the I/O thread pool, waiting for running jobs."""
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=True)
+        _io_executor = None
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking callable in the I/O thread pool and await its result.
+
+    Args:
+        func (Callable[..., Any]): The blocking function.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        Any: The function's return value.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag by scheduling a periodic sleep and recording how late it wakes up.
+
+    Any delay beyond the requested interval is time during which the loop was blocked
+    by synchronous work. Lags above ``warn_threshold`` are logged as warnings.
+    """
+
+    def __init__(self, interval: float = 0.1, warn_threshold: float = 0.25):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval (float): Seconds between probes.
+            warn_threshold (float): Lag in seconds above which a warning is logged.
+        """
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.total_blocked = 0.0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.slow_ticks = 0
+        self.ticks = 0
+        self._started_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start probing on the running event loop."""
+        if self._task is None:
+            self._started_at = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+            self.ticks += 1
+            self.last_lag = lag
+            self.total_blocked += lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.warn_threshold:
+                self.slow_ticks += 1
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the lag statistics collected so far.
+
+        Returns:
+            Dict[str, Any]: Last, max and total blocked time in milliseconds, and the
+                number of probes that exceeded the warning threshold.
+        """
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "total_blocked_ms": round(self.total_blocked * 1000, 2),
+            "blocked_ratio": round(self.total_blocked / uptime, 4) if uptime else 0.0,
+            "slow_ticks": self.slow_ticks,
+            "ticks": self.ticks,
+        }
@@ -0,0 +1,230 @@
+"""
+Ordered, bounded delivery of workflow events to a WebSocket client.
+
+Workflows run in worker threads and emit events through a synchronous callback.
+``WebSocketEventStream`` puts those events on a bounded per-connection queue that a
+single sender task drains in order, so a slow client can neither grow memory without
+bound nor see events out of order. Consecutive tool output events are coalesced
+while they wait in the queue, and an overflow policy decides what happens when the
+client falls behind.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import collections
+from enum import Enum
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+COALESCE_EVENT_TYPES: FrozenSet[str] = frozenset({"AGENT_TOOL_OUTPUT"})
+"""Event types carrying incremental text in ``data["content"]`` that may be merged in the queue."""
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a client's event queue is full."""
+    DROP_OLDEST = "drop_oldest"
+    DISCONNECT = "disconnect"
+    BLOCK = "block"
+
+
+class WebSocketEventStream:
+    """
+    A bounded, ordered event queue with a single sender task for one WebSocket.
+
+    ``publish`` is thread-safe and is meant to be used as (or from) the ``on_event``
+    callback of Agent.chat and Supervisor.chat.
+
+    Attributes:
+        max_size (int): Maximum number of queued events.
+        policy (OverflowPolicy): Behavior when the queue is full.
+        sent (int): Number of events delivered.
+        dropped (int): Number of events discarded.
+        coalesced (int): Number of events merged into a queued event.
+    """
+
+    def __init__(self,
+                 websocket: Any,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 max_size: Optional[int] = None,
+                 policy: Optional[OverflowPolicy] = None,
+                 coalesce_types: Iterable[str] = COALESCE_EVENT_TYPES):
+        """
+        Initialize the stream.
+
+        Args:
+            websocket (Any): The accepted WebSocket to send events to.
+            loop (Optional[asyncio.AbstractEventLoop]): The loop the WebSocket belongs to.
+                Defaults to the running loop.
+            max_size (Optional[int]): Queue capacity. Defaults to XRONAI_WS_QUEUE_SIZE or 1000.
+            policy (Optional[OverflowPolicy]): Overflow policy. Defaults to
+                XRONAI_WS_OVERFLOW_POLICY or 'block'.
+            coalesce_types (Iterable[str]): Event types whose queued text may be merged.
+
+        Raises:
+            ValueError: If max_size is not positive or the policy is unknown.
+        """
+        self.websocket = websocket
+        self.loop = loop or asyncio.get_running_loop()
+        self.max_size = max_size or int(os.getenv("XRONAI_WS_QUEUE_SIZE", "1000"))
+        self.policy = OverflowPolicy(policy or os.getenv("XRONAI_WS_OVERFLOW_POLICY", OverflowPolicy.BLOCK.value))
+        self.coalesce_types = frozenset(coalesce_types)
+        if self.max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._queue: "collections.deque[Dict[str, Any]]" = collections.deque()
+        self._cond = threading.Condition()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._overflowed = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the stream no longer accepts events."""
+        return self._closed
+
+    def start(self) -> None:
+        """Start the sender task. Must be called from the WebSocket's event loop."""
+        if self._task is None:
+            self._task = self.loop.create_task(self._send_loop())
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue an event for delivery. Safe to call from any thread.
+
+        Args:
+            event (Dict[str, Any]): The event payload.
+
+        Returns:
+            bool: False if the event was discarded because the stream is closed or overflowed.
+        """
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+
+            if self._coalesce(event):
+                return True
+
+            if len(self._queue) >= self.max_size:
+                if not self._make_room():
+                    self.dropped += 1
+                    return False
+
+            if event.get("type") in self.coalesce_types:
+                event = {**event, "data": dict(event.get("data", {}))}
+            self._queue.append(event)
+
+        self.loop.call_soon_threadsafe(self._ready.set)
+        return True
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        """Allow the stream itself to be passed as an ``on_event`` callback."""
+        self.publish(event)
+
+    def _coalesce(self, event: Dict[str, Any]) -> bool:
+        """Merge a streaming text event into the last queued one if they belong together."""
+        if event.get("type") not in self.coalesce_types or not self._queue:
+            return False
+
+        last = self._queue[-1]
+        data, last_data = event.get("data", {}), last.get("data", {})
+        if (last.get("type") != event.get("type") or last_data.get("source") != data.get("source") or
+                last_data.get("tool_call_id") != data.get("tool_call_id") or
+                last_data.get("stream") != data.get("stream")):
+            return False
+
+        last_data["content"] = (last_data.get("content") or "") + (data.get("content") or "")
+        last["timestamp"] = event.get("timestamp", last.get("timestamp"))
+        self.coalesced += 1
+        return True
+
+    def _make_room(self) -> bool:
+        """Apply the overflow policy. Called with the lock held; returns whether the event may be queued."""
+        if self.policy == OverflowPolicy.DROP_OLDEST or self._on_loop_thread():
+            # Blocking on the loop thread would deadlock the sender, so fall back to dropping.
+            self._queue.popleft()
+            self.dropped += 1
+            return True
+
+        if self.policy == OverflowPolicy.DISCONNECT:
+            self._overflowed = True
+            self._closed = True
+            self._cond.notify_all()
+            self.loop.call_soon_threadsafe(self._ready.set)
+            logger.warning("Closing WebSocket: client is not keeping up with events.")
+            return False
+
+        while len(self._queue) >= self.max_size and not self._closed:
+            self._cond.wait()
+        return not self._closed
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+
+                while True:
+                    with self._cond:
+                        if not self._queue or self._overflowed:
+                            break
+                        event = self._queue.popleft()
+                        self._cond.notify_all()
+                    await self.websocket.send_json(event)
+                    self.sent += 1
+
+                if self._overflowed:
+                    await self.websocket.close(code=1013, reason="Client is too slow to receive events.")
+                    return
+                if self._closed:
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Stopped sending events: {e}")
+        finally:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+
+    async def close(self) -> None:
+        """Stop accepting events, release blocked producers and stop the sender task."""
+        self._shutdown()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return delivery counters for this connection."""
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            "queued": queued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "policy": self.policy.value
+        }
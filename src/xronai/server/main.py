@@ -3,37 +3,68 @@ import asyncio
 import shutil
 import uuid
 import json
+import functools
+import itertools
 from datetime import datetime
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Iterable, Iterator, AsyncIterator, Callable, Tuple
 from dotenv import load_dotenv
 
-from xronai.core import Supervisor, Agent
-from xronai.config import load_yaml_config, AgentFactory
-from xronai.history import HistoryManager, EntityType
+from xronai.core import Supervisor, Agent, CancellationToken, RunCancelledError
+from xronai.core.latency import latency_metrics
+from xronai.core.llm_policy import llm_metrics
+from xronai.core.routing import hedging_metrics
+from xronai.config import load_yaml_config, AgentFactory, WorkflowTemplate
+from xronai.history import HistoryManager, EntityType, RunCheckpoint, SessionIndex, BlobStore
+from xronai.history.session_index import SESSION_SORT_FIELDS
+from xronai.tools.execution import tool_metrics
+from xronai.server.blocking import LoopLagMonitor, run_blocking, shutdown_io_executor
+from xronai.server.event_stream import WebSocketEventStream
+from xronai.server.scheduler import QueryRejected, SessionScheduler
+from xronai.server.session_lock import session_lock
 
 load_dotenv()
 
 main_workflow_config: Optional[Dict[str, Any]] = None
+workflow_template: Optional[WorkflowTemplate] = None
 history_root_dir: Optional[str] = None
 serve_ui_enabled: bool = False
+loop_lag_monitor = LoopLagMonitor(interval=float(os.getenv("XRONAI_LOOP_LAG_INTERVAL", "0.1")),
+                                  warn_threshold=float(os.getenv("XRONAI_LOOP_LAG_WARN", "0.25")))
+run_scheduler = SessionScheduler()
+blob_gc_task: Optional[asyncio.Task] = None
+
+# History events serialized per read when a history response is streamed.
+HISTORY_STREAM_BATCH = 100
 
 
 class SessionResponse(BaseModel):
     session_id: str
 
 
+class SessionInfo(BaseModel):
+    session_id: str
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    message_count: int = 0
+    last_query: Optional[str] = None
+    size: int = 0
+
+
 class SessionListResponse(BaseModel):
     sessions: List[str]
+    items: List[SessionInfo] = []
+    total: int = 0
 
 
-def _history_log_to_event(log_entry: Dict[str, Any], all_logs: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+def _history_log_to_event(log_entry: Dict[str, Any], logs_by_id: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Translates a single raw history.jsonl entry into a structured event 
-    that the frontend can render, using the full log for context.
+    that the frontend can render, using the full log (indexed by message_id) for context.
     """
     role = log_entry.get("role")
     content = log_entry.get("content")
@@ -72,7 +103,7 @@ def _history_log_to_event(log_entry: Dict[str, Any], all_logs: List[Dict[str, An
         parent_id = log_entry.get("parent_id")
         if not parent_id:
             return None
-        parent_msg = next((log for log in all_logs if log.get("message_id") == parent_id), None)
+        parent_msg = logs_by_id.get(parent_id)
         if not parent_msg:
             return None
 
@@ -96,49 +127,297 @@ def _history_log_to_event(log_entry: Dict[str, Any], all_logs: List[Dict[str, An
     return event
 
 
-async def get_workflow_entry_point(session_id: str) -> Union[Supervisor, Agent]:
+def _history_logs_to_events(logs: Iterable[Dict[str, Any]],
+                            reverse: bool = False,
+                            lookup: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+                           ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
     """
-    Factory function to build and configure a runnable workflow entry point (Supervisor or Agent)
-    for a given session ID, loading its history.
+    Translates history entries into (log_entry, event) pairs as they are read, skipping
+    entries that have no frontend representation.
+
+    A tool result is rendered according to the tool call it answers. Reading forward,
+    that call has already been read, except at the start of a page, where ``lookup``
+    fetches it. Reading backward, the call comes after its results, so the results are
+    held back until it is read.
     """
-    if not main_workflow_config:
-        raise HTTPException(status_code=503, detail="Server not ready: No workflow configuration loaded.")
+    calls: Dict[str, Dict[str, Any]] = {}
+    held: List[Dict[str, Any]] = []
+    waiting = set()
+    for log in logs:
+        if log.get("tool_calls"):
+            calls[log.get("message_id")] = log
+        parent_id = log.get("parent_id") if log.get("role") == "tool" else None
+
+        if reverse:
+            held.append(log)
+            waiting.discard(log.get("message_id"))
+            if parent_id and parent_id not in calls:
+                waiting.add(parent_id)
+            if waiting:
+                continue
+            batch, held = held, []
+        else:
+            if parent_id and parent_id not in calls and lookup:
+                parent = lookup(parent_id)
+                if parent:
+                    calls[parent_id] = parent
+            batch = [log]
+
+        for item in batch:
+            event = _history_log_to_event(item, calls)
+            if event is not None:
+                yield item, event
+
+    for item in held:
+        event = _history_log_to_event(item, calls)
+        if event is not None:
+            yield item, event
+
+
+def _filter_events(pairs: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+                   entity: Optional[str] = None,
+                   event_types: Optional[Iterable[str]] = None,
+                   since: Optional[str] = None,
+                   until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Filters history events by entity (sender or delegation target), event type and
+    an inclusive timestamp range given as ISO-8601 strings.
+    """
+    types = {t for value in event_types for t in value.split(",") if t} if event_types else None
+    since = since.rstrip("Z") if since else None
+    until = until.rstrip("Z") if until else None
+
+    for log, event in pairs:
+        if types and event["type"] not in types:
+            continue
+        timestamp = log.get("timestamp") or ""
+        if since and timestamp < since:
+            continue
+        if until and timestamp > until:
+            continue
+        if entity:
+            target = event["data"].get("target", {}).get("name")
+            if log.get("sender_name") != entity and target != entity:
+                continue
+        yield event
+
+
+def _take_page(events: Iterable[Dict[str, Any]], limit: int,
+               reverse: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Reads up to ``limit`` events, plus one to learn whether more follow, and returns
+    the page in chronological order with the cursor for the next page.
+    """
+    page = list(itertools.islice(events, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    if reverse:
+        page.reverse()
+        return page, (page[0]["id"] if has_more and page else None)
+    return page, (page[-1]["id"] if has_more and page else None)
+
+
+async def _stream_json_array(items: Iterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Serializes items as a JSON array while they are produced. The items are pulled in
+    batches through the I/O thread pool, since producing them may read from disk.
+    """
+    iterator = iter(items)
+    yield b"["
+    first = True
+    while True:
+        batch = await run_blocking(list, itertools.islice(iterator, HISTORY_STREAM_BATCH))
+        if not batch:
+            break
+        chunk = b",".join(json.dumps(item).encode("utf-8") for item in batch)
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
+
+
+def _compile_workflow(config: Dict[str, Any]) -> WorkflowTemplate:
+    """Compiles the workflow once per worker process. Blocking: it imports tools and discovers MCP tools."""
+    return asyncio.run(AgentFactory.compile(config))
+
 
+def _build_workflow_entry_point(session_id: str) -> Union[Supervisor, Agent]:
+    """
+    Builds the workflow for a session from the compiled template and loads its history.
+    This is blocking: the constructors touch disk, so it must be called from a worker
+    thread.
+
+    With XRONAI_LAZY_WORKFLOW=true only the entry point is built here; the other nodes
+    are built, and their history loaded, when they are first delegated to.
+    """
     session_path = os.path.join(history_root_dir, session_id)
     os.makedirs(session_path, exist_ok=True)
 
-    chat_entry_point = await AgentFactory.create_from_config(config=main_workflow_config,
-                                                             history_base_path=history_root_dir)
+    lazy = os.getenv("XRONAI_LAZY_WORKFLOW", "false").lower() == "true"
+    chat_entry_point = workflow_template.instantiate(session_id, history_base_path=history_root_dir, lazy=lazy)
+    # Clients can resume interrupted runs, so the server checkpoints them.
+    chat_entry_point.checkpoint_runs = True
 
-    chat_entry_point.set_workflow_id(session_id, history_base_path=history_root_dir)
-
-    async def load_history_for_node(node: Union[Supervisor, Agent]):
+    def load_history_for_node(node: Union[Supervisor, Agent]):
         if node.history_manager:
-            node.chat_history = await asyncio.to_thread(node.history_manager.load_chat_history, node.name)
+            node.chat_history = node.history_manager.load_chat_history(node.name)
         if isinstance(node, Supervisor):
             for child in node.registered_agents:
-                await load_history_for_node(child)
+                load_history_for_node(child)
 
-    await load_history_for_node(chat_entry_point)
+    load_history_for_node(chat_entry_point)
     return chat_entry_point
 
 
+async def get_workflow_entry_point(session_id: str) -> Union[Supervisor, Agent]:
+    """
+    Factory function to build and configure a runnable workflow entry point (Supervisor or Agent)
+    for a given session ID, loading its history.
+    """
+    if not workflow_template:
+        raise HTTPException(status_code=503, detail="Server not ready: No workflow configuration loaded.")
+
+    return await run_blocking(_build_workflow_entry_point, session_id)
+
+
+def _server_event(event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Builds an event originating from the server itself, in the same shape as workflow events."""
+    return {
+        "id": f"evt_{uuid.uuid4()}",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "type": event_type,
+        "data": data,
+    }
+
+
+def _run_query(session_id: str,
+               query: str,
+               on_event,
+               cancel_token: CancellationToken,
+               run_id: Optional[str] = None) -> None:
+    """
+    Builds the session's workflow from its current history and runs one query, or resumes
+    the interrupted run ``run_id``. Blocking; executed by the scheduler, which guarantees
+    one run per session at a time within this worker. The session lock extends that
+    guarantee across worker processes.
+
+    The run's deadline (XRONAI_RUN_TIMEOUT seconds, unset by default) starts when the run
+    does, so time spent waiting in the queue does not count against it.
+    """
+    if cancel_token.cancelled:
+        on_event(_server_event("QUERY_CANCELLED", {"query": query, "reason": cancel_token.reason}))
+        return
+
+    run_timeout = os.getenv("XRONAI_RUN_TIMEOUT")
+    if run_timeout:
+        cancel_token.set_timeout(float(run_timeout))
+
+    try:
+        with session_lock(history_root_dir, session_id):
+            cancel_token.raise_if_cancelled()
+            with SessionIndex.for_path(history_root_dir).track(session_id, query=None if run_id else query):
+                chat_entry_point = _build_workflow_entry_point(session_id)
+                if run_id:
+                    chat_entry_point.resume(run_id, on_event=on_event, cancel_token=cancel_token)
+                else:
+                    chat_entry_point.chat(query=query, on_event=on_event, cancel_token=cancel_token)
+    except RunCancelledError as e:
+        print(f"Run for session {session_id} cancelled: {e}")
+    except ValueError as e:
+        if not run_id:
+            raise
+        on_event(_server_event("QUERY_REJECTED", {"run_id": run_id, "reason": str(e)}))
+
+
+def _load_history_events(session_id: str, entity: Optional[str], event_types: Optional[List[str]],
+                         since: Optional[str], until: Optional[str], limit: Optional[int], cursor: Optional[str],
+                         direction: str) -> Tuple[Iterable[Dict[str, Any]], Optional[str]]:
+    """
+    Reads, converts and filters the window of a session's history that a page needs.
+    Blocking.
+
+    Only the history from the cursor onwards (or backwards) is read. With a limit, reading
+    stops once the page is full and the page is returned as a list. Without one, the events
+    are returned as an iterator that reads the history as it is consumed, so the response
+    can be streamed while the history is read; the next cursor is then always None.
+
+    Raises:
+        HTTPException: If the session does not exist or the cursor is unknown.
+    """
+    try:
+        manager = HistoryManager(workflow_id=session_id, base_path=history_root_dir)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session history not found.")
+
+    def lookup(message_id: str) -> Optional[Dict[str, Any]]:
+        return next(manager.iter_raw_messages(message_id), None)
+
+    reverse = direction == "backward" and limit is not None
+    try:
+        if direction == "backward" and limit is None:
+            # Everything before the cursor, read forward so it can be streamed.
+            if cursor:
+                lookup(cursor)
+            logs = itertools.takewhile(lambda log: log.get("message_id") != cursor, manager.iter_raw_messages())
+        else:
+            logs = manager.iter_raw_messages(cursor, reverse=reverse)
+            if cursor:
+                next(logs)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown cursor: {cursor}")
+
+    events = _filter_events(_history_logs_to_events(logs, reverse=reverse, lookup=lookup),
+                            entity=entity,
+                            event_types=event_types,
+                            since=since,
+                            until=until)
+    if limit is None:
+        return events, None
+    return _take_page(events, limit, reverse=reverse)
+
+
+def _collect_blob_garbage() -> None:
+    """
+    Removes the shared blobs no session references any more, in the background. A sweep
+    requested while one is running is skipped; the next deletion or restart catches up.
+    """
+    global blob_gc_task
+    if blob_gc_task is None or blob_gc_task.done():
+        blob_gc_task = asyncio.get_running_loop().create_task(
+            run_blocking(BlobStore.collect_garbage, history_root_dir))
+
+
+def _load_config_cache(path: str) -> Dict[str, Any]:
+    """Reads the workflow configuration the CLI pre-parsed for the worker processes."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global main_workflow_config, history_root_dir, serve_ui_enabled
+    global main_workflow_config, workflow_template, history_root_dir, serve_ui_enabled
     print("--- XronAI Server Lifespan: Startup ---")
     workflow_file, history_dir = os.getenv("XRONAI_WORKFLOW_FILE"), os.getenv("XRONAI_HISTORY_DIR", "xronai_sessions")
+    config_cache = os.getenv("XRONAI_WORKFLOW_CONFIG_CACHE")
     serve_ui_enabled = os.getenv("XRONAI_SERVE_UI", "false").lower() == "true"
 
-    if not workflow_file or not os.path.exists(workflow_file):
+    if not config_cache and (not workflow_file or not os.path.exists(workflow_file)):
         print(f"FATAL: Workflow file not found at path: {workflow_file}.")
         yield
         return
 
+    loop_lag_monitor.start()
     try:
-        main_workflow_config = load_yaml_config(workflow_file)
+        if config_cache:
+            # Multi-worker mode: the CLI parsed and validated the workflow once for all workers.
+            main_workflow_config = await run_blocking(_load_config_cache, config_cache)
+        else:
+            main_workflow_config = await run_blocking(load_yaml_config, workflow_file)
+        workflow_template = await run_blocking(_compile_workflow, main_workflow_config)
         history_root_dir = os.path.abspath(history_dir)
-        os.makedirs(history_root_dir, exist_ok=True)
+        await run_blocking(os.makedirs, history_root_dir, exist_ok=True)
+        if os.getenv("XRONAI_SESSION_INDEX_READY") != "true":
+            await run_blocking(SessionIndex.for_path(history_root_dir).ensure_ready)
+        _collect_blob_garbage()
         print(f"History root directory set to: {history_root_dir}")
         print("--- XronAI Server is running ---")
     except Exception as e:
@@ -146,6 +425,9 @@ async def lifespan(app: FastAPI):
 
     yield
     print("--- XronAI Server Lifespan: Shutdown ---")
+    await run_scheduler.shutdown()
+    await loop_lag_monitor.stop()
+    shutdown_io_executor()
 
 
 app = FastAPI(title="XronAI Workflow Server", lifespan=lifespan)
@@ -153,72 +435,164 @@ app = FastAPI(title="XronAI Workflow Server", lifespan=lifespan)
 
 @app.get("/api/v1/status", tags=["Server"])
 async def get_status():
-    return {"status": "ok", "workflow_loaded": bool(main_workflow_config)}
+    return {
+        "status": "ok",
+        "workflow_loaded": bool(workflow_template),
+        "worker_pid": os.getpid(),
+        "event_loop": loop_lag_monitor.stats(),
+        "runs": run_scheduler.stats()
+    }
+
+
+@app.get("/api/v1/metrics", tags=["Server"])
+async def get_metrics():
+    """
+    Returns runtime metrics of this worker: LLM retries and rate limiters, tool call
+    counters and circuit breaker states, run scheduling and event loop lag.
+    """
+    return {
+        "llm": {
+            **llm_metrics(),
+            "latency": latency_metrics(),
+            "hedging": hedging_metrics(),
+        },
+        "tools": tool_metrics(),
+        "runs": run_scheduler.stats(),
+        "event_loop": loop_lag_monitor.stats()
+    }
 
 
 @app.get("/api/v1/sessions", response_model=SessionListResponse, tags=["Sessions"])
-async def list_sessions():
+async def list_sessions(sort_by: str = Query("updated_at", description=f"One of {', '.join(SESSION_SORT_FIELDS)}."),
+                        order: str = Query("desc", pattern="^(asc|desc)$"),
+                        offset: int = Query(0, ge=0),
+                        limit: Optional[int] = Query(None, ge=1, le=1000)):
+    """
+    Lists sessions with their metadata from the session index, sorted and paginated.
+    """
     if not history_root_dir:
-        return {"sessions": []}
-    return {"sessions": [d for d in os.listdir(history_root_dir) if os.path.isdir(os.path.join(history_root_dir, d))]}
+        return {"sessions": [], "items": [], "total": 0}
+    if sort_by not in SESSION_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {SESSION_SORT_FIELDS}")
+
+    items, total = await run_blocking(SessionIndex.for_path(history_root_dir).list_sessions,
+                                      sort_by=sort_by,
+                                      descending=order == "desc",
+                                      offset=offset,
+                                      limit=limit)
+    return {"sessions": [item["session_id"] for item in items], "items": items, "total": total}
 
 
 @app.post("/api/v1/sessions", response_model=SessionResponse, status_code=201, tags=["Sessions"])
 async def create_session():
     session_id = str(uuid.uuid4())
-    os.makedirs(os.path.join(history_root_dir, session_id), exist_ok=True)
+    await run_blocking(os.makedirs, os.path.join(history_root_dir, session_id), exist_ok=True)
+    await run_blocking(SessionIndex.for_path(history_root_dir).record_created, session_id)
     return {"session_id": session_id}
 
 
 @app.delete("/api/v1/sessions/{session_id}", status_code=204, tags=["Sessions"])
 async def delete_session(session_id: str):
     session_path = os.path.join(history_root_dir, session_id)
-    if not os.path.isdir(session_path):
+    if not await run_blocking(os.path.isdir, session_path):
         raise HTTPException(status_code=404, detail="Session not found.")
-    await asyncio.to_thread(shutil.rmtree, session_path)
+    await run_blocking(shutil.rmtree, session_path)
+    await run_blocking(SessionIndex.for_path(history_root_dir).record_deleted, session_id)
+    _collect_blob_garbage()
 
 
 @app.get("/api/v1/sessions/{session_id}/history", response_model=List[Dict[str, Any]], tags=["Chat"])
-async def get_history_as_events(session_id: str):
-    try:
-        manager = HistoryManager(workflow_id=session_id, base_path=history_root_dir)
-        history_path = manager.history_file
-        if not os.path.exists(history_path):
-            return []
+async def get_history_as_events(
+        session_id: str,
+        limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of events to return."),
+        cursor: Optional[str] = Query(None, description="Event ID to page from (exclusive)."),
+        direction: str = Query("forward",
+                               pattern="^(forward|backward)$",
+                               description="'forward' pages after the cursor, 'backward' before it "
+                               "(without a cursor, 'backward' returns the latest events)."),
+        entity: Optional[str] = Query(None, description="Only events sent by or delegated to this entity."),
+        event_type: Optional[List[str]] = Query(None, description="Only events of these types."),
+        since: Optional[str] = Query(None, description="Only events at or after this ISO-8601 timestamp."),
+        until: Optional[str] = Query(None, description="Only events at or before this ISO-8601 timestamp.")):
+    """
+    Returns the session history as frontend events, streamed as a JSON array.
 
-        with open(history_path, 'r') as f:
-            raw_logs = [json.loads(line) for line in f.readlines()]
+    Events are in the order they were written. Only the part of the history a page
+    needs is read, starting at the cursor. When more events are available in the requested direction, the cursor for the
+    next page is returned in the ``X-Next-Cursor`` header.
+    """
+    page, next_cursor = await run_blocking(_load_history_events, session_id, entity, event_type, since, until, limit,
+                                           cursor, direction)
 
-        sorted_logs = sorted(raw_logs, key=lambda x: x['timestamp'])
-        events = [_history_log_to_event(log, sorted_logs) for log in sorted_logs]
-        return [event for event in events if event is not None]
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return StreamingResponse(_stream_json_array(page), media_type="application/json", headers=headers)
 
-    except ValueError:
-        raise HTTPException(status_code=404, detail="Session history not found.")
+
+@app.get("/api/v1/sessions/{session_id}/runs", response_model=List[Dict[str, Any]], tags=["Chat"])
+async def list_runs(session_id: str):
+    """
+    Lists the runs of a session, most recent first. Runs that are not 'completed' can be
+    resumed by sending ``{"type": "resume", "run_id": ...}`` over the session's WebSocket.
+    """
+    session_path = os.path.join(history_root_dir, session_id)
+    if not await run_blocking(os.path.isdir, session_path):
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return await run_blocking(RunCheckpoint.list_runs, session_path)
 
 
 @app.websocket("/ws/sessions/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
-    if not os.path.isdir(os.path.join(history_root_dir, session_id)):
+    if not await run_blocking(os.path.isdir, os.path.join(history_root_dir, session_id)):
         await websocket.close(code=4000, reason="Session not found")
         return
 
-    loop = asyncio.get_running_loop()
+    event_stream = WebSocketEventStream(websocket)
+    event_stream.start()
+    cancel_tokens: set = set()
 
-    def on_event_sync(event: dict):
-        asyncio.run_coroutine_threadsafe(websocket.send_json(event), loop)
+    def run(query: str, cancel_token: CancellationToken, run_id: Optional[str] = None) -> None:
+        try:
+            _run_query(session_id, query, event_stream.publish, cancel_token, run_id=run_id)
+        finally:
+            cancel_tokens.discard(cancel_token)
 
     try:
         while True:
             data = await websocket.receive_json()
-            if query := data.get("query"):
-                chat_entry_point = await get_workflow_entry_point(session_id)
-                asyncio.create_task(asyncio.to_thread(chat_entry_point.chat, query=query, on_event=on_event_sync))
+            if data.get("type") == "cancel" or data.get("cancel"):
+                for token in list(cancel_tokens):
+                    token.cancel("Cancelled by client")
+                continue
+            # A resume request carries no query; its label is used in the queue events.
+            run_id = data.get("run_id") if data.get("type") == "resume" else None
+            if query := (f"resume {run_id}" if run_id else data.get("query")):
+                if not workflow_template:
+                    event_stream.publish(
+                        _server_event("QUERY_REJECTED", {
+                            "query": query,
+                            "reason": "Server not ready: No workflow configuration loaded."
+                        }))
+                    continue
+                cancel_token = CancellationToken()
+                # Registered first: the run may start, and finish, before submit returns.
+                cancel_tokens.add(cancel_token)
+                try:
+                    position = run_scheduler.submit(session_id, functools.partial(run, query, cancel_token, run_id))
+                except QueryRejected as e:
+                    cancel_tokens.discard(cancel_token)
+                    event_stream.publish(_server_event("QUERY_REJECTED", {"query": query, "reason": str(e)}))
+                    continue
+                if position:
+                    event_stream.publish(_server_event("QUERY_QUEUED", {"query": query, "position": position}))
     except WebSocketDisconnect:
         print(f"WebSocket disconnected from session {session_id}")
     except Exception as e:
         print(f"Error in WebSocket for session {session_id}: {e}")
+    finally:
+        for token in list(cancel_tokens):
+            token.cancel("Client disconnected")
+        await event_stream.close()
 
 
 if os.getenv("XRONAI_SERVE_UI", "false").lower() == "true":
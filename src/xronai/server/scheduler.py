@@ -0,0 +1,160 @@
+"""
+Scheduling of workflow runs for the XronAI server.
+
+Each session gets a serial queue, so queries sent in quick succession run one after
+the other against a consistent history instead of racing on the same files. A global
+limit bounds how many runs execute at once across all sessions, and admission
+control rejects new queries outright when a session's queue or the server as a whole
+is full.
+"""
+
+import os
+import asyncio
+import logging
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRejected(Exception):
+    """Raised when a query cannot be admitted because the server or session is overloaded."""
+    pass
+
+
+class SessionScheduler:
+    """
+    Runs blocking workflow jobs serially per session with a global concurrency limit.
+
+    Attributes:
+        max_concurrent_runs (int): Runs allowed to execute at the same time across sessions.
+        max_queued_per_session (int): Jobs a single session may have waiting.
+        max_pending_runs (int): Jobs (running and waiting) allowed across all sessions.
+    """
+
+    def __init__(self,
+                 max_concurrent_runs: Optional[int] = None,
+                 max_queued_per_session: Optional[int] = None,
+                 max_pending_runs: Optional[int] = None):
+        """
+        Initialize the scheduler. Limits default to the XRONAI_MAX_CONCURRENT_RUNS (4),
+        XRONAI_MAX_QUEUED_PER_SESSION (5) and XRONAI_MAX_PENDING_RUNS (100) environment variables.
+
+        Args:
+            max_concurrent_runs (Optional[int]): Runs allowed to execute at the same time.
+            max_queued_per_session (Optional[int]): Jobs a session may have waiting.
+            max_pending_runs (Optional[int]): Jobs allowed across all sessions.
+        """
+        self.max_concurrent_runs = max_concurrent_runs or int(os.getenv("XRONAI_MAX_CONCURRENT_RUNS", "4"))
+        self.max_queued_per_session = max_queued_per_session or int(os.getenv("XRONAI_MAX_QUEUED_PER_SESSION", "5"))
+        self.max_pending_runs = max_pending_runs or int(os.getenv("XRONAI_MAX_PENDING_RUNS", "100"))
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queues: Dict[str, Deque[Callable[[], Any]]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._running_sessions: Set[str] = set()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, session_id: str, job: Callable[[], Any]) -> int:
+        """
+        Queue a blocking job for a session. Must be called from the event loop.
+
+        Args:
+            session_id (str): The session the job belongs to.
+            job (Callable[[], Any]): The blocking callable to run in a worker thread.
+
+        Returns:
+            int: Number of jobs ahead of this one in the session (0 if it starts right away).
+
+        Raises:
+            QueryRejected: If the session queue or the server is full.
+        """
+        if self._pending >= self.max_pending_runs:
+            self.rejected += 1
+            raise QueryRejected("Server is at capacity. Please retry shortly.")
+
+        queue = self._queues.setdefault(session_id, collections.deque())
+        if len(queue) >= self.max_queued_per_session:
+            self.rejected += 1
+            raise QueryRejected("Too many queries are already queued for this session.")
+
+        queue.append(job)
+        self._pending += 1
+        if session_id not in self._workers:
+            self._workers[session_id] = asyncio.get_running_loop().create_task(self._drain(session_id))
+        return len(queue) - 1 + (1 if session_id in self._running_sessions else 0)
+
+    def discard_queued(self, session_id: str) -> int:
+        """
+        Drop the jobs of a session that have not started yet.
+
+        Args:
+            session_id (str): The session whose queue to clear.
+
+        Returns:
+            int: Number of jobs discarded.
+        """
+        queue = self._queues.get(session_id)
+        if not queue:
+            return 0
+        count = len(queue)
+        queue.clear()
+        self._pending -= count
+        return count
+
+    async def _drain(self, session_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_runs, thread_name_prefix="xronai-run")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_runs)
+
+        queue = self._queues[session_id]
+        try:
+            while queue:
+                job = queue.popleft()
+                self._running_sessions.add(session_id)
+                try:
+                    async with self._semaphore:
+                        self._running += 1
+                        try:
+                            await loop.run_in_executor(self._executor, job)
+                        except Exception as e:
+                            logger.error(f"Run for session {session_id} failed: {e}")
+                        finally:
+                            self._running -= 1
+                            self.completed += 1
+                finally:
+                    self._running_sessions.discard(session_id)
+                    self._pending -= 1
+        finally:
+            self._workers.pop(session_id, None)
+            if not queue:
+                self._queues.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current load and counters."""
+        return {
+            "running": self._running,
+            "pending": self._pending,
+            "active_sessions": len(self._workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_concurrent_runs": self.max_concurrent_runs,
+        }
+
+    async def shutdown(self) -> None:
+        """Discard queued jobs, wait for running ones and release the worker threads."""
+        for session_id in list(self._queues):
+            self.discard_queued(session_id)
+        workers = list(self._workers.values())
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
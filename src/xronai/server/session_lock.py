@@ -0,0 +1,51 @@
+"""
+Cross-process locking of sessions for the multi-worker server.
+
+With ``xronai serve --workers N`` every worker process has its own scheduler, so two
+queries for the same session can land on different workers. ``session_lock`` takes an
+exclusive ``flock`` on ``<history_root>/<session_id>/.lock`` for the duration of a run,
+so runs of one session never interleave their history writes, whichever worker
+handles them. On platforms without ``fcntl`` the lock is a no-op and a single worker
+should be used.
+"""
+
+import os
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILENAME = ".lock"
+
+
+@contextmanager
+def session_lock(history_root: str, session_id: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a session for the duration of the block. Blocking.
+
+    Args:
+        history_root (str): The history root holding one directory per session.
+        session_id (str): The session to lock.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    session_path = os.path.join(history_root, session_id)
+    os.makedirs(session_path, exist_ok=True)
+    fd = os.open(os.path.join(session_path, LOCK_FILENAME), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info(f"Session {session_id} is busy in another worker; waiting for its lock.")
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
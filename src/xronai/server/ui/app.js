@@ -16,6 +16,7 @@ document.addEventListener("DOMContentLoaded", () => {
     // --- State ---
     let activeSessionId = null;
     let ws = null;
+    const toolOutputs = {};
 
     // --- Theme Management ---
     const applyTheme = (theme) => {
@@ -79,12 +80,26 @@ document.addEventListener("DOMContentLoaded", () => {
     }
     */
 
+    function appendToolOutput(data) {
+        let output = toolOutputs[data.tool_call_id];
+        if (!output) {
+            addLogEntry({ icon: document.getElementById('icon-tool-call').innerHTML, title: 'Tool Output', content: '', source: data.source.name, role: 'agent' });
+            output = document.createElement('pre');
+            log.lastElementChild.querySelector('.message-bubble').appendChild(output);
+            toolOutputs[data.tool_call_id] = output;
+        }
+        output.textContent += data.content;
+        log.scrollTop = log.scrollHeight;
+    }
+
     function renderWorkflowEvent(event) {
         if (!event) return;
         const { type, data } = event;
         let title, content, source, icon, role = 'agent';
 
         switch (type) {
+            case "AGENT_TOOL_OUTPUT":
+                appendToolOutput(data); return;
             case "WORKFLOW_START":
                 title = "You"; content = data.user_query; icon = document.getElementById('icon-user').innerHTML; role = 'user'; break;
             case "SUPERVISOR_DELEGATE":
@@ -0,0 +1,365 @@
+"""
+Policy-driven execution of agent tools.
+
+Every tool call made by an Agent goes through ``execute_tool``. A tool may carry a
+``policy`` (a ToolPolicy or the equivalent dictionary, usually from YAML) that adds:
+
+    policy:
+      timeout: 10             # seconds before the call is abandoned
+      retries: 2              # extra attempts after a failure or timeout
+      backoff: 0.5            # first delay between attempts, doubled each retry
+      max_backoff: 10
+      failure_threshold: 5    # consecutive failures that open the circuit
+      reset_timeout: 30       # seconds the circuit stays open before a trial call
+      fallback: "Service unavailable: {error}"
+
+A tool may also carry a ``cache`` (see xronai.tools.tool_cache): a call with the same
+arguments as an earlier successful one then returns the stored result without calling
+the tool.
+
+A tool marked ``streaming`` is passed an ``on_output(stream, text)`` keyword argument
+it may call with output while it runs.
+
+When the circuit of a tool is open, calls fail immediately (or return the fallback)
+instead of waiting on a dependency that is known to be down. Circuit state and call
+counters are kept per tool name for the whole process and exposed by ``tool_metrics``.
+
+Timeouts are enforced by running the call in a separate thread. Python cannot stop
+that thread, so a timed-out call is abandoned and keeps running in the background
+until it returns.
+"""
+
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from xronai.core.cancellation import CancellationToken
+from xronai.tools.tool_cache import get_tool_cache, tool_identity
+
+_NO_FALLBACK = object()
+
+
+class ToolTimeoutError(TimeoutError):
+    """Raised when a tool call exceeds its policy's timeout."""
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a tool is not called because its circuit breaker is open."""
+    pass
+
+
+class ToolPolicy:
+    """
+    Timeout, retry, circuit breaker and fallback settings for one tool.
+
+    Attributes:
+        timeout (Optional[float]): Seconds a single attempt may take.
+        retries (int): Additional attempts after a failed one.
+        backoff (float): Delay before the first retry, in seconds.
+        backoff_multiplier (float): Factor applied to the delay after each retry.
+        max_backoff (float): Upper bound for the delay between attempts.
+        failure_threshold (Optional[int]): Consecutive failures that open the circuit.
+            None disables the circuit breaker.
+        reset_timeout (float): Seconds an open circuit waits before allowing a trial call.
+        fallback (Any): Result returned instead of raising once all attempts failed.
+    """
+
+    FIELDS = ('timeout', 'retries', 'backoff', 'backoff_multiplier', 'max_backoff', 'failure_threshold',
+              'reset_timeout', 'fallback')
+
+    def __init__(self,
+                 timeout: Optional[float] = None,
+                 retries: int = 0,
+                 backoff: float = 0.5,
+                 backoff_multiplier: float = 2.0,
+                 max_backoff: float = 30.0,
+                 failure_threshold: Optional[int] = None,
+                 reset_timeout: float = 30.0,
+                 fallback: Any = _NO_FALLBACK):
+        """Initialize the policy. See the class attributes for the meaning of each argument."""
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_multiplier = backoff_multiplier
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.fallback = fallback
+
+    @property
+    def has_fallback(self) -> bool:
+        """Whether a fallback result is configured."""
+        return self.fallback is not _NO_FALLBACK
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['ToolPolicy']:
+        """
+        Build a policy from its configuration dictionary.
+
+        Args:
+            config (Optional[Dict[str, Any]]): The ``policy`` section of a tool or MCP server.
+
+        Returns:
+            Optional[ToolPolicy]: The policy, or None if no configuration was given.
+
+        Raises:
+            ValueError: If the configuration contains unknown keys.
+        """
+        if config is None:
+            return None
+        if isinstance(config, ToolPolicy):
+            return config
+        unknown = set(config) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown tool policy fields: {', '.join(sorted(unknown))}")
+        return cls(**config)
+
+    def delay(self, attempt: int) -> float:
+        """Return the jittered delay before retry number ``attempt`` (starting at 1)."""
+        delay = min(self.max_backoff, self.backoff * self.backoff_multiplier**(attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    The circuit opens after ``failure_threshold`` consecutive failures. After
+    ``reset_timeout`` seconds a single trial call is let through (half-open); its
+    success closes the circuit and its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted now."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class _ToolStats:
+    """Call counters and circuit breaker of one tool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.total_seconds = 0.0
+        self.breaker: Optional[CircuitBreaker] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = self.successes + self.failures
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "fallbacks": self.fallbacks,
+            "rejected": self.rejected,
+            "cache_hits": self.cache_hits,
+            "avg_latency_ms": round(self.total_seconds / completed * 1000, 2) if completed else 0.0,
+            "circuit": self.breaker.state if self.breaker else None,
+        }
+
+
+_stats: Dict[str, _ToolStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _get_stats(name: str, policy: Optional[ToolPolicy]) -> _ToolStats:
+    with _stats_lock:
+        stats = _stats.setdefault(name, _ToolStats())
+        if policy and policy.failure_threshold and stats.breaker is None:
+            stats.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        return stats
+
+
+def tool_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Return call counters and circuit state for every tool called in this process.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Metrics keyed by tool name.
+    """
+    with _stats_lock:
+        return {name: stats.to_dict() for name, stats in _stats.items()}
+
+
+def _invoke(tool_function: Callable, arguments: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> Any:
+    if extra:
+        return tool_function(**arguments, **extra)
+    if hasattr(tool_function, '__kwdefaults__'):
+        return tool_function(**arguments)
+    return tool_function(arguments)
+
+
+def _invoke_with_timeout(tool_function: Callable,
+                         arguments: Dict[str, Any],
+                         timeout: float,
+                         name: str,
+                         extra: Optional[Dict[str, Any]] = None) -> Any:
+    outcome: Dict[str, Any] = {}
+
+    def target():
+        try:
+            outcome["result"] = _invoke(tool_function, arguments, extra)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name=f"xronai-tool-{name}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise ToolTimeoutError(f"Tool '{name}' timed out after {timeout} seconds")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def execute_tool(tool: Dict[str, Any],
+                 arguments: Dict[str, Any],
+                 cancel_token: Optional[CancellationToken] = None,
+                 on_output: Optional[Callable[[str, str], None]] = None,
+                 on_cache_hit: Optional[Callable[[], None]] = None) -> Any:
+    """
+    Call a tool with the timeout, retry, circuit breaker and fallback rules of its policy.
+
+    Args:
+        tool (Dict[str, Any]): The tool dictionary with 'tool', 'metadata' and optional
+            'policy' and 'streaming' entries.
+        arguments (Dict[str, Any]): The arguments chosen by the model.
+        cancel_token (Optional[CancellationToken]): Stops retrying once the run is cancelled.
+        on_output (Optional[Callable[[str, str], None]]): Passed to streaming tools, which
+            call it with a stream name and each piece of output as they run.
+        on_cache_hit (Optional[Callable[[], None]]): Called if the result comes from the
+            tool's cache instead of a call.
+
+    Returns:
+        Any: The tool's result, its cached result, or the policy's fallback if all attempts failed.
+
+    Raises:
+        CircuitOpenError: If the tool's circuit is open and no fallback is configured.
+        ToolTimeoutError: If the last attempt timed out and no fallback is configured.
+        Exception: Whatever the tool raised on its last attempt, if no fallback is configured.
+    """
+    name = tool['metadata']['function']['name']
+    policy = ToolPolicy.from_config(tool.get('policy'))
+    stats = _get_stats(name, policy)
+    breaker = stats.breaker if policy else None
+    attempts = 1 + (policy.retries if policy else 0)
+    extra = {"on_output": on_output} if on_output and tool.get('streaming') else None
+
+    with _stats_lock:
+        stats.calls += 1
+
+    tool_id = ""
+    if tool.get('cache') is not None:
+        tool_id = tool.get('cache_id') or tool_identity(tool['tool'])
+    cache = get_tool_cache(name, tool.get('cache'), tool_id)
+    if cache is not None:
+        cache_key = cache.key(name, arguments, tool_id)
+        hit, result = cache.get(cache_key)
+        if hit:
+            with _stats_lock:
+                stats.cache_hits += 1
+            if on_cache_hit:
+                on_cache_hit()
+            return result
+
+    error: Optional[BaseException] = None
+    for attempt in range(attempts):
+        if attempt:
+            with _stats_lock:
+                stats.retries += 1
+            delay = policy.delay(attempt)
+            if cancel_token:
+                if cancel_token.wait(delay):
+                    break
+            else:
+                time.sleep(delay)
+
+        if breaker and not breaker.allow():
+            with _stats_lock:
+                stats.rejected += 1
+            error = CircuitOpenError(f"Tool '{name}' is unavailable: circuit open after repeated failures")
+            break
+
+        started = time.monotonic()
+        try:
+            if policy and policy.timeout:
+                result = _invoke_with_timeout(tool['tool'], arguments, policy.timeout, name, extra)
+            else:
+                result = _invoke(tool['tool'], arguments, extra)
+        except Exception as e:
+            error = e
+            with _stats_lock:
+                stats.failures += 1
+                stats.total_seconds += time.monotonic() - started
+                if isinstance(e, ToolTimeoutError):
+                    stats.timeouts += 1
+            if breaker:
+                breaker.record_failure()
+            continue
+
+        with _stats_lock:
+            stats.successes += 1
+            stats.total_seconds += time.monotonic() - started
+        if breaker:
+            breaker.record_success()
+        if cache is not None:
+            cache.put(cache_key, result)
+        return result
+
+    if cancel_token:
+        cancel_token.raise_if_cancelled()
+
+    if policy and policy.has_fallback:
+        with _stats_lock:
+            stats.fallbacks += 1
+        fallback = policy.fallback
+        if isinstance(fallback, str):
+            fallback = fallback.replace("{error}", str(error))
+        return fallback
+
+    raise error
@@ -0,0 +1,286 @@
+"""
+Process-pool execution of Python tools.
+
+Function and class tools normally run on the chat thread, so a CPU-bound tool holds
+the GIL and stalls every other conversation in the process. A tool configured with
+``executor: process`` runs instead in a pool of warm worker processes:
+
+    tools:
+      - name: crunch
+        type: function
+        python_path: my_tools.crunch
+        executor: process
+        workers: 2
+        timeout: 30
+        max_memory_mb: 512
+        max_tasks_per_worker: 100
+
+Workers are started with the ``spawn`` method, import the tool once (instantiating
+class tools with their ``config``), and then serve calls sent over a pipe. Arguments
+and results are pickled. A call that exceeds ``timeout`` kills its worker, which is
+replaced; ``max_memory_mb`` caps each worker's address space (POSIX only); and
+workers are recycled after ``max_tasks_per_worker`` calls. Pools are shared by all
+tools with the same configuration.
+"""
+
+import json
+import atexit
+import logging
+import threading
+import traceback
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ToolProcessError(RuntimeError):
+    """Raised when a tool fails inside its worker process or the worker dies."""
+    pass
+
+
+def _worker_main(conn, python_path: str, config: Dict[str, Any], max_memory_mb: Optional[int]) -> None:
+    """Entry point of a worker process: load the tool, then answer calls until told to stop."""
+    if max_memory_mb:
+        try:
+            import resource
+            limit = int(max_memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Could not apply memory limit to tool worker: {e}")
+
+    tool_function, load_error = None, None
+    try:
+        import importlib
+        module_name, object_name = python_path.rsplit('.', 1)
+        imported_obj = getattr(importlib.import_module(module_name), object_name)
+        tool_function = imported_obj(**config).execute if isinstance(imported_obj, type) else imported_obj
+    except Exception:
+        load_error = f"Failed to load tool '{python_path}':\n{traceback.format_exc()}"
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            arguments = conn.recv()
+        except (EOFError, OSError):
+            return
+        if arguments is None:
+            return
+
+        if load_error:
+            conn.send(("error", load_error))
+            continue
+
+        try:
+            if hasattr(tool_function, '__kwdefaults__'):
+                result = tool_function(**arguments)
+            else:
+                result = tool_function(arguments)
+            conn.send(("ok", result))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+        self.ready = False
+
+    def wait_ready(self) -> None:
+        """Wait until the worker has loaded its tool, so startup time does not count against call timeouts."""
+        if not self.ready:
+            self.conn.recv()
+            self.ready = True
+
+    def stop(self, graceful: bool = True) -> None:
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ProcessToolPool:
+    """
+    A pool of warm worker processes executing one tool.
+
+    Attributes:
+        python_path (str): Import path of the tool function or class.
+        config (Dict[str, Any]): Constructor arguments for class tools.
+        workers (int): Number of worker processes.
+        timeout (Optional[float]): Seconds a call may take before its worker is killed.
+        max_memory_mb (Optional[int]): Address space limit of each worker, in megabytes.
+        max_tasks_per_worker (Optional[int]): Calls after which a worker is replaced.
+    """
+
+    def __init__(self,
+                 python_path: str,
+                 config: Optional[Dict[str, Any]] = None,
+                 workers: int = 1,
+                 timeout: Optional[float] = None,
+                 max_memory_mb: Optional[int] = None,
+                 max_tasks_per_worker: Optional[int] = None):
+        """
+        Initialize the pool and start its workers.
+
+        Args:
+            python_path (str): Import path of the tool function or class.
+            config (Optional[Dict[str, Any]]): Constructor arguments for class tools.
+            workers (int): Number of worker processes.
+            timeout (Optional[float]): Per-call timeout in seconds.
+            max_memory_mb (Optional[int]): Per-worker memory limit in megabytes.
+            max_tasks_per_worker (Optional[int]): Calls after which a worker is recycled.
+        """
+        self.python_path = python_path
+        self.config = config or {}
+        self.workers = workers
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_tasks_per_worker = max_tasks_per_worker
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._cond = threading.Condition()
+        self._closed = False
+        self._idle: List[_Worker] = [self._spawn() for _ in range(workers)]
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_worker_main,
+                                    args=(child_conn, self.python_path, self.config, self.max_memory_mb),
+                                    name=f"xronai-tool-{self.python_path}",
+                                    daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while not self._idle and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                raise ToolProcessError(f"Process pool for '{self.python_path}' is shut down")
+            return self._idle.pop()
+
+    def _release(self, worker: _Worker, replace: bool) -> None:
+        worker.tasks += 1
+        recycle = self.max_tasks_per_worker and worker.tasks >= self.max_tasks_per_worker
+        if replace or recycle or not worker.process.is_alive():
+            worker.stop(graceful=not replace)
+            worker = None if self._closed else self._spawn()
+
+        with self._cond:
+            if worker is not None:
+                if self._closed:
+                    worker.stop()
+                else:
+                    self._idle.append(worker)
+            self._cond.notify()
+
+    def call(self, arguments: Dict[str, Any]) -> Any:
+        """
+        Execute the tool in a worker process. Blocks until a worker is free.
+
+        Args:
+            arguments (Dict[str, Any]): The tool arguments.
+
+        Returns:
+            Any: The tool's result.
+
+        Raises:
+            TimeoutError: If the call exceeded the pool's timeout.
+            ToolProcessError: If the tool raised or its worker process died.
+        """
+        worker = self._acquire()
+        replace = False
+        try:
+            try:
+                worker.wait_ready()
+                worker.conn.send(arguments)
+                finished = worker.conn.poll(self.timeout)
+                if finished:
+                    status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                replace = True
+                worker.process.join(timeout=1)
+                raise ToolProcessError(f"Worker process for tool '{self.python_path}' exited unexpectedly "
+                                       f"(exit code {worker.process.exitcode})")
+            if not finished:
+                replace = True
+                raise TimeoutError(f"Tool '{self.python_path}' timed out after {self.timeout} seconds")
+        finally:
+            self._release(worker, replace)
+
+        if status == "error":
+            raise ToolProcessError(payload)
+        return payload
+
+    def as_tool(self) -> Callable[..., Any]:
+        """
+        Return a function that forwards its keyword arguments to the pool, for use as a tool.
+
+        Returns:
+            Callable[..., Any]: The tool function.
+        """
+
+        def run_in_process(**kwargs):
+            return self.call(kwargs)
+
+        run_in_process.__name__ = self.python_path.rsplit('.', 1)[-1]
+        return run_in_process
+
+    def shutdown(self) -> None:
+        """Stop all idle workers and refuse new calls. Busy workers are stopped when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+
+
+_pools: Dict[Tuple, ProcessToolPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_process_pool(tool_config: Dict[str, Any]) -> ProcessToolPool:
+    """
+    Return the shared pool for a tool configuration, creating it on first use.
+
+    Args:
+        tool_config (Dict[str, Any]): The tool's configuration with 'python_path' and the
+            optional 'config', 'workers', 'timeout', 'max_memory_mb' and 'max_tasks_per_worker' keys.
+
+    Returns:
+        ProcessToolPool: The pool executing that tool.
+    """
+    options = {
+        "config": tool_config.get('config') or {},
+        "workers": tool_config.get('workers', 1),
+        "timeout": tool_config.get('timeout'),
+        "max_memory_mb": tool_config.get('max_memory_mb'),
+        "max_tasks_per_worker": tool_config.get('max_tasks_per_worker'),
+    }
+    key = (tool_config['python_path'], json.dumps(options, sort_keys=True, default=str))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ProcessToolPool(tool_config['python_path'], **options)
+        return _pools[key]
+
+
+@atexit.register
+def shutdown_process_pools() -> None:
+    """Shut down every shared tool process pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
@@ -0,0 +1,496 @@
+"""
+A warm pool of bash processes for terminal tools.
+
+Starting a shell per TerminalTool instance costs a process every time a workflow is
+built, and leaks it for as long as the instance lives.
+Instead, terminal tools lease a shell from a process-wide ``ShellPool`` when they run
+their first command and give it back when they are closed or garbage collected.
+
+The pool keeps ``size`` idle shells ready. A leased shell is reset first: the shell
+process is replaced in place (``exec``) by a fresh bash with the requested working
+directory and a clean environment, so no variables, functions or directory changes
+leak from one session to the next. The environment is handed over in a private
+temporary file rather than on the command line, so it never shows up in ``ps``. Shells are recycled after ``max_commands``
+commands, replaced when they die, and idle shells beyond ``size`` are reaped after
+``idle_timeout`` seconds.
+
+The shared pool is configured with environment variables:
+
+    XRONAI_SHELL_POOL_SIZE        idle shells kept ready (default 2)
+    XRONAI_SHELL_MAX_COMMANDS     commands before a shell is recycled (default 500)
+    XRONAI_SHELL_IDLE_TIMEOUT     seconds before an extra idle shell is reaped (default 300)
+"""
+
+import os
+import re
+import time
+import uuid
+import shlex
+import atexit
+import codecs
+import signal
+import logging
+import tempfile
+import selectors
+import threading
+import subprocess
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_VARIABLE_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class _Capture:
+    """
+    The output of one stream of a command, up to its sentinel line.
+
+    Output is passed on as it arrives, holding back only a trailing line that may be
+    the beginning of the sentinel. If it exceeds ``limit`` bytes, only the first and
+    last halves are kept, so memory stays bounded however much a command prints.
+    """
+
+    def __init__(self,
+                 name: str,
+                 sentinel: bytes,
+                 pattern: 're.Pattern[bytes]',
+                 limit: int,
+                 on_output: Optional[Callable[[str, str], None]] = None):
+        self.name = name
+        self.sentinel = sentinel
+        self.pattern = pattern
+        self.on_output = on_output
+        self.head_limit = limit - limit // 2
+        self.tail_limit = limit // 2
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.dropped = 0
+        self.pending = bytearray()
+        self.match: Optional['re.Match[bytes]'] = None
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk of output. Returns True once the sentinel has been seen."""
+        self.pending += chunk
+        self.match = self.pattern.search(self.pending)
+        if self.match:
+            self._append(self.pending[:self.match.start()])
+            return True
+
+        held = self.pending.rfind(b"\n")
+        if held < 0 or not (self.sentinel.startswith(self.pending[held:]) or self.pending[held:].startswith(
+                self.sentinel)):
+            held = len(self.pending)
+        self._append(self.pending[:held])
+        del self.pending[:held]
+        return False
+
+    def finish(self) -> None:
+        """Pass on the held-back output of a command that ended without its sentinel."""
+        if self.match is None:
+            self._append(self.pending)
+            self.pending.clear()
+
+    def _append(self, data: bytes) -> None:
+        if not data:
+            return
+        if self.on_output:
+            self.on_output(self.name, self._decoder.decode(bytes(data)))
+        room = self.head_limit - len(self.head)
+        self.head += data[:max(room, 0)]
+        self.tail += data[max(room, 0):]
+        if len(self.tail) > self.tail_limit:
+            excess = len(self.tail) - self.tail_limit
+            self.dropped += excess
+            del self.tail[:excess]
+
+    def text(self) -> str:
+        head = self.head.decode('utf-8', errors='replace')
+        tail = self.tail.decode('utf-8', errors='replace')
+        if self.dropped:
+            return f"{head.strip()}\n... [{self.dropped} bytes omitted] ...\n{tail.strip()}"
+        return (head + tail).strip()
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+
+
+class ShellProcess:
+    """
+    A persistent bash process.
+
+    Commands are written to the shell's stdin followed by a line that prints a unique
+    sentinel with the command's exit status on stdout, and the same sentinel on
+    stderr. Both pipes are read without blocking through a selector until both
+    sentinels arrive, so output is collected as fast as it is produced, a quiet
+    command is never cut short, and stderr is complete when the call returns.
+
+    Attributes:
+        working_directory (str): The directory the shell was last reset to.
+        commands (int): Commands run since the process was started.
+        last_used (float): ``time.monotonic()`` of the last lease or command.
+    """
+
+    READ_SIZE = 65536
+
+    def __init__(self, working_directory: Optional[str] = None, env: Optional[Dict[str, str]] = None):
+        """
+        Start the shell.
+
+        Args:
+            working_directory (Optional[str]): The starting directory. Defaults to the current directory.
+            env (Optional[Dict[str, str]]): The environment. Defaults to this process's environment.
+        """
+        self.working_directory = os.path.abspath(working_directory or os.getcwd())
+        self.env = dict(env if env is not None else os.environ)
+        self.commands = 0
+        self.last_used = time.monotonic()
+        self._dirty = False
+
+        # A session of its own lets a timed-out command be killed with all its children.
+        self.process = subprocess.Popen(['/bin/bash'],
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE,
+                                        cwd=self.working_directory,
+                                        env=self.env,
+                                        bufsize=0,
+                                        start_new_session=True)
+        os.set_blocking(self.process.stdout.fileno(), False)
+        os.set_blocking(self.process.stderr.fileno(), False)
+
+    @property
+    def alive(self) -> bool:
+        """Whether the shell process is still running."""
+        return self.process.poll() is None
+
+    def run(self,
+            command: str,
+            timeout: float = 60.0,
+            max_output_bytes: int = 1_000_000,
+            on_output: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """
+        Run a command in the shell and collect its output.
+
+        The command runs with its stdin attached to /dev/null. If it does not finish
+        within ``timeout`` seconds, the shell is killed together with everything it
+        started, and the partial output is returned.
+
+        Args:
+            command (str): The command to run. It may span several lines.
+            timeout (float): Seconds the command may take.
+            max_output_bytes (int): Bytes kept of each of stdout and stderr. Longer output
+                keeps its first and last halves.
+            on_output (Optional[Callable[[str, str], None]]): Called from this thread with
+                the stream name ('stdout' or 'stderr') and each piece of text as the
+                command produces it.
+
+        Returns:
+            Dict[str, Any]: 'stdout', 'stderr' and 'exit_code' (None if the command timed
+                out). 'truncated' is set if output was dropped, and 'error' if the command
+                timed out or the shell is gone.
+        """
+        self.commands += 1
+        self.last_used = time.monotonic()
+        self._dirty = True
+        self._discard_output()
+
+        sentinel = f"__XRONAI_DONE_{uuid.uuid4().hex}"
+        script = (f"eval {shlex.quote(command)} < /dev/null\n"
+                  f"printf '\\n%s:%d\\n' {sentinel} $?; printf '\\n%s\\n' {sentinel} >&2\n")
+        marker = b"\n" + sentinel.encode()
+        stdout = _Capture("stdout", marker, re.compile(re.escape(marker) + rb":(\d+)\n"), max_output_bytes, on_output)
+        stderr = _Capture("stderr", marker, re.compile(re.escape(marker) + rb"\n"), max_output_bytes, on_output)
+
+        try:
+            self.process.stdin.write(script.encode())
+        except (BrokenPipeError, OSError):
+            return {
+                "stdout": "",
+                "stderr": "",
+                "exit_code": self.process.poll(),
+                "error": "Terminal process has terminated."
+            }
+
+        timed_out = not self._collect({self.process.stdout.fileno(): stdout, self.process.stderr.fileno(): stderr},
+                                      deadline=time.monotonic() + timeout)
+        stdout.finish()
+        stderr.finish()
+
+        result: Dict[str, Any] = {"stdout": stdout.text(), "stderr": stderr.text(), "exit_code": None}
+        if stdout.match:
+            result["exit_code"] = int(stdout.match.group(1))
+        if stdout.truncated or stderr.truncated:
+            result["truncated"] = True
+        if timed_out:
+            self.kill()
+            result["error"] = f"Command timed out after {timeout} seconds; the terminal was killed and its state reset."
+        elif stdout.match is None:
+            self.process.wait()
+            result["exit_code"] = self.process.returncode
+            result["error"] = "Terminal process has terminated."
+        return result
+
+    def _collect(self, captures: Dict[int, _Capture], deadline: float) -> bool:
+        """Read the pipes until every capture saw its sentinel or hit end of file. Returns False on timeout."""
+        with selectors.DefaultSelector() as selector:
+            for fd, capture in captures.items():
+                selector.register(fd, selectors.EVENT_READ, capture)
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                for key, _ in selector.select(remaining):
+                    try:
+                        chunk = os.read(key.fd, self.READ_SIZE)
+                    except BlockingIOError:
+                        continue
+                    if not chunk or key.data.feed(chunk):
+                        selector.unregister(key.fd)
+        return True
+
+    def _discard_output(self) -> None:
+        """Drop output left over from earlier commands, such as background jobs."""
+        for stream in (self.process.stdout, self.process.stderr):
+            try:
+                while os.read(stream.fileno(), self.READ_SIZE):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+
+    def reset(self, working_directory: str, env: Optional[Dict[str, str]] = None, timeout: float = 5.0) -> bool:
+        """
+        Replace the shell in place with a fresh bash in ``working_directory``.
+
+        The new bash inherits only the shell's original environment updated with
+        ``env``. A shell that has not run any command since its last reset, in the same
+        directory and without extra variables, is left as it is.
+
+        Args:
+            working_directory (str): The directory to start in.
+            env (Optional[Dict[str, str]]): Variables to set on top of the original environment.
+            timeout (float): Seconds to wait for the new shell to answer.
+
+        Returns:
+            bool: Whether the shell is ready. A shell that failed to reset should be closed.
+        """
+        working_directory = os.path.abspath(working_directory)
+        if not self._dirty and not env and working_directory == self.working_directory:
+            self.last_used = time.monotonic()
+            return True
+
+        # The variables go through a private file the new bash sources on startup
+        # (BASH_ENV), not its command line, where any local user could read them.
+        fd, env_file = tempfile.mkstemp(prefix="xronai-shell-", suffix=".env")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write("unset BASH_ENV\n")
+                for key, value in {**self.env, **(env or {})}.items():
+                    if _VARIABLE_NAME.fullmatch(key):
+                        f.write(f"export {key}={shlex.quote(value)}\n")
+            try:
+                # bash reads a pipe line by line, so the next line is read by the new shell.
+                self.process.stdin.write(
+                    f"cd -- {shlex.quote(working_directory)} && "
+                    f"exec env -i BASH_ENV={shlex.quote(env_file)} /bin/bash\n".encode())
+            except (BrokenPipeError, OSError):
+                return False
+            result = self.run("pwd", timeout=timeout)
+        finally:
+            os.unlink(env_file)
+        if not self.alive or result["stdout"] not in (working_directory, os.path.realpath(working_directory)):
+            return False
+
+        self.working_directory = working_directory
+        self._dirty = bool(env)
+        return True
+
+    def kill(self) -> None:
+        """Kill the shell and every process it started."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.wait()
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self.kill()
+        for stream in (self.process.stdin, self.process.stdout, self.process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class ShellPool:
+    """
+    A pool of warm shells leased to terminal tools.
+
+    Attributes:
+        size (int): Idle shells kept ready.
+        max_commands (int): Commands after which a returned shell is replaced.
+        idle_timeout (float): Seconds an idle shell beyond ``size`` is kept.
+    """
+
+    def __init__(self, size: int = 2, max_commands: int = 500, idle_timeout: float = 300.0):
+        """Initialize the pool. See the class attributes for the meaning of each argument."""
+        self.size = size
+        self.max_commands = max_commands
+        self.idle_timeout = idle_timeout
+        self._idle: List[ShellProcess] = []
+        self._leased = 0
+        self._spawned = 0
+        self._recycled = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._maintainer = threading.Thread(target=self._maintain, name="xronai-shell-pool", daemon=True)
+        self._maintainer.start()
+        self._wake.set()
+
+    def lease(self, working_directory: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> ShellProcess:
+        """
+        Take a shell from the pool, reset to ``working_directory``.
+
+        Args:
+            working_directory (Optional[str]): The directory to start in. Defaults to the current directory.
+            env (Optional[Dict[str, str]]): Extra environment variables for this lease.
+
+        Returns:
+            ShellProcess: The shell. Give it back with ``release``.
+
+        Raises:
+            FileNotFoundError: If the working directory does not exist.
+            RuntimeError: If the pool is shut down.
+        """
+        working_directory = os.path.abspath(working_directory or os.getcwd())
+        if not os.path.isdir(working_directory):
+            raise FileNotFoundError(f"Working directory does not exist: {working_directory}")
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Shell pool is shut down")
+                shell = self._idle.pop() if self._idle else None
+                self._leased += 1
+            self._wake.set()
+
+            if shell is None:
+                shell = self._spawn(working_directory)
+            if shell.alive and shell.reset(working_directory, env):
+                return shell
+
+            with self._lock:
+                self._leased -= 1
+            shell.close()
+
+    def release(self, shell: ShellProcess) -> None:
+        """
+        Give a leased shell back to the pool.
+
+        Shells that died or reached ``max_commands`` are closed instead, and replaced in
+        the background.
+
+        Args:
+            shell (ShellProcess): A shell returned by ``lease``.
+        """
+        with self._lock:
+            self._leased -= 1
+            if not self._closed and shell.alive and shell.commands < self.max_commands:
+                shell.last_used = time.monotonic()
+                self._idle.append(shell)
+                return
+            self._recycled += 1
+        shell.close()
+        self._wake.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of idle and leased shells and the spawn and recycle counters."""
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "leased": self._leased,
+                "spawned": self._spawned,
+                "recycled": self._recycled
+            }
+
+    def shutdown(self) -> None:
+        """Close the idle shells and stop the pool. Leased shells are closed when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        self._wake.set()
+        for shell in idle:
+            shell.close()
+
+    def _spawn(self, working_directory: Optional[str] = None) -> ShellProcess:
+        shell = ShellProcess(working_directory)
+        with self._lock:
+            self._spawned += 1
+        return shell
+
+    def _maintain(self) -> None:
+        """Keep ``size`` idle shells ready and reap the extra ones that stay idle too long."""
+        while True:
+            self._wake.wait(timeout=max(1.0, min(self.idle_timeout / 2, 30.0)))
+            self._wake.clear()
+
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                expired = [
+                    shell for shell in self._idle[:-self.size or None]
+                    if now - shell.last_used > self.idle_timeout or not shell.alive
+                ]
+                self._idle = [shell for shell in self._idle if shell not in expired]
+                missing = self.size - len(self._idle)
+            for shell in expired:
+                shell.close()
+
+            for _ in range(max(0, missing)):
+                try:
+                    shell = self._spawn()
+                except OSError as e:
+                    logger.warning("Could not start a shell for the pool: %s", e)
+                    break
+                with self._lock:
+                    if self._closed:
+                        shell.close()
+                        return
+                    self._idle.insert(0, shell)
+
+
+_pool: Optional[ShellPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_shell_pool() -> ShellPool:
+    """
+    Return the process-wide shell pool, creating it on first use.
+
+    Returns:
+        ShellPool: The shared pool, configured from the XRONAI_SHELL_* environment variables.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShellPool(size=int(os.getenv("XRONAI_SHELL_POOL_SIZE", "2")),
+                              max_commands=int(os.getenv("XRONAI_SHELL_MAX_COMMANDS", "500")),
+                              idle_timeout=float(os.getenv("XRONAI_SHELL_IDLE_TIMEOUT", "300")))
+        return _pool
+
+
+@atexit.register
+def shutdown_shell_pool() -> None:
+    """Shut down the shared shell pool."""
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
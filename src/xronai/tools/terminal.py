@@ -1,20 +1,21 @@
-import subprocess
 import threading
-import queue
-from typing import Dict, Optional
-
-
-def _enqueue_output(stream, q):
-
-    for line in iter(stream.readline, ''):
-        q.put(line)
-    stream.close()
+from typing import Any, Callable, Dict, Optional
+from xronai.tools.shell_pool import ShellPool, ShellProcess, get_shell_pool
 
 
 class TerminalTool:
     """
     A tool that provides access to a persistent, isolated terminal session.
-    Each instance of this tool manages its own shell process.
+
+    Each instance leases its own shell from a warm pool (see xronai.tools.shell_pool)
+    when it runs its first command, and keeps it for the lifetime of the instance, so
+    creating the tool is free and the shell state (directory, variables) persists
+    between commands. If the shell dies, or a command times out and the shell is
+    killed, the next command gets a fresh one.
+
+    The tool streams: when the agent has an event listener, output is emitted as
+    AGENT_TOOL_OUTPUT events while the command runs, and the model only receives the
+    first and last ``stream_result_bytes`` of it.
     """
 
     @staticmethod
@@ -30,76 +31,84 @@ class TerminalTool:
                         "Working Directory",
                     "description":
                         "The directory where the terminal session will start. Defaults to the current directory.",
+                },
+                "timeout": {
+                    "type": "number",
+                    "title": "Command Timeout",
+                    "description": "Seconds a command may run before the terminal is killed and restarted.",
+                    "default": 60
+                },
+                "max_output_bytes": {
+                    "type": "integer",
+                    "title": "Max Output Bytes",
+                    "description": "Bytes of stdout and of stderr returned per command; the rest is dropped.",
+                    "default": 1000000
+                },
+                "stream_result_bytes": {
+                    "type": "integer",
+                    "title": "Streamed Result Bytes",
+                    "description": "Bytes of stdout and of stderr returned to the model when the output is streamed.",
+                    "default": 8192
                 }
             },
             "required": []
         }
 
-    def __init__(self, working_directory: Optional[str] = None):
+    def __init__(self,
+                 working_directory: Optional[str] = None,
+                 timeout: float = 60.0,
+                 max_output_bytes: int = 1_000_000,
+                 stream_result_bytes: int = 8192,
+                 pool: Optional[ShellPool] = None):
         """
-        Initializes the tool and starts the persistent shell process.
+        Initializes the tool. The shell is leased on the first command.
         
         Args:
             working_directory (Optional[str]): The starting directory for the shell.
+            timeout (float): Seconds a command may run before the shell is killed.
+            max_output_bytes (int): Bytes kept of each of stdout and stderr per command.
+            stream_result_bytes (int): Bytes of each of stdout and stderr returned when the
+                output is streamed to an ``on_output`` callback.
+            pool (Optional[ShellPool]): The pool to lease from. Defaults to the shared pool.
         """
-        self.process = subprocess.Popen(['/bin/bash'],
-                                        stdin=subprocess.PIPE,
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE,
-                                        cwd=working_directory,
-                                        text=True,
-                                        bufsize=1)
-
-        self.stdout_queue = queue.Queue()
-        self.stderr_queue = queue.Queue()
-
-        self.stdout_thread = threading.Thread(target=_enqueue_output, args=(self.process.stdout, self.stdout_queue))
-        self.stderr_thread = threading.Thread(target=_enqueue_output, args=(self.process.stderr, self.stderr_queue))
-
-        self.stdout_thread.daemon = True
-        self.stderr_thread.daemon = True
-        self.stdout_thread.start()
-        self.stderr_thread.start()
-
-    def execute(self, command: str) -> Dict[str, str]:
+        self.working_directory = working_directory
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.stream_result_bytes = stream_result_bytes
+        self.pool = pool
+        self.shell: Optional[ShellProcess] = None
+        self._lock = threading.Lock()
+
+    def execute(self, command: str, on_output: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
         """
         Execute a command in the persistent terminal session.
 
         Args:
             command (str): The command to execute.
+            on_output (Optional[Callable[[str, str], None]]): Called with the stream name
+                ('stdout' or 'stderr') and each piece of output while the command runs.
+                The returned output is then limited to ``stream_result_bytes``.
 
         Returns:
-            A dictionary containing the standard output and standard error.
+            A dictionary containing the standard output, the standard error and the exit
+            code, with 'truncated' set if output was dropped and 'error' set if the command
+            timed out.
         """
-        if self.process.poll() is not None:
-            return {"status": "error", "output": "Terminal process has terminated."}
-
-        while not self.stdout_queue.empty():
-            self.stdout_queue.get()
-        while not self.stderr_queue.empty():
-            self.stderr_queue.get()
-
-        end_marker = "END_OF_COMMAND_OUTPUT_MARKER_8c21a"
-        full_command = f"{command}; echo {end_marker}\n"
-
-        self.process.stdin.write(full_command)
-        self.process.stdin.flush()
-
-        stdout_output = ""
-        while True:
-            try:
-                line = self.stdout_queue.get(timeout=2)
-                if end_marker in line:
-                    break
-                stdout_output += line
-            except queue.Empty:
-                break
-
-        stderr_output = ""
-        while not self.stderr_queue.empty():
-            stderr_output += self.stderr_queue.get()
-
-        return {"stdout": stdout_output.strip(), "stderr": stderr_output.strip()}
+        with self._lock:
+            if self.shell is None or not self.shell.alive:
+                self.close()
+                try:
+                    self.shell = (self.pool or get_shell_pool()).lease(self.working_directory)
+                except (OSError, RuntimeError) as e:
+                    return {"status": "error", "output": f"Could not start terminal: {e}"}
+            limit = min(self.max_output_bytes, self.stream_result_bytes) if on_output else self.max_output_bytes
+            return self.shell.run(command, timeout=self.timeout, max_output_bytes=limit, on_output=on_output)
+
+    def close(self) -> None:
+        """Return the shell to the pool."""
+        shell, self.shell = self.shell, None
+        if shell is not None:
+            (self.pool or get_shell_pool()).release(shell)
 
     def get_metadata(self) -> dict:
         """Generates the metadata for the LLM for this specific tool instance."""
@@ -109,7 +118,7 @@ class TerminalTool:
                 "name":
                     "execute_terminal_command",
                 "description":
-                    "Executes a command in a persistent Linux shell session and returns the stdout and stderr.",
+                    "Executes a command in a persistent Linux shell session and returns the stdout, stderr and exit code.",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -125,10 +134,9 @@ class TerminalTool:
 
     def as_agent_tool(self) -> dict:
         """Bundles the tool's execution function and its metadata for agent consumption."""
-        return {"tool": self.execute, "metadata": self.get_metadata()}
+        return {"tool": self.execute, "metadata": self.get_metadata(), "streaming": True}
 
     def __del__(self):
-        """Ensure the shell process is terminated when the tool instance is destroyed."""
-        if hasattr(self, 'process') and self.process and self.process.poll() is None:
-            self.process.terminate()
-            self.process.wait()
+        """Return the shell to the pool when the tool instance is destroyed."""
+        if getattr(self, 'shell', None) is not None:
+            self.close()
@@ -0,0 +1,275 @@
+"""
+Memoization of deterministic tool calls.
+
+A tool whose result depends only on its arguments (a lookup, a pure calculation, an
+idempotent fetch) can carry a ``cache`` setting. ``execute_tool`` then returns the
+stored result of an earlier call with the same arguments instead of calling the tool
+again:
+
+    cache: true                   # in-memory, no expiry, 1024 entries
+
+    cache:
+      ttl: 300                    # seconds a result stays valid
+      max_entries: 5000           # least recently used results are evicted first
+      path: tool_cache.sqlite     # also persist results in this SQLite file
+
+Arguments are compared by their canonical JSON (sorted keys), so argument order does
+not matter. Failed calls and fallback results are never cached. Results persisted to
+disk must be JSON serializable; others are cached in memory only.
+
+A tool is identified by its name and by the code behind it, so two tools that share a
+name but run different code never see each other's results. Tools built from
+configuration carry a ``cache_id`` made of their import path (or MCP server and tool
+name) and a hash of their ``config`` (see ``tool_cache_id``); other tools are
+identified by the module and qualified name of their callable (see ``tool_identity``). Caches built from configuration are
+shared per tool for the whole process, so results carry over between sessions and
+workflow rebuilds. Several tools, and several processes, may share one SQLite file.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import functools
+import threading
+import contextlib
+import collections
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+
+class ToolCache:
+    """
+    A bounded, optionally persistent cache of tool results.
+
+    Attributes:
+        ttl (Optional[float]): Seconds a result stays valid. None keeps results until evicted.
+        max_entries (int): Results kept in memory, and on disk if persisted.
+        path (Optional[str]): SQLite file the results are also stored in.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no valid result.
+    """
+
+    FIELDS = ('ttl', 'max_entries', 'path')
+    _PRUNE_EVERY = 64
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 1024, path: Optional[str] = None):
+        """Initialize the cache. See the class attributes for the meaning of each argument."""
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'collections.OrderedDict[str, Tuple[Optional[float], Any]]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        if path:
+            with self._connect() as db:
+                db.execute("CREATE TABLE IF NOT EXISTS tool_cache "
+                           "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL)")
+
+    @classmethod
+    def from_config(cls, config: Union[None, bool, Dict[str, Any], 'ToolCache']) -> Optional['ToolCache']:
+        """
+        Build a cache from its configuration.
+
+        Args:
+            config (Union[None, bool, Dict[str, Any], ToolCache]): The ``cache`` setting of a
+                tool: True for the defaults, or a dictionary of settings.
+
+        Returns:
+            Optional[ToolCache]: The cache, or None if caching is not enabled.
+
+        Raises:
+            ValueError: If the configuration contains unknown keys.
+        """
+        if isinstance(config, ToolCache):
+            return config
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        unknown = set(config) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown tool cache fields: {', '.join(sorted(unknown))}")
+        return cls(**config)
+
+    @staticmethod
+    def key(tool_name: str, arguments: Dict[str, Any], tool_id: str = "") -> str:
+        """
+        Return the cache key of a call: a hash of the tool's name and identity and the
+        canonical JSON of its arguments.
+
+        Args:
+            tool_name (str): Name of the tool.
+            arguments (Dict[str, Any]): Arguments of the call.
+            tool_id (str): Identity of the tool's code, see ``tool_cache_id`` and ``tool_identity``.
+
+        Returns:
+            str: The key.
+        """
+        canonical = json.dumps([tool_name, tool_id, arguments], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a result.
+
+        Args:
+            key (str): The key of the call.
+
+        Returns:
+            Tuple[bool, Any]: Whether a valid result was found, and the result.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+
+        if self.path:
+            with self._connect() as db:
+                row = db.execute("SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and (row[1] is None or row[1] > now):
+                value = json.loads(row[0])
+                with self._lock:
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a result.
+
+        Args:
+            key (str): The key of the call.
+            value (Any): The tool's result.
+        """
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._puts += 1
+            prune = self._puts % self._PRUNE_EVERY == 0
+
+        if not self.path:
+            return
+        try:
+            serialized = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO tool_cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                       (key, serialized, expires_at, now))
+            if prune:
+                db.execute("DELETE FROM tool_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+                db.execute(
+                    "DELETE FROM tool_cache WHERE key NOT IN "
+                    "(SELECT key FROM tool_cache ORDER BY stored_at DESC LIMIT ?)", (self.max_entries,))
+
+    def clear(self) -> None:
+        """Remove every result, including those persisted to disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._connect() as db:
+                db.execute("DELETE FROM tool_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remember(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        """Store a result in memory. Called with the lock held."""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the SQLite file for one transaction."""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+
+_caches: Dict[Tuple[str, str, str], ToolCache] = {}
+_caches_lock = threading.Lock()
+
+
+def tool_identity(func: Callable[..., Any]) -> str:
+    """
+    Return the identity of the code behind a tool that has no ``cache_id``: the module
+    and qualified name of its callable. Bound methods, partials and callable objects are identified by the
+    function or class they run.
+
+    Args:
+        func (Callable[..., Any]): The tool's callable.
+
+    Returns:
+        str: For example 'my_tools.search.SearchTool.execute'.
+    """
+    while isinstance(func, functools.partial):
+        func = func.func
+    func = getattr(func, '__func__', func)
+    if not hasattr(func, '__qualname__'):
+        func = type(func)
+    return f"{getattr(func, '__module__', '')}.{func.__qualname__}"
+
+
+def tool_cache_id(source: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Return the identity of a configured tool: where its code comes from and a hash of
+    the settings it is built with.
+
+    Args:
+        source (str): The tool's import path, or its MCP server and tool name.
+        config (Optional[Dict[str, Any]]): The arguments the tool is built with.
+
+    Returns:
+        str: For example 'my_tools.search.SearchTool#3f2a9c1b0d4e5f67'.
+    """
+    digest = hashlib.sha256(json.dumps(config or {}, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{source}#{digest[:16]}"
+
+
+def get_tool_cache(tool_name: str,
+                   config: Union[None, bool, Dict[str, Any], ToolCache],
+                   tool_id: str = "") -> Optional[ToolCache]:
+    """
+    Return the cache of a tool.
+
+    A ToolCache instance is used as it is. A configuration returns the cache shared by
+    every tool of the same name, identity and settings in this process, created on first use.
+
+    Args:
+        tool_name (str): Name of the tool.
+        config (Union[None, bool, Dict[str, Any], ToolCache]): The tool's ``cache`` setting.
+        tool_id (str): Identity of the tool's code, see ``tool_cache_id`` and ``tool_identity``.
+
+    Returns:
+        Optional[ToolCache]: The cache, or None if caching is not enabled.
+    """
+    if isinstance(config, ToolCache) or not config:
+        return ToolCache.from_config(config)
+
+    registry_key = (tool_name, tool_id, json.dumps(config, sort_keys=True))
+    with _caches_lock:
+        cache = _caches.get(registry_key)
+        if cache is None:
+            cache = ToolCache.from_config(config)
+            _caches[registry_key] = cache
+        return cache
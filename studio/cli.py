@@ -1,6 +1,8 @@
 import os
+import json
+import atexit
+import tempfile
 import typer
-import uvicorn
 import webbrowser
 import asyncio
 from typing_extensions import Annotated
@@ -50,6 +52,8 @@ async def start_studio_server(config, host, port, no_browser, reload):
     """
     The core async function to configure and run the Uvicorn server for the Studio.
     """
+    import uvicorn
+
     if config:
         os.environ["XRONAI_CONFIG_PATH"] = config
         print(f"INFO:     Will load configuration from: {config}")
@@ -91,10 +95,18 @@ def serve(
         Option(file_okay=False, dir_okay=True, writable=True, help="Directory to store conversation session histories."
               )] = None,
     ui: Annotated[bool, typer.Option("--ui", help="Serve a simple web-based chat UI.")] = False,
+    workers: Annotated[int,
+                       typer.Option(min=1, help="Number of worker processes. Runs of a session are serialized "
+                                    "across workers with a per-session file lock.")] = 1,
+    lazy: Annotated[bool,
+                    typer.Option("--lazy", help="Build each agent of a session only when it is first delegated to, "
+                                  "so large workflows start sessions quickly.")] = False,
 ):
     """
     Loads and serves a XronAI workflow for production or testing.
     """
+    import uvicorn
+
     current_working_directory = Path.cwd()
     dotenv_path = current_working_directory / ".env"
 
@@ -120,7 +132,121 @@ def serve(
     elif "XRONAI_SERVE_UI" in os.environ:
         del os.environ["XRONAI_SERVE_UI"]
 
-    uvicorn.run("xronai.server.main:app", host=host, port=port, log_level="info")
+    if lazy:
+        print("INFO:     --lazy flag detected. Agents will be built on first delegation.")
+        os.environ["XRONAI_LAZY_WORKFLOW"] = "true"
+    elif "XRONAI_LAZY_WORKFLOW" in os.environ:
+        del os.environ["XRONAI_LAZY_WORKFLOW"]
+
+    for key in ("XRONAI_WORKFLOW_CONFIG_CACHE", "XRONAI_SESSION_INDEX_READY"):
+        os.environ.pop(key, None)
+
+    if workers > 1:
+        print(f"INFO:     Starting {workers} worker processes.")
+        _prepare_workers(workflow_file, history_dir)
+
+    uvicorn.run("xronai.server.main:app", host=host, port=port, log_level="info", workers=workers)
+
+
+@app.command()
+def batch(
+    workflow_file: Annotated[
+        Path,
+        typer.Argument(
+            exists=True, file_okay=True, dir_okay=False, readable=True, help="Path to the exported workflow.yaml file."
+        )],
+    inputs_file: Annotated[
+        Path,
+        typer.Argument(exists=True,
+                       file_okay=True,
+                       dir_okay=False,
+                       readable=True,
+                       help="JSONL file with one {\"id\", \"query\"} object per line.")],
+    output: Annotated[
+        Optional[Path],
+        typer.Option(dir_okay=False,
+                     help="JSONL file results are appended to; also used to resume. "
+                     "Defaults to <inputs>.results.jsonl.")] = None,
+    workers: Annotated[int, typer.Option(min=1, help="Number of sessions run concurrently.")] = 4,
+    history_dir: Annotated[
+        Optional[Path],
+        typer.
+        Option(file_okay=False, dir_okay=True, writable=True, help="Directory to store conversation session histories."
+              )] = None,
+    timeout: Annotated[Optional[float], typer.Option(min=0, help="Seconds a single run may take.")] = None,
+    retry_failed: Annotated[bool,
+                            typer.Option("--retry-failed", help="Re-run inputs whose previous result is an error."
+                                        )] = False,
+):
+    """
+    Runs every query of a JSONL file through a workflow, several sessions at a time.
+    """
+    from xronai.config import load_yaml_config
+    from xronai.batch import BatchRunner, read_inputs
+
+    dotenv_path = Path.cwd() / ".env"
+    if dotenv_path.is_file():
+        print(f"INFO:     Loading environment variables from: {dotenv_path}")
+        load_dotenv(dotenv_path=dotenv_path)
+
+    output = output or inputs_file.with_suffix(".results.jsonl")
+    try:
+        runner = BatchRunner(load_yaml_config(str(workflow_file)),
+                             history_base_path=str(history_dir or Path("xronai_sessions")),
+                             workers=workers,
+                             timeout=timeout)
+        items = read_inputs(str(inputs_file))
+    except Exception as e:
+        print(f"ERROR:    {e}")
+        raise typer.Exit(code=1)
+
+    print(f"INFO:     Running {len(items)} inputs from {inputs_file} with {workers} workers.")
+    print(f"INFO:     Writing results to {output}")
+    done = 0
+
+    def report(result):
+        nonlocal done
+        done += 1
+        line = f"INFO:     [{done}] {result['id']}: {result['status']} ({result['duration_s']}s)"
+        print(line if result['status'] == "ok" else f"{line} {result['error']}")
+
+    try:
+        summary = runner.run(items, str(output), retry_failed=retry_failed, on_result=report)
+    except KeyboardInterrupt:
+        print("INFO:     Interrupted. Run the same command again to resume.")
+        raise typer.Exit(code=130)
+
+    print(f"INFO:     Done: {summary['succeeded']} succeeded, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped (already done), {summary['cancelled']} cancelled.")
+    if summary['failed']:
+        raise typer.Exit(code=1)
+
+
+def _prepare_workers(workflow_file: Path, history_dir: Optional[Path]):
+    """
+    Does the once-per-server startup work before uvicorn forks its workers: parses and
+    validates the workflow and hands it to the workers as a JSON file, and builds or
+    compacts the session index so the workers do not race on it.
+    """
+    from xronai.config import load_yaml_config
+    from xronai.history import SessionIndex
+
+    try:
+        config = load_yaml_config(str(workflow_file), validate=True)
+    except Exception as e:
+        print(f"ERROR:    Invalid workflow configuration: {e}")
+        raise typer.Exit(code=1)
+
+    fd, cache_path = tempfile.mkstemp(prefix="xronai-workflow-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(config, f)
+    atexit.register(lambda: os.path.exists(cache_path) and os.remove(cache_path))
+    os.environ["XRONAI_WORKFLOW_CONFIG_CACHE"] = cache_path
+
+    history_root = (history_dir or Path("xronai_sessions")).resolve()
+    history_root.mkdir(parents=True, exist_ok=True)
+    SessionIndex.for_path(history_root).ensure_ready()
+    os.environ["XRONAI_SESSION_INDEX_READY"] = "true"
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ from xronai.tools import TOOL_REGISTRY
 from studio.server.export_utils import generate_yaml_config
 
 from xronai.config import load_yaml_config
+from xronai.core import CancellationToken
+from xronai.server.event_stream import WebSocketEventStream
 from studio.server.yaml_to_drawflow import convert_yaml_to_drawflow
 
 logging.basicConfig(level=logging.INFO)
@@ -130,21 +132,26 @@ async def websocket_endpoint(websocket: WebSocket):
                               reason="No workflow compiled. Please design a workflow and start the chat again.")
         return
 
-    loop = asyncio.get_running_loop()
-
-    def on_event_sync(event: dict):
-        asyncio.run_coroutine_threadsafe(websocket.send_json(event), loop)
+    event_stream = WebSocketEventStream(websocket)
+    event_stream.start()
+    cancel_token = CancellationToken()
 
     try:
         while True:
             user_query = await websocket.receive_text()
             logger.info(f"Received query for entry point '{chat_entry_point.name}': {user_query}")
-            asyncio.create_task(asyncio.to_thread(chat_entry_point.chat, query=user_query, on_event=on_event_sync))
+            asyncio.create_task(
+                asyncio.to_thread(chat_entry_point.chat,
+                                  query=user_query,
+                                  on_event=event_stream.publish,
+                                  cancel_token=cancel_token))
     except WebSocketDisconnect:
         logger.info("WebSocket connection closed.")
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
     finally:
+        cancel_token.cancel("Client disconnected")
+        await event_stream.close()
         if not websocket.client_state.DISCONNECTED:
             await websocket.close()
 
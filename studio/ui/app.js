@@ -177,6 +177,20 @@ document.addEventListener("DOMContentLoaded", async () => {
         log.scrollTop = log.scrollHeight;
     }
 
+    const toolOutputs = {};
+
+    function appendToolOutput(data) {
+        let output = toolOutputs[data.tool_call_id];
+        if (!output) {
+            addMessage("TOOL_RESPONSE", "Tool Output", "", data.source, true);
+            output = document.createElement('pre');
+            log.lastElementChild.querySelector('.log-content').appendChild(output);
+            toolOutputs[data.tool_call_id] = output;
+        }
+        output.textContent += data.content;
+        log.scrollTop = log.scrollHeight;
+    }
+
     function updateAddUserButtonState() {
         const addUserBtn = document.getElementById('add-user-btn');
         const workflowData = editor.export();
@@ -553,6 +567,9 @@ document.addEventListener("DOMContentLoaded", async () => {
                     content = `**Tool:** \`${data.data.tool_name}\`\n\n**Arguments:**\n\`\`\`json\n${JSON.stringify(data.data.arguments, null, 2)}\n\`\`\``;
                     addMessage("TOOL_CALL", "Tool Call", content, data.data.source, true);
                     break;
+                case "AGENT_TOOL_OUTPUT":
+                    appendToolOutput(data.data);
+                    break;
                 case "AGENT_TOOL_RESPONSE":
                     content = `\`\`\`json\n${JSON.stringify(data.data.result, null, 2)}\n\`\`\``;
                     addMessage("TOOL_RESPONSE", "Tool Response", content, data.data.source, true);